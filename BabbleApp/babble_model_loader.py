@@ -12,19 +12,26 @@ import PIL.Image as Image
 from threading import Thread
 from one_euro_filter import OneEuroFilter
 
+MODEL_INPUT_SIZE = 256
 
-def run_model(self):
+
+def run_model(self, frame, capture_ns):
+    """Model output for a gray frame at model input size, filtered and clipped to 0..1."""
     if self.runtime in ("ONNX", "Default (ONNX)"):
-        frame = cv2.resize(self.current_image_gray, (256, 256))
-        frame = transforms.to_tensor(frame)
-        frame = transforms.unsqueeze(frame, 0)
-        out = self.sess.run([self.output_name], {self.input_name: frame})
-        output = out[0][0]
+        # A prepared model does resize, scale and layout itself, see utils/model_prep.py.
+        if not self.input_prepared:
+            frame = self.tensor_prep(frame)
+        if self.engine is not None:
+            output = self.engine.run(frame)
+        else:
+            out = self.sess.run([self.output_name], {self.input_name: frame})
+            output = out[0][0]
 
-        output = self.one_euro_filter(output)
+        # Filter on when the frame was captured, not when inference happened to finish.
+        output = self.one_euro_filter(output, capture_ns * 1e-9)
 
         # for i in range(len(output)):  # Clip values between 0 - 1
         #     output[i] = max(min(output[i], 1), 0)
         ## Clip values between 0 - 1
         output = np.clip(output, 0, 1)
-    self.output = output
+    return output
@@ -8,6 +8,7 @@ from classes.etvr.visualizer import Visualizer
 from config import BabbleCameraConfig, BabbleSettingsConfig, BabbleConfig
 import queue
 import threading
+import time
 import numpy as np
 import cv2
 from enum import Enum
@@ -18,12 +19,53 @@ from osc import Tab
 from osc_calibrate_filter import *
 from tab import CamInfo, CamInfoOrigin
 from babble_model_loader import *
+from utils.frame_mailbox import FrameMailbox
+from utils.stage_pipeline import BufferPool, StageHandoff, StageOccupancy
+from utils.latency import LatencyStats
+from utils.session_recorder import SessionRecorder
+from utils.image_transforms import TensorPrep
+from utils.inference_engine import InferenceEngine
+from utils.model_prep import is_prepared_input, load_prepared_model
+from utils.frame_warp import BorderFill, crop_flip_rotate_resize_matrix, rotation_covers_frame
 import os
 from classes.etvr.PB_ComboAPI import onConfigUpdate
 
 os.environ["OMP_NUM_THREADS"] = "1"
 import onnxruntime as ort
 
+# Latencies reported by get_stats(), as (name, from stamp, to stamp).
+PROCESSOR_STAGES = (
+    ("queue", "capture", "dequeue"),
+    ("preprocess", "dequeue", "preprocess"),
+    ("inference", "preprocess", "inference"),
+    ("output", "inference", "output"),
+    ("capture_to_output", "capture", "output"),
+    # Time spent waiting for the next stage, only in pipeline mode it is more than nothing.
+    ("inference_wait", "preprocess", "inference_start"),
+    ("output_wait", "inference", "output_start"),
+)
+# Run on threads of their own with gui_pipeline_depth > 0.
+PIPELINE_STAGES = ("preprocess", "inference", "output")
+
+
+@dataclass
+class ProcessorFrame:
+    """A frame on its way through the processor stages."""
+
+    frame_number: int
+    capture_ns: int
+    timestamps: dict
+    # Gray, at model input size.
+    image: "np.ndarray | None" = None
+    preview: "np.ndarray | None" = None
+    raw_output: "np.ndarray | None" = None
+    # The model input buffer image was warped into, until it goes back to the pool.
+    buffer: "np.ndarray | None" = None
+    # The frame as the camera handed it over, its crop and the (angle, flips) it was warped with.
+    capture: "np.ndarray | None" = None
+    crop: "tuple | None" = None
+    warp: "tuple | None" = None
+
 
 def run_once(f):
     def wrapper(*args, **kwargs):
@@ -53,6 +95,7 @@ class BabbleProcessor:
         image_queue_outgoing: "queue.Queue(maxsize=2)",
         cam_id,
         osc_queue: queue.Queue,
+        frame_mailbox: "FrameMailbox | None" = None,
     ):
         # why tf pass the full config, then calling the camera config as "config". this is debugging hell
         self.main_config = BabbleSettingsConfig # 1. i understand, sure
@@ -67,8 +110,16 @@ class BabbleProcessor:
         self.image_queue_outgoing = image_queue_outgoing
         self.cancellation_event = cancellation_event
         self.capture_event = capture_event
+        self.frame_mailbox = frame_mailbox
         self.cam_id = cam_id
         self.osc_queue = osc_queue
+        self.frames_processed = 0
+        self.previews_sent = 0
+        self.latency = LatencyStats()
+        # (depth, handoffs, occupancy) while run() runs the stages as a pipeline.
+        self.pipeline = None
+        # Only while a session is being recorded, a new one every run().
+        self.recorder: "SessionRecorder | None" = None
 
         self.raw_visualizer = Visualizer(self.capture_queue_incoming)
         self.processed_visualizer = Visualizer(self.image_queue_outgoing)
@@ -77,7 +128,15 @@ class BabbleProcessor:
         self.previous_image = None
         self.current_image = None
         self.current_image_gray = None
+        self.current_image_preview = None
+        # Reused for every frame, the warp writes the model input straight into them.
+        self.model_frames: "BufferPool | None" = None
+        self.model_frame = None
+        self.border_fill = BorderFill()
         self.current_frame_number = None
+        self.current_capture_ns = None
+        self.current_crop = None
+        self.current_timestamps = {}
         self.current_fps = None
         self.FRAMESIZE = [0, 0, 1]
 
@@ -99,6 +158,7 @@ class BabbleProcessor:
         self.val_list = []
         self.calibrate_config = np.empty((1, 45))
         self.min_max_array = np.empty((2, 45))
+        self.engine: "InferenceEngine | None" = None
 
         onConfigUpdate.connect(self.onReloadConfig)
 
@@ -123,6 +183,9 @@ class BabbleProcessor:
 
             # Construct the model path
             model_path = os.path.join(base_path, self.model, 'onnx', 'model.onnx')
+            if self.settings.gui_preprocess_in_model and os.path.isfile(model_path):
+                # Takes the uint8 frame as is, falls back to the NumPy transforms without it.
+                model_path = load_prepared_model(model_path, MODEL_INPUT_SIZE) or model_path
 
             try:
                 self.sess = ort.InferenceSession(
@@ -142,6 +205,12 @@ class BabbleProcessor:
                     provider_options=[{"device_id": self.gpu_index}],
                 )
             self.input_name = self.sess.get_inputs()[0].name
+            self.input_prepared = is_prepared_input(self.sess.get_inputs()[0].type)
+            # The model's input tensor, refilled for every frame when the model isn't prepared.
+            self.tensor_prep = None if self.input_prepared else TensorPrep.from_session_input(
+                self.sess.get_inputs()[0], MODEL_INPUT_SIZE
+            )
+            self.engine = InferenceEngine(self.sess) if self.settings.gui_io_binding else None
             self.output_name = self.sess.get_outputs()[0].name
         try:
             min_cutoff = float(self.settings.gui_min_cutoff)
@@ -163,34 +232,54 @@ class BabbleProcessor:
         self.settings = fullConfig.settings
         self.config_class = fullConfig # How is this config class if it holds the full config? WAIT! IT'S NOT EVEN USED. alr, i'm angry
 
-    def output_images_and_update(self, output_information: CamInfo):
+    def output_images_and_update(self, output_information: CamInfo, preview):
         try:
-            image_stack = np.concatenate(
-                (cv2.cvtColor(self.current_image_gray, cv2.COLOR_GRAY2BGR),),
-                axis=1,
-            )
-            self.image_queue_outgoing.put((image_stack, output_information))
-            if self.image_queue_outgoing.qsize() > 1:
-                self.image_queue_outgoing.get()
-                
-            self.previous_image = self.current_image
+            # Nobody to show it to, so no preview image is built at all.
+            if self.preview_active():
+                image_stack = np.concatenate(
+                    (cv2.cvtColor(preview, cv2.COLOR_GRAY2BGR),),
+                    axis=1,
+                )
+                self.image_queue_outgoing.put((image_stack, output_information))
+                if self.image_queue_outgoing.qsize() > 1:
+                    self.image_queue_outgoing.get()
+                self.previews_sent += 1
+
             self.previous_rotation = self.config.rotation_angle
 
             # Relay information to OSC
+            output_information.timestamps["output"] = time.perf_counter_ns()
             self.osc_queue.put((None, output_information))
         except:  # If this fails it likely means that the images are not the same size for some reason.
             print(
                 f'\033[91m[ERROR] error.size.\033[0m'
             )
 
+    def preview_active(self) -> bool:
+        """Whether anyone streams the processed preview, everything only shown there is skipped otherwise."""
+        return self.processed_visualizer.subscribers > 0
+
+    def to_gray(self, image):
+        if image.ndim == 2:  # Already gray, decoded that way by the camera.
+            return image
+        if self.settings.gui_use_red_channel:  # Red only, what B=G=R gray used to come down to.
+            return cv2.extractChannel(image, 2)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
     def capture_crop_rotate_image(self):
         # Get our current frame
 
         try:
             # Get frame from capture source, crop to ROI
-            self.FRAMESIZE = self.current_image.shape
-            if self.config.roi_window_w > 0 and self.config.roi_window_h > 0: # If crop not set, then continue. ffs
-                self.current_image = self.current_image[
+            image = self.current_image
+            if self.current_crop is not None:
+                # The camera already cut the ROI out at the source.
+                self.FRAMESIZE = self.current_crop[0]
+            else:
+                self.FRAMESIZE = image.shape
+            if self.current_crop is None and self.config.roi_window_w > 0 and self.config.roi_window_h > 0: # If crop not set, then continue. ffs
+                # Only a view, the warp below reads the ROI straight out of the frame.
+                image = image[
                     int(self.config.roi_window_y) : int(
                         self.config.roi_window_y + self.config.roi_window_h
                     ),
@@ -198,64 +287,83 @@ class BabbleProcessor:
                         self.config.roi_window_x + self.config.roi_window_w
                     ),
                 ]
-
+            rows, cols = image.shape[:2]
+            if rows == 0 or cols == 0:
+                raise ValueError("empty ROI")
+            # Mouth cameras are IR, everything from here on works on a single plane.
+            image = self.to_gray(image)
         except:
             # Failure to process frame, reuse previous frame.
-            self.current_image = self.previous_image
+            image = self.previous_image
             print(
                 f'\033[91m[ERROR] error.capture.\033[0m'
             )
 
         try:
-            # Apply rotation to cropped area. For any rotation area outside of the bounds of the image,
-            # fill with white.
-            try:
-                rows, cols, _ = self.current_image.shape
-            except:
-                rows, cols, _ = self.previous_image.shape
-
-            if self.config.gui_vertical_flip:
-                self.current_image = cv2.flip(self.current_image, 0)
-
-            if self.config.gui_horizontal_flip:
-                self.current_image = cv2.flip(self.current_image, 1)
+            # Flip, rotate and resize to the model input in a single warp, written into the
+            # model input buffer. For any rotation area outside of the bounds of the image,
+            # fill with the average colour. Without any, the edges are only extended.
+            rows, cols = image.shape[:2]
+            if rotation_covers_frame(cols, rows, self.config.rotation_angle):
+                border_mode, border_value = cv2.BORDER_REPLICATE, 0
+            else:
+                border_mode, border_value = cv2.BORDER_CONSTANT, self.border_fill.update(image)
+            flips = (self.config.gui_vertical_flip, self.config.gui_horizontal_flip)
 
-            img_center = (cols / 2, rows / 2)
-            rotation_matrix = cv2.getRotationMatrix2D(
-                img_center, self.config.rotation_angle, 1
-            )
-            avg_color_per_row = np.average(self.current_image, axis=0)
-            avg_color = np.average(avg_color_per_row, axis=0)
-            ar, ag, ab = avg_color
             self.current_image = cv2.warpAffine(
-                self.current_image,
-                rotation_matrix,
-                (cols, rows),
-                borderMode=cv2.BORDER_CONSTANT,
-                borderValue=(ar + 10, ag + 10, ab + 10),  # (255, 255, 255),
-            )
-            self.current_image_white = cv2.warpAffine(
-                self.current_image,
-                rotation_matrix,
-                (cols, rows),
-                borderMode=cv2.BORDER_CONSTANT,
-                borderValue=(255, 255, 255),
+                image,
+                crop_flip_rotate_resize_matrix(
+                    cols, rows, MODEL_INPUT_SIZE, MODEL_INPUT_SIZE, self.config.rotation_angle, *flips
+                ),
+                (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE),
+                dst=self.model_frame,
+                borderMode=border_mode,
+                borderValue=border_value,
             )
+            self.previous_image = image
+
+            # The same at ROI resolution, only while someone watches the preview.
+            if self.preview_active():
+                preview_matrix = crop_flip_rotate_resize_matrix(
+                    cols, rows, cols, rows, self.config.rotation_angle, *flips
+                )
+                self.current_image_preview = cv2.warpAffine(
+                    image,
+                    preview_matrix,
+                    (cols, rows),
+                    borderMode=border_mode,
+                    borderValue=border_value,
+                )
+            else:
+                self.current_image_preview = None
             return True
         except:
             pass
 
-    def run(self):
-        print("Processor loop")
-
-        while True:
-            # Check to make sure we haven't been requested to close
-            if self.cancellation_event.is_set():
-                print(
-                    f'\033[94m[INFO] info.exitTrackingThread\033[0m'
-                )
-                return
-
+    def allocate_model_frames(self, count: int):
+        self.model_frames = BufferPool(count, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), np.uint8)
+
+    def release_frame(self, frame: "ProcessorFrame"):
+        """Give the frame's model input buffer back, once no stage reads it any more."""
+        if frame.buffer is not None:
+            self.model_frames.release(frame.buffer)
+            frame.buffer = None
+
+    def next_frame(self) -> "ProcessorFrame | None":
+        """Wait a little for the next frame from the camera, None if there is none yet."""
+        if self.frame_mailbox is not None:
+            # Always the newest frame, anything captured in between counts as skipped.
+            frame = self.frame_mailbox.take(timeout=0.1)
+            if frame is None:
+                return None
+            (
+                self.current_image,
+                self.current_frame_number,
+                self.current_fps,
+                self.current_capture_ns,
+                self.current_crop,
+            ) = frame
+        else:
             try:
                 if self.capture_queue_incoming.empty():
                     self.capture_event.set()
@@ -264,36 +372,191 @@ class BabbleProcessor:
                         self.current_image,
                         self.current_frame_number,
                         self.current_fps,
+                        self.current_capture_ns,
+                        self.current_crop,
                     ) = self.capture_queue_incoming.get(block=True, timeout=0.1)
             except queue.Empty:
                 # print("No image available")
-                continue
+                return None
+
+        self.current_timestamps = {
+            "capture": self.current_capture_ns,
+            "dequeue": time.perf_counter_ns(),
+        }
+        return ProcessorFrame(self.current_frame_number, self.current_capture_ns, self.current_timestamps)
+
+    def preprocess(self, frame: "ProcessorFrame") -> bool:
+        # Every buffer still in a later stage, this frame is skipped.
+        frame.buffer = self.model_frames.acquire()
+        if frame.buffer is None:
+            return False
+        self.model_frame = frame.buffer
+        # Kept for the session recorder, the warp below replaces current_image.
+        frame.capture = self.current_image
+        frame.crop = self.current_crop
+        frame.warp = (
+            self.config.rotation_angle, self.config.gui_vertical_flip, self.config.gui_horizontal_flip
+        )
+        if not self.capture_crop_rotate_image():
+            self.release_frame(frame)
+            return False
+
+        # current_image is gray and at model input size by now.
+        self.current_image_gray = self.current_image
+        frame.image = self.current_image_gray
+        frame.preview = self.current_image_preview
+        frame.timestamps["preprocess"] = time.perf_counter_ns()
+        return True
+
+    def infer(self, frame: "ProcessorFrame") -> bool:
+        frame.timestamps["inference_start"] = time.perf_counter_ns()
+        frame.raw_output = run_model(self, frame.image, frame.capture_ns)
+        frame.timestamps["inference"] = time.perf_counter_ns()
+        return True
+
+    def publish(self, frame: "ProcessorFrame") -> bool:
+        frame.timestamps["output_start"] = time.perf_counter_ns()
+        self.output = frame.raw_output
+        if self.settings.use_calibration:
+            self.output = cal.cal_osc(self, self.output)
+        # else:
+        #   pass
+        # print(self.output)
+
+        self.output_images_and_update(
+            CamInfo(
+                self.current_algo,
+                self.output,
+                frame.frame_number,
+                frame.timestamps,
+            ),
+            frame.image if frame.preview is None else frame.preview,
+        )
+        self.latency.record_stamps(frame.timestamps, PROCESSOR_STAGES)
+        self.frames_processed += 1
+        if self.recorder is not None:
+            # The camera frame, not the model input, so a replay goes through the same warp.
+            self.recorder.record(
+                frame.capture,
+                frame.frame_number,
+                frame.timestamps,
+                frame.raw_output,
+                self.output,
+                frame.crop,
+                frame.warp,
+            )
+        return True
 
-            if not self.capture_crop_rotate_image():
-                continue
+    def run(self):
+        print("Processor loop")
 
-            if self.settings.gui_use_red_channel:  # Make G and B channels equal to red.
-                blue_channel, green_channel, red_channel = cv2.split(self.current_image)
-                new_blue_channel = red_channel
-                new_green_channel = red_channel
-                self.current_image = cv2.merge(
-                    (new_blue_channel, new_green_channel, red_channel)
-                )
-            self.current_image_gray = cv2.cvtColor(
-                self.current_image, cv2.COLOR_BGR2GRAY
+        if self.settings.gui_record_session:
+            self.recorder = SessionRecorder(
+                self.settings.gui_record_directory, self.settings.gui_record_queue_size
             )
-            self.current_image_gray_clean = (
-                self.current_image_gray.copy()
-            )  # copy this frame to have a clean image for blink algo
-
-            run_model(self)
-            if self.settings.use_calibration:
-                self.output = cal.cal_osc(self, self.output)
-            # else:
-            #   pass
-            # print(self.output)
-            
-            self.output_images_and_update(CamInfo(self.current_algo, self.output))
+            self.recorder.start()
+
+        depth = self.settings.gui_pipeline_depth
+        if depth > 0:
+            self.run_pipeline(depth)
+        else:
+            self.pipeline = None
+            self.allocate_model_frames(1)
+            while not self.cancellation_event.is_set():
+                frame = self.next_frame()
+                if frame is None or not self.preprocess(frame):
+                    continue
+                self.infer(frame)
+                self.publish(frame)
+                self.release_frame(frame)
+
+        # We have been requested to close
+        print(
+            f'\033[94m[INFO] info.exitTrackingThread\033[0m'
+        )
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def run_pipeline(self, depth: int):
+        """
+        Preprocess, inference and output each on a thread of their own.
+
+        Between two stages only the newest frame waits, an older one still
+        waiting is dropped when a stage falls behind. depth is how many frames
+        may be in flight from preprocess to output, one model input buffer each,
+        preprocess skips frames while all of them are in use. 3 keeps every
+        stage busy. Throughput gets close to the slowest stage, ONNX runtime
+        lets go of the GIL while it runs the model.
+        """
+        handoffs = {
+            "inference": StageHandoff(on_drop=self.release_frame),
+            "output": StageHandoff(on_drop=self.release_frame),
+        }
+        occupancy = {stage: StageOccupancy() for stage in PIPELINE_STAGES}
+        self.pipeline = (depth, handoffs, occupancy)
+        self.allocate_model_frames(depth)
+
+        workers = [
+            threading.Thread(
+                target=self.run_stage,
+                args=(self.infer, lambda: handoffs["inference"].take(0.1), handoffs["output"], occupancy["inference"]),
+                name="ProcessorInferenceThread",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self.run_stage,
+                args=(self.publish, lambda: handoffs["output"].take(0.1), None, occupancy["output"]),
+                name="ProcessorOutputThread",
+                daemon=True,
+            ),
+        ]
+        for worker in workers:
+            worker.start()
+        self.run_stage(self.preprocess, self.next_frame, handoffs["inference"], occupancy["preprocess"])
+        for worker in workers:
+            worker.join()
+
+    def run_stage(self, work, source, sink: "StageHandoff | None", occupancy: StageOccupancy):
+        occupancy.start()
+        while not self.cancellation_event.is_set():
+            frame = source()
+            if frame is None:
+                continue
+            start = time.perf_counter_ns()
+            done = work(frame)
+            occupancy.record(start, time.perf_counter_ns())
+            if done and sink is not None:
+                sink.put(frame)
+            else:
+                # Done with, or given up on.
+                self.release_frame(frame)
 
     def get_framesize(self):
         return self.FRAMESIZE
+
+    def get_stats(self):
+        stats = {
+            "handoff": "latest" if self.frame_mailbox is not None else "request",
+            "frames_processed": self.frames_processed,
+            "frame_number": self.current_frame_number,
+            "latency": self.latency.get_stats(),
+            "preview_subscribers": self.processed_visualizer.subscribers,
+            "raw_preview_subscribers": self.raw_visualizer.subscribers,
+            "previews_sent": self.previews_sent,
+        }
+        if self.frame_mailbox is not None:
+            stats["frames_captured"] = self.frame_mailbox.published
+            stats["frames_skipped"] = self.frame_mailbox.superseded
+        if self.pipeline is not None:
+            depth, handoffs, occupancy = self.pipeline
+            stats["pipeline"] = {
+                "depth": depth,
+                "stages": {stage: occupancy[stage].get_stats() for stage in PIPELINE_STAGES},
+                "dropped": {stage: handoff.dropped for stage, handoff in handoffs.items()},
+                "skipped": self.model_frames.exhausted,
+            }
+        if self.engine is not None:
+            stats["engine"] = self.engine.get_stats()
+        if self.recorder is not None:
+            stats["recorder"] = self.recorder.get_stats()
+        return stats
@@ -93,8 +93,8 @@ async def lifespan(app: FastAPI):
     yield
     gracefulShutdown()
 
-def setup_app(babbleCam: CameraWidget, thread_manager: ThreadManager):
-    babble_app = PB_ComboAPI(babbleCam, thread_manager)
+def setup_app(babbleCam: CameraWidget, thread_manager: ThreadManager, osc: VRChatOSC = None):
+    babble_app = PB_ComboAPI(babbleCam, thread_manager, osc)
     babble_app.add_routes()
     app = FastAPI(redirect_slashes=True, lifespan=lifespan)
     app.include_router(babble_app.router)
@@ -151,7 +151,7 @@ async def async_main():
         CameraWidget(Tab.CAM, config, osc_queue, thread_manager),
     ]
     babbleCam = cams[0] # Hopefully python fucking passes by ref here
-    app, babble_app = setup_app(babbleCam, thread_manager)
+    app, babble_app = setup_app(babbleCam, thread_manager, osc)
 
     settings = [
         SettingsWidget(Tab.SETTINGS, config, osc_queue),
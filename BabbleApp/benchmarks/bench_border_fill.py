@@ -0,0 +1,57 @@
+"""
+Per-frame cost of picking the rotation warp's border colour.
+
+"average" is what the processor used to do every frame, np.average() over
+every pixel in float64. "estimate" is BorderFill.update(), a subsampled
+average every BORDER_FILL_INTERVAL frames. With a rotation that leaves nothing
+outside the frame (rotation_covers_frame()) there is no colour to pick at all.
+The colours of both are printed to show they agree.
+
+    python benchmarks/bench_border_fill.py [--size 600] [--frames 2000] [--gray]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.frame_warp import BorderFill, rotation_covers_frame
+
+
+def average(image):
+    avg_color_per_row = np.average(image, axis=0)
+    return tuple(np.atleast_1d(np.average(avg_color_per_row, axis=0)) + 10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=600)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--gray", action="store_true")
+    args = parser.parse_args()
+
+    shape = (args.size, args.size) if args.gray else (args.size, args.size, 3)
+    noise = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    image = cv2.GaussianBlur(noise, (0, 0), 8)
+    border_fill = BorderFill()
+
+    print("average:  " + ", ".join(f"{value:6.2f}" for value in average(image)))
+    print("estimate: " + ", ".join(f"{value:6.2f}" for value in border_fill.update(image)))
+    for name, step in (
+        ("average", lambda: average(image)),
+        ("estimate", lambda: border_fill.update(image)),
+        ("rotation 0", lambda: rotation_covers_frame(args.size, args.size, 0)),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            step()
+        elapsed = (time.perf_counter() - start) / args.frames
+        print(f"{name:>10}: {elapsed * 1e6:8.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compare the capture_event request/response handoff with the latest-frame mailbox.
+
+A simulated camera produces frames at a fixed sensor rate and a simulated processor
+spends a fixed time per frame. Both modes use the same primitives as Camera and
+BabbleProcessor and report throughput, latency from capture to the end of
+processing and the number of frames skipped.
+
+    python benchmarks/bench_frame_handoff.py [--fps 60] [--work-ms 12] [--seconds 3]
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.frame_mailbox import FrameMailbox
+
+
+def sensor(fps, stop_event):
+    """Yield capture timestamps on the sensor clock, like a blocking read() would."""
+    period = 1 / fps
+    start = time.perf_counter()
+    while not stop_event.is_set():
+        # Frames are exposed on a fixed clock, a read waits for the next one.
+        now = time.perf_counter()
+        next_frame = start + (int((now - start) / period) + 1) * period
+        time.sleep(next_frame - now)
+        yield next_frame
+
+
+def request_mode(fps, work, seconds):
+    stop_event = threading.Event()
+    capture_event = threading.Event()
+    capture_queue = queue.Queue(maxsize=10)
+    frames = iter(sensor(fps, stop_event))
+
+    def camera():
+        seq = 0
+        while not stop_event.is_set():
+            if not capture_event.wait(timeout=0.02):
+                continue
+            # Capture only starts once requested, so it waits for the next sensor frame.
+            seq += 1
+            capture_queue.put((next(frames), seq))
+            capture_event.clear()
+
+    return run_processor(camera, stop_event, seconds, work, lambda: take_request(capture_event, capture_queue))
+
+
+def take_request(capture_event, capture_queue):
+    if capture_queue.empty():
+        capture_event.set()
+    try:
+        return capture_queue.get(block=True, timeout=0.1)
+    except queue.Empty:
+        return None
+
+
+def latest_mode(fps, work, seconds):
+    stop_event = threading.Event()
+    mailbox = FrameMailbox()
+
+    def camera():
+        for seq, timestamp in enumerate(sensor(fps, stop_event), 1):
+            mailbox.put((timestamp, seq))
+
+    result = run_processor(camera, stop_event, seconds, work, lambda: mailbox.take(timeout=0.1))
+    result["skipped"] = mailbox.superseded
+    return result
+
+
+def run_processor(camera, stop_event, seconds, work, take):
+    thread = threading.Thread(target=camera, daemon=True)
+    thread.start()
+    processed = 0
+    latencies = []
+    last_seq = 0
+    skipped = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        frame = take()
+        if frame is None:
+            continue
+        timestamp, seq = frame
+        skipped += seq - last_seq - 1
+        last_seq = seq
+        time.sleep(work)  # Inference
+        latencies.append(time.perf_counter() - timestamp)
+        processed += 1
+    stop_event.set()
+    thread.join(1)
+    return {
+        "fps": processed / seconds,
+        "latency_ms": 1000 * sum(latencies) / max(len(latencies), 1),
+        "skipped": skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--work-ms", type=float, default=12)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    for name, mode in (("request", request_mode), ("latest", latest_mode)):
+        result = mode(args.fps, args.work_ms / 1000, args.seconds)
+        print(f"{name:>8}: {result['fps']:6.1f} fps processed, "
+              f"capture to output {result['latency_ms']:6.2f} ms, {result['skipped']} skipped")
+
+
+if __name__ == "__main__":
+    main()
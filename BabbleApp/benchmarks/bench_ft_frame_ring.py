@@ -0,0 +1,129 @@
+"""
+Compare the old Queue handoff of FTCameraController with SharedFrameRing.
+
+A producer process stands in for the Vive Facial Tracker read process and
+writes 400x400x3 frames at a fixed rate (0 for as fast as it can). The consumer
+takes frames the way get_image() does. Reported are frames received per second,
+the age of each frame from the producer's timestamp to the consumer having the
+array, and the consumer's CPU time per frame.
+
+    python benchmarks/bench_ft_frame_ring.py [--fps 60] [--seconds 5] [--size 400x400x3]
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue as pqueue
+import sys
+import time
+from struct import pack, unpack
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.frame_ring import SharedFrameRing
+from vivefacialtracker.camera_controller import FT_FRAME_BYTES
+
+
+def produce(shape, fps, seconds, put):
+    frames = [np.random.default_rng(i).integers(0, 255, shape, dtype=np.uint8) for i in range(4)]
+    interval = 1 / fps if fps else 0
+    end = time.perf_counter() + seconds
+    next_frame = time.perf_counter()
+    count = 0
+    while time.perf_counter() < end:
+        if interval:
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_frame += interval
+        put(frames[count % len(frames)], time.perf_counter_ns())
+        count += 1
+
+
+def queue_producer(q, shape, fps, seconds):
+    # Same as the old Helper.process(), the timestamp rides along for the benchmark.
+    produce(shape, fps, seconds, lambda frame, ns: q.put(pack('HHHq', *frame.shape, ns) + frame.tobytes()))
+
+
+def ring_producer(ring, shape, fps, seconds):
+    produce(shape, fps, seconds, ring.write)
+    ring.close()
+
+
+def consume(take, seconds):
+    ages = []
+    cpu = time.thread_time()
+    start = time.perf_counter()
+    end = start + seconds
+    while time.perf_counter() < end:
+        frame = take()
+        if frame is None:
+            continue
+        image, capture_ns = frame
+        ages.append((time.perf_counter_ns() - capture_ns) / 1e6)
+    cpu = time.thread_time() - cpu
+    return ages, cpu, time.perf_counter() - start
+
+
+def bench_queue(shape, fps, seconds):
+    q = multiprocessing.Queue(maxsize=1)
+    proc = multiprocessing.Process(target=queue_producer, args=(q, shape, fps, seconds + 1))
+    proc.start()
+
+    def take():
+        try:
+            frame = q.get(True, 0.5)
+        except pqueue.Empty:
+            return None
+        *frame_shape, capture_ns = unpack('HHHq', frame[0:16])
+        return np.frombuffer(frame[16:], dtype=np.uint8).reshape(frame_shape), capture_ns
+
+    take()
+    result = consume(take, seconds)
+    proc.terminate()
+    proc.join()
+    return result
+
+
+def bench_ring(shape, fps, seconds):
+    ring = SharedFrameRing.create(FT_FRAME_BYTES)
+    proc = multiprocessing.Process(target=ring_producer, args=(ring, shape, fps, seconds + 1))
+    proc.start()
+
+    def take():
+        frame = ring.read(0.5)
+        # Copied out of the slot like get_image() does.
+        return None if frame is None else (frame[0].copy(), frame[2])
+
+    take()
+    result = consume(take, seconds)
+    proc.terminate()
+    proc.join()
+    skipped = ring.frames_skipped
+    ring.unlink()
+    ring.close()
+    return result + (skipped,)
+
+
+def report(name, ages, cpu, elapsed, extra=""):
+    ages = np.array(ages) if ages else np.zeros(1)
+    print(f"{name:>5}: {len(ages) / elapsed:7.1f} fps, age {ages.mean():6.3f} ms avg / "
+          f"{np.percentile(ages, 99):6.3f} ms p99, {1000 * cpu / max(len(ages), 1):6.3f} ms cpu/frame{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fps", type=float, default=60, help="producer rate, 0 for unthrottled")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--size", default="400x400x3")
+    args = parser.parse_args()
+    shape = tuple(int(v) for v in args.size.split("x"))
+
+    report("queue", *bench_queue(shape, args.fps, args.seconds))
+    *result, skipped = bench_ring(shape, args.fps, args.seconds)
+    report("ring", *result, f", {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Time the processor's per-frame geometry, the previous chain against the fused warp.
+
+"chain" is what capture_crop_rotate_image() and run_model() used to do: crop,
+up to two cv2.flip(), a rotation warp at ROI size, a second warp for the white
+bordered image and cv2.resize() to the model input. "fused" is the single warp
+into a reused model input buffer, "fused+preview" adds the ROI sized preview
+warps that only run while the preview is streamed. The largest difference to
+the chain's model input is printed as a check.
+
+    python benchmarks/bench_fused_warp.py [--width 640] [--height 480] [--roi 100,50,400,400] [--angle 15]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from babble_model_loader import MODEL_INPUT_SIZE
+from utils.frame_warp import crop_flip_rotate_resize_matrix
+
+
+def border_value(image):
+    return tuple(np.atleast_1d(np.average(np.average(image, axis=0), axis=0)) + 10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--roi", default="100,50,400,400", help="x,y,w,h")
+    parser.add_argument("--angle", type=float, default=15)
+    parser.add_argument("--flip", action="store_true", help="flip both ways")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--gray", action="store_true")
+    args = parser.parse_args()
+
+    x, y, w, h = (int(v) for v in args.roi.split(","))
+    shape = (args.height, args.width) if args.gray else (args.height, args.width, 3)
+    noise = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    image = cv2.GaussianBlur(noise, (0, 0), 2)
+    size = (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)
+    model_frame = np.empty(size + shape[2:], np.uint8)
+
+    def chain():
+        frame = image[y:y + h, x:x + w]
+        rows, cols = frame.shape[:2]
+        if args.flip:
+            frame = cv2.flip(frame, 0)
+            frame = cv2.flip(frame, 1)
+        rotation = cv2.getRotationMatrix2D((cols / 2, rows / 2), args.angle, 1)
+        frame = cv2.warpAffine(frame, rotation, (cols, rows), borderMode=cv2.BORDER_CONSTANT,
+                               borderValue=border_value(frame))
+        cv2.warpAffine(frame, rotation, (cols, rows), borderMode=cv2.BORDER_CONSTANT,
+                       borderValue=(255, 255, 255))
+        return cv2.resize(frame, size)
+
+    def fused(preview=False):
+        frame = image[y:y + h, x:x + w]
+        rows, cols = frame.shape[:2]
+        border = border_value(frame)
+        matrix = crop_flip_rotate_resize_matrix(cols, rows, *size, args.angle, args.flip, args.flip)
+        out = cv2.warpAffine(frame, matrix, size, dst=model_frame, borderMode=cv2.BORDER_CONSTANT,
+                             borderValue=border)
+        if preview:
+            matrix = crop_flip_rotate_resize_matrix(cols, rows, cols, rows, args.angle, args.flip, args.flip)
+            cv2.warpAffine(frame, matrix, (cols, rows), borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+            cv2.warpAffine(frame, matrix, (cols, rows), borderMode=cv2.BORDER_CONSTANT,
+                           borderValue=(255, 255, 255))
+        return out
+
+    difference = np.abs(chain().astype(np.int16) - fused()).max()
+    print(f"largest difference to the chain: {difference}")
+    for name, step in (("chain", chain), ("fused", fused), ("fused+preview", lambda: fused(True))):
+        step()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            step()
+        elapsed = (time.perf_counter() - start) / args.frames
+        print(f"{name:>13}: {elapsed * 1000:6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
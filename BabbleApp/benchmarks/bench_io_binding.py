@@ -0,0 +1,70 @@
+"""
+Time InferenceSession.run() against the IO bound InferenceEngine.
+
+Both are fed the same persistent input buffer like the processor does, the
+prepared uint8 frame and the TensorPrep float tensor. "run" is sess.run()
+with its output list and indexing, "bound" is InferenceEngine.run(). Times
+are per inference, the outputs are compared as a check. The allocations saved
+are ORT's own, which tracemalloc doesn't see.
+
+    python benchmarks/bench_io_binding.py [--model Models/.../onnx/model.onnx] [--provider CPUExecutionProvider]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import onnxruntime as ort
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from babble_model_loader import MODEL_INPUT_SIZE
+from bench_model_preprocess import stand_in_model
+from utils.image_transforms import TensorPrep
+from utils.inference_engine import InferenceEngine
+from utils.model_prep import prepare_model
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model")
+    parser.add_argument("--provider", default="CPUExecutionProvider")
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    opts = ort.SessionOptions()
+    opts.inter_op_num_threads = 1
+    opts.intra_op_num_threads = 2
+    noise = np.random.default_rng(0).integers(0, 255, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as directory:
+        model = args.model or stand_in_model(os.path.join(directory, "model.onnx"), 13)
+        prepared = prepare_model(model, MODEL_INPUT_SIZE, os.path.join(directory, "model_uint8.onnx"))
+        for name, path, frame in (
+            ("float", model, TensorPrep(MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)(noise)),
+            ("uint8", prepared, noise),
+        ):
+            sess = ort.InferenceSession(path, opts, providers=[args.provider])
+            engine = InferenceEngine(sess)
+            input_name, output_name = sess.get_inputs()[0].name, sess.get_outputs()[0].name
+
+            def plain():
+                return sess.run([output_name], {input_name: frame})[0][0]
+
+            def bound():
+                return engine.run(frame)
+
+            difference = np.abs(plain() - bound()).max()
+            print(f"{name} input, largest output difference {difference:.2e}")
+            for label, step in (("run", plain), ("bound", bound)):
+                step()
+                start = time.perf_counter()
+                for _ in range(args.frames):
+                    step()
+                elapsed = (time.perf_counter() - start) / args.frames
+                print(f"{label:>6}: {elapsed * 1e6:7.1f} us/inference")
+
+
+if __name__ == "__main__":
+    main()
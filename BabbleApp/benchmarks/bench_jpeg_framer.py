@@ -0,0 +1,132 @@
+"""
+Microbenchmark for the ETVR serial JPEG framer.
+
+Feeds a recorded serial capture (raw bytes as they came off the port) through the
+old "bytes += read(); find()" framing and through JpegFramer, in chunks the size
+of what a 3 Mbaud CDC port hands out per read.
+
+    python benchmarks/bench_jpeg_framer.py [capture.bin] [--chunk 512] [--repeat 5]
+
+Without a capture file a synthetic one is generated from random JPEG frames.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.jpeg_framer import JpegFramer
+
+ETVR_HEADER = b"\xff\xa0\xff\xa1"
+
+
+class CaptureStream:
+    """Replays a capture in fixed size chunks, like a serial port would."""
+
+    def __init__(self, data: bytes, chunk: int):
+        self.data = memoryview(data)
+        self.chunk = chunk
+        self.pos = 0
+
+    @property
+    def in_waiting(self):
+        return min(self.chunk, len(self.data) - self.pos)
+
+    def read(self, size):
+        n = min(size, self.chunk, len(self.data) - self.pos)
+        out = bytes(self.data[self.pos:self.pos + n])
+        self.pos += n
+        return out
+
+    def readinto(self, b):
+        n = min(len(b), self.chunk, len(self.data) - self.pos)
+        b[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+    def exhausted(self):
+        return self.pos >= len(self.data)
+
+
+def synthetic_capture(frames: int, size: int) -> bytes:
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    out = bytearray()
+    for _ in range(frames):
+        image = rng.integers(0, 255, (size, size), dtype=np.uint8)
+        image = cv2.GaussianBlur(image, (9, 9), 0)
+        jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+        out += ETVR_HEADER + len(jpeg).to_bytes(2, "little") + jpeg
+    return bytes(out)
+
+
+def legacy_framing(stream: CaptureStream) -> int:
+    # The pre-JpegFramer algorithm from Camera.get_next_packet_bounds.
+    buffer = b""
+    frames = 0
+    while not stream.exhausted():
+        beg = -1
+        while beg == -1 and not stream.exhausted():
+            buffer += stream.read(2048)
+            beg = buffer.find(b"\xff\xd8\xff")
+        if beg > 0:
+            buffer = buffer[beg:]
+        end = -1
+        while end == -1 and not stream.exhausted():
+            buffer += stream.read(128)
+            end = buffer.find(b"\xff\xd9")
+        if end == -1:
+            break
+        jpeg = buffer[0:end + 2]
+        buffer = buffer[end + 2:]
+        frames += len(jpeg) > 0
+    return frames
+
+
+def framer_framing(stream: CaptureStream) -> int:
+    framer = JpegFramer()
+    frames = 0
+    while not stream.exhausted():
+        framer.fill(stream, max(stream.in_waiting, 128))
+        while framer.next_frame() is not None:
+            frames += 1
+    return frames
+
+
+def run(name, func, data, chunk, repeat):
+    best = float("inf")
+    frames = 0
+    for _ in range(repeat):
+        stream = CaptureStream(data, chunk)
+        start = time.perf_counter()
+        frames = func(stream)
+        best = min(best, time.perf_counter() - start)
+    mb = len(data) / 1e6
+    print(f"{name:>8}: {frames} frames in {best * 1000:8.2f} ms "
+          f"({frames / best:9.0f} frames/s, {mb / best:7.1f} MB/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("capture", nargs="?", help="raw serial capture file")
+    parser.add_argument("--chunk", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, default=240)
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_capture(args.frames, args.size)
+    print(f"capture: {len(data)} bytes, chunk: {args.chunk} bytes")
+    run("legacy", legacy_framing, data, args.chunk, args.repeat)
+    run("framer", framer_framing, data, args.chunk, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
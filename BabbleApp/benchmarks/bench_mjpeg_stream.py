@@ -0,0 +1,113 @@
+"""
+Run MjpegStream against a local stand-in MJPEG camera.
+
+The stand-in server streams multipart/x-mixed-replace JPEG frames at a fixed rate
+and drops the connection every --drop-every frames, like a wireless ETVR board
+losing its link. Reports frames received, reconnects, jitter and how long each
+reconnect took.
+
+    python benchmarks/bench_mjpeg_stream.py [--fps 60] [--seconds 5] [--drop-every 120] [--no-length]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mjpeg_stream import MjpegStream
+
+
+def make_frames(count, size):
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        image = cv2.GaussianBlur(rng.integers(0, 255, (size, size), dtype=np.uint8), (9, 9), 0)
+        frames.append(cv2.imencode(".jpg", image)[1].tobytes())
+    return frames
+
+
+def make_handler(frames, fps, drop_every, send_length):
+    class StandInCamera(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            period = 1 / fps
+            next_frame = time.perf_counter()
+            for index in range(drop_every):
+                jpeg = frames[index % len(frames)]
+                headers = b"--frame\r\nContent-Type: image/jpeg\r\n"
+                if send_length:
+                    headers += b"Content-Length: %d\r\n" % len(jpeg)
+                try:
+                    self.wfile.write(headers + b"\r\n" + jpeg + b"\r\n")
+                    self.wfile.flush()
+                except OSError:
+                    return
+                next_frame += period
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            # Drop the link without a goodbye.
+            self.close_connection = True
+
+    return StandInCamera
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--drop-every", type=int, default=120)
+    parser.add_argument("--reconnect-ms", type=float, default=250)
+    parser.add_argument("--size", type=int, default=240)
+    parser.add_argument("--no-length", action="store_true", help="omit Content-Length in parts")
+    args = parser.parse_args()
+
+    frames = make_frames(30, args.size)
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(frames, args.fps, args.drop_every, not args.no_length)
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/stream"
+
+    stream = MjpegStream(url, reconnect_delay=args.reconnect_ms / 1000)
+    stream.start()
+    gaps = []
+    last = time.perf_counter()
+    taken = 0
+    end = last + args.seconds
+    while time.perf_counter() < end:
+        jpeg = stream.take(timeout=0.1)
+        if jpeg is None:
+            continue
+        now = time.perf_counter()
+        if now - last > 3 / args.fps:
+            gaps.append(now - last)
+        last = now
+        taken += 1
+    stream.stop()
+    server.shutdown()
+
+    stats = stream.get_stats()
+    print(f"frames: {stats['frames_received']} received, {taken} taken "
+          f"({taken / args.seconds:.1f} fps)")
+    print(f"jitter: {stats['jitter_ms']:.2f} ms, interval {stats['frame_interval_ms']:.2f} ms")
+    print(f"reconnects: {stats['reconnects']}, gaps: "
+          + ", ".join(f"{gap * 1000:.0f} ms" for gap in gaps))
+
+
+if __name__ == "__main__":
+    main()
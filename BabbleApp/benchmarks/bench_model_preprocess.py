@@ -0,0 +1,111 @@
+"""
+Feed the model through the NumPy transforms against the prepared model.
+
+"numpy" is run_model()'s fallback: cv2.resize() when the frame isn't at
+MODEL_INPUT_SIZE yet, to_tensor(), unsqueeze() and the session. "prepared" is
+the model from utils/model_prep.py fed the uint8 frame as is. Times are per
+inference, the largest output difference between both is printed as a check.
+
+Without --model a small stand-in model is built, it has the real model's input
+and output but almost none of its work, so the preprocessing shows clearly.
+
+    python benchmarks/bench_model_preprocess.py [--model Models/.../onnx/model.onnx] [--sizes 256 400] [--opset 13]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.image_transforms as transforms
+from babble_model_loader import MODEL_INPUT_SIZE
+from utils.model_prep import is_prepared_input, prepare_model
+
+
+def stand_in_model(path, opset, channels=8, stride=4):
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    weights = [
+        numpy_helper.from_array(rng.normal(0, 0.1, (channels, 1, 3, 3)).astype(np.float32), "conv_w"),
+        numpy_helper.from_array(rng.normal(0, 0.1, (channels, 45)).astype(np.float32), "fc_w"),
+        numpy_helper.from_array(np.zeros(45, np.float32), "fc_b"),
+    ]
+    nodes = [
+        helper.make_node("Conv", ["input", "conv_w"], ["conv"], strides=[stride, stride], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["conv"], ["relu"]),
+        helper.make_node("GlobalAveragePool", ["relu"], ["pool"]),
+        helper.make_node("Flatten", ["pool"], ["flat"]),
+        helper.make_node("Gemm", ["flat", "fc_w", "fc_b"], ["logits"]),
+        helper.make_node("Sigmoid", ["logits"], ["output"]),
+    ]
+    graph = helper.make_graph(
+        nodes, "stand_in",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [1, 1, MODEL_INPUT_SIZE, MODEL_INPUT_SIZE])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [1, 45])],
+        weights,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", opset)])
+    model.ir_version = 7  # Loadable by older onnxruntime releases too.
+    onnx.save(model, path)
+    return path
+
+
+def session(path):
+    opts = ort.SessionOptions()
+    opts.inter_op_num_threads = 1
+    opts.intra_op_num_threads = 2
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[MODEL_INPUT_SIZE, 400])
+    parser.add_argument("--opset", type=int, default=13, help="of the stand-in model")
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        model = args.model or stand_in_model(os.path.join(directory, "model.onnx"), args.opset)
+        plain = session(model)
+        prepared = session(prepare_model(model, MODEL_INPUT_SIZE, os.path.join(directory, "model_uint8.onnx")))
+        assert is_prepared_input(prepared.get_inputs()[0].type)
+        plain_input, plain_output = plain.get_inputs()[0].name, plain.get_outputs()[0].name
+        prepared_input, prepared_output = prepared.get_inputs()[0].name, prepared.get_outputs()[0].name
+
+        for size in args.sizes:
+            noise = np.random.default_rng(size).integers(0, 255, (size, size), dtype=np.uint8)
+            frame = cv2.GaussianBlur(noise, (0, 0), 2)
+
+            def numpy_path():
+                image = frame
+                if image.shape != (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE):
+                    image = cv2.resize(image, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE))
+                tensor = transforms.unsqueeze(transforms.to_tensor(image), 0)
+                return plain.run([plain_output], {plain_input: tensor})[0][0]
+
+            def prepared_path():
+                return prepared.run([prepared_output], {prepared_input: frame})[0][0]
+
+            difference = np.abs(numpy_path() - prepared_path()).max()
+            print(f"{size}x{size} frame, largest output difference {difference:.2e}")
+            for name, step in (("numpy", numpy_path), ("prepared", prepared_path)):
+                step()
+                start = time.perf_counter()
+                for _ in range(args.frames):
+                    step()
+                elapsed = (time.perf_counter() - start) / args.frames
+                print(f"{name:>9}: {elapsed * 1000:6.3f} ms/inference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Throughput and latency of BabbleProcessor in sequence against the pipeline.
+
+A camera thread keeps the frame mailbox full with --width x --height BGR
+frames, as fast as they are taken. Each run lasts --seconds and reports
+processed frames per second, the average capture to output latency and, for
+the pipeline, how busy each stage was. Depth 0 is the sequential loop.
+
+Without --model-dir a stand-in model is used, sized with --channels and
+--stride to take about as long as a real one. --model-dir takes a directory
+holding onnx/model.onnx like the ones under Models/.
+
+    python benchmarks/bench_processor_pipeline.py [--depths 0 1 3] [--width 1280 --height 960]
+"""
+
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from babble_processor import PIPELINE_STAGES, BabbleProcessor
+from bench_model_preprocess import stand_in_model
+from config import BabbleConfig
+from utils.frame_mailbox import FrameMailbox
+
+
+def measure(model_dir, depth, image, seconds, threads):
+    config = BabbleConfig()
+    config.settings.gui_model_file = model_dir
+    config.settings.gui_pipeline_depth = depth
+    config.settings.gui_inference_threads = threads
+    config.cam.roi_window_w = min(image.shape[1], 640)
+    config.cam.roi_window_h = min(image.shape[0], 640)
+    config.cam.rotation_angle = 10
+    cancellation_event = threading.Event()
+    mailbox = FrameMailbox()
+    processor = BabbleProcessor(
+        config.cam, config.settings, config, cancellation_event, threading.Event(),
+        queue.Queue(), queue.Queue(), 0, queue.Queue(), mailbox,
+    )
+
+    def camera():
+        frame_number = 0
+        while not cancellation_event.is_set():
+            if mailbox.taken == frame_number:
+                frame_number += 1
+                mailbox.put((image, frame_number, 0, time.perf_counter_ns(), None))
+            else:
+                time.sleep(0.0001)
+
+    threads_ = [threading.Thread(target=processor.run), threading.Thread(target=camera)]
+    for thread in threads_:
+        thread.start()
+    time.sleep(seconds)
+    cancellation_event.set()
+    for thread in threads_:
+        thread.join()
+
+    stats = processor.get_stats()
+    latency = stats["latency"]["capture_to_output"]["avg_ms"]
+    line = f"depth {depth}: {stats['frames_processed'] / seconds:6.1f} fps, {latency:6.2f} ms capture to output"
+    if stats.get("pipeline"):
+        stages = stats["pipeline"]["stages"]
+        line += ", busy " + " ".join(f"{stage} {stages[stage]['occupancy']:4.0%}" for stage in PIPELINE_STAGES)
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-dir")
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1, 3])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--channels", type=int, default=64, help="of the stand-in model, more is slower")
+    parser.add_argument("--stride", type=int, default=1, help="of the stand-in model, less is slower")
+    parser.add_argument("--threads", type=int, default=1, help="gui_inference_threads")
+    args = parser.parse_args()
+
+    image = np.random.default_rng(0).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as directory:
+        model_dir = args.model_dir
+        if model_dir is None:
+            model_dir = directory
+            os.makedirs(os.path.join(directory, "onnx"))
+            stand_in_model(
+                os.path.join(directory, "onnx", "model.onnx"), 13, channels=args.channels, stride=args.stride
+            )
+        for depth in args.depths:
+            measure(model_dir, depth, image, args.seconds, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time the capture side work per frame with and without ROI-first cropping.
+
+"full" is what used to happen: clamp_max_res() on the whole frame, then the
+processor crops the ROI out of that. "roi" is Camera.crop_to_roi(). Both end with
+the resize to the model input so the totals are comparable.
+
+    python benchmarks/bench_roi_capture.py [--width 1920] [--height 1080] [--roi 100,50,300,280]
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from babble_model_loader import MODEL_INPUT_SIZE
+from camera import Camera
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--roi", default="100,50,300,280", help="x,y,w,h in clamped pixels")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--color", action="store_true")
+    args = parser.parse_args()
+
+    x, y, w, h = (int(v) for v in args.roi.split(","))
+    camera = SimpleNamespace(config=SimpleNamespace(
+        roi_first_capture=True, roi_window_x=x, roi_window_y=y, roi_window_w=w, roi_window_h=h,
+    ))
+    shape = (args.height, args.width, 3) if args.color else (args.height, args.width)
+    image = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+
+    def full():
+        frame = Camera.clamp_max_res(camera, image)[y:y + h, x:x + w]
+        return cv2.resize(frame, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE))
+
+    def roi():
+        frame, _ = Camera.crop_to_roi(camera, image)
+        return cv2.resize(frame, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE))
+
+    for name, step in (("full", full), ("roi", roi)):
+        step()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            step()
+        elapsed = (time.perf_counter() - start) / args.frames
+        print(f"{name:>5}: {elapsed * 1000:6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
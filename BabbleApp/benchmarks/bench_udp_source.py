@@ -0,0 +1,135 @@
+"""
+Replay recorded frames over the UDP frame transport.
+
+Frames come from a directory of .jpg files, a raw ETVR serial capture, or are
+generated. They are chunked into datagrams and sent at a fixed rate, optionally
+dropping and reordering datagrams to imitate a bad wireless link.
+
+    # Send to a running app with capture_source set to udp://0.0.0.0:5005
+    python benchmarks/bench_udp_source.py --target 127.0.0.1:5005 frames/
+
+    # Loopback: receive with UdpFrameSource in-process and print its statistics
+    python benchmarks/bench_udp_source.py --loss 0.02 --reorder 0.05
+"""
+
+import argparse
+import glob
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from udp_source import UDP_HEADER, UDP_MAGIC, UdpFrameSource
+from utils.jpeg_framer import JpegFramer
+
+
+def load_frames(source, count, size):
+    if source and os.path.isdir(source):
+        frames = []
+        for path in sorted(glob.glob(os.path.join(source, "*.jpg"))):
+            with open(path, "rb") as f:
+                frames.append(f.read())
+        return frames
+    if source:
+        # Raw serial capture, cut it into frames with the same framer the app uses.
+        with open(source, "rb") as f:
+            data = f.read()
+        framer = JpegFramer(max(len(data), 1))
+        framer.write(data)
+        frames = []
+        while (frame := framer.next_frame()) is not None:
+            frames.append(bytes(frame))
+        return frames
+
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    return [
+        cv2.imencode(".jpg", cv2.GaussianBlur(rng.integers(0, 255, (size, size), dtype=np.uint8), (9, 9), 0))[1].tobytes()
+        for _ in range(count)
+    ]
+
+
+def datagrams(frame_id, jpeg, payload):
+    count = (len(jpeg) + payload - 1) // payload
+    if count > 255:
+        raise ValueError(f"frame of {len(jpeg)} bytes needs more than 255 chunks")
+    return [
+        UDP_HEADER.pack(UDP_MAGIC, frame_id & 0xFFFF, index, count) + jpeg[index * payload:(index + 1) * payload]
+        for index in range(count)
+    ]
+
+
+def send(frames, target, fps, seconds, payload, loss, reorder, stop_event=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rng = random.Random(0)
+    period = 1 / fps
+    next_frame = time.perf_counter()
+    end = next_frame + seconds
+    frame_id = 0
+    sent = 0
+    while time.perf_counter() < end and not (stop_event and stop_event.is_set()):
+        packets = datagrams(frame_id, frames[frame_id % len(frames)], payload)
+        for i in range(len(packets) - 1):
+            if rng.random() < reorder:
+                packets[i], packets[i + 1] = packets[i + 1], packets[i]
+        for packet in packets:
+            if rng.random() >= loss:
+                sock.sendto(packet, target)
+                sent += 1
+        frame_id += 1
+        next_frame += period
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    sock.close()
+    return frame_id, sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", nargs="?", help="directory of .jpg files or raw serial capture")
+    parser.add_argument("--target", help="host:port to send to, loopback test if omitted")
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--payload", type=int, default=1400)
+    parser.add_argument("--loss", type=float, default=0.0, help="datagram loss probability")
+    parser.add_argument("--reorder", type=float, default=0.0, help="adjacent swap probability")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--size", type=int, default=240)
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames, args.size)
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        count, sent = send(frames, (host, int(port)), args.fps, args.seconds, args.payload, args.loss, args.reorder)
+        print(f"sent {count} frames in {sent} datagrams")
+        return
+
+    receiver = UdpFrameSource("udp://127.0.0.1:0", read_timeout=0.1)
+    receiver.start()
+    target = receiver._socket.getsockname()
+    taken = 0
+
+    def consume():
+        nonlocal taken
+        while receiver._thread is not None:
+            if receiver.take(timeout=0.1) is not None:
+                taken += 1
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    count, sent = send(frames, target, args.fps, args.seconds, args.payload, args.loss, args.reorder)
+    time.sleep(0.2)
+    receiver.stop()
+    print(f"sent {count} frames in {sent} datagrams, took {taken}")
+    for name, value in receiver.get_stats().items():
+        print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare V4l2Capture with OpenCV's VideoCapture on a real UVC camera (Linux only).
+
+Both read the same device for a few seconds. Reported are the frame rate, CPU
+time spent per frame in the reading thread and, for V4L2, the age of each frame
+when it reached us, measured from the driver's timestamp.
+
+    python benchmarks/bench_v4l2_capture.py [--device 0] [--seconds 5] [--buffers 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from babble_model_loader import MODEL_INPUT_SIZE
+from camera import MAX_RESOLUTION
+from utils.jpeg_decode import JpegDecoder
+from v4l2_capture import V4l2Capture
+
+
+def bench_v4l2(device, seconds, buffers):
+    camera = V4l2Capture(device, JpegDecoder(MODEL_INPUT_SIZE, MAX_RESOLUTION), buffer_count=buffers)
+    camera.open()
+    ages = []
+    frames = 0
+    cpu = time.thread_time()
+    end = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < end:
+            frame = camera.read(0.5)
+            if frame is None:
+                continue
+            ages.append((time.perf_counter_ns() - frame[2]) / 1e6)
+            frames += 1
+    finally:
+        camera.close()
+    cpu = time.thread_time() - cpu
+    stats = camera.get_stats()
+    print(f"v4l2 {stats['pixel_format']} {stats['width']}x{stats['height']}: {frames / seconds:6.1f} fps, "
+          f"{1000 * cpu / max(frames, 1):5.2f} ms cpu/frame, "
+          f"age {sum(ages) / max(len(ages), 1):5.2f} ms avg / {max(ages, default=0):5.2f} ms max "
+          f"({'kernel' if stats['kernel_timestamps'] else 'dequeue'} timestamps), "
+          f"{stats['frames_superseded']} superseded")
+
+
+def bench_opencv(device, seconds):
+    import cv2
+
+    camera = cv2.VideoCapture(device, cv2.CAP_FFMPEG)
+    if not camera.isOpened():
+        camera = cv2.VideoCapture(device)
+    frames = 0
+    cpu = time.thread_time()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        ret, image = camera.read()
+        if not ret:
+            continue
+        # What the processor would get from the cv2 path.
+        cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        frames += 1
+    cpu = time.thread_time() - cpu
+    camera.release()
+    print(f"opencv: {frames / seconds:6.1f} fps, {1000 * cpu / max(frames, 1):5.2f} ms cpu/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--buffers", type=int, default=2)
+    args = parser.parse_args()
+
+    bench_v4l2(args.device, args.seconds, args.buffers)
+    bench_opencv(args.device, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
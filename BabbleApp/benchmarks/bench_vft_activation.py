@@ -0,0 +1,92 @@
+"""
+Time ViveTracker activation against a simulated extension unit, the previous
+sequence (hot spin polling, fixed 0.25 s sleeps) against the current one.
+
+Reported are wall time, CPU time and the number of GET_CUR polls. The register
+writes reaching the device are compared between both, pings aside, so this
+doubles as a check that activation still configures the sensor the same way.
+
+    python benchmarks/bench_vft_activation.py [--latency-ms 2] [--switch-ms 100]
+"""
+
+import argparse
+import ctypes
+import os
+import sys
+import time
+from timeit import default_timer as timer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vivefacialtracker.mock_xu import MockViveTracker, MockXuDevice
+from vivefacialtracker.vivetracker import SENSOR_REGISTERS, ViveTracker
+
+
+class LegacyTracker(MockViveTracker):
+    """The handshake and activation sequence before the XU command rework."""
+
+    def _set_cur(self, command, timeout=0.5, retry_mismatch=False):
+        self._bufferSend[:len(command)] = command
+        self._xu_set_cur(2, self._bufferSend)
+        lenbuf = len(self._bufferReceive)
+        stime = timer()
+        while True:
+            self._bufferReceive[:] = (ctypes.c_uint8 * lenbuf)(0)
+            self._xu_get_cur(2, self._bufferReceive)
+            self.xu_polls += 1
+            if self._bufferReceive[0] == 0x56:
+                if self._bufferReceive[1:17] == self._bufferSend[0:16]:
+                    return
+                raise Exception("response not matching command")
+            elif self._bufferReceive[0] != 0x55:
+                raise Exception("invalid response")
+            if timer() - stime > timeout:
+                raise Exception("timeout")
+
+    def _activate_tracker(self):
+        start = timer()
+        self._set_cur(self._dataTest)
+        self._set_enable_stream(False)
+        time.sleep(0.25)
+        self._set_cur(self._dataTest)
+        for address, value in SENSOR_REGISTERS:
+            self._set_register_sensor(address, value)
+        self._set_cur(self._dataTest)
+        self._set_enable_stream(True)
+        time.sleep(0.25)
+        self.activation_ms = (timer() - start) * 1000
+
+
+def run(name, tracker_class, latency, switch):
+    device = MockXuDevice(command_latency=latency, stream_switch=switch)
+    cpu = time.process_time()
+    try:
+        tracker = tracker_class(device)
+    except Exception as e:
+        print(f"{name:>7}: failed, {e}")
+        return None
+    cpu = time.process_time() - cpu
+    print(f"{name:>7}: {tracker.activation_ms:7.1f} ms, {cpu * 1000:7.1f} ms cpu, "
+          f"{device.get_cur_calls:6d} polls, streaming={device.streaming}")
+    tracker.dispose()
+    return [command for command in device.commands if command[:2] != bytes((0x51, 0x52))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2, help="time the device takes per command")
+    parser.add_argument("--switch-ms", type=float, default=100, help="time the device is busy switching the stream")
+    args = parser.parse_args()
+    latency, switch = args.latency_ms / 1000, args.switch_ms / 1000
+
+    legacy = run("legacy", LegacyTracker, latency, switch)
+    current = run("current", MockViveTracker, latency, switch)
+    if legacy is None or current is None:
+        return
+    if legacy != current:
+        print("MISMATCH: the device received different commands")
+        sys.exit(1)
+    print(f"same {len(current)} commands sent")
+
+
+if __name__ == "__main__":
+    main()
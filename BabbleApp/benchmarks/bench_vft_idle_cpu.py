@@ -0,0 +1,108 @@
+"""
+CPU cost of the Windows Vive Facial Tracker capture loop, polling against
+callback driven delivery, with a simulated DirectShow sample grabber.
+
+The simulated grabber has a streaming thread producing 400x400 YUYV samples
+at --fps (0 is a connected camera delivering nothing) and calls BufferCB the
+way DirectShow does. "poll" is the previous loop, grab_frame() plus a 1 ms
+sleep with BufferCB only passing on requested samples. "event" passes every
+sample on and the loop waits on FTCamera.Terminator. Frames are decoded to
+luma in both, so the difference is the loop itself.
+
+    python benchmarks/bench_vft_idle_cpu.py [--seconds 5] [--fps 0 60]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vivefacialtracker.camera import FTCamera, decode_yuyv_luma, grabber_yuyv
+
+WIDTH = 400
+HEIGHT = 400
+
+
+class SimulatedGrabber:
+    """Stands in for FilterGraph plus SampleGrabberYUV2."""
+
+    def __init__(self, fps: float, callback, poll: bool):
+        self.fps = fps
+        self.callback = callback
+        self.poll = poll
+        # Only requested samples are passed on when polling.
+        self.keep_photo = not poll
+        self.frames = 0
+        self._sample = np.random.default_rng(0).integers(0, 255, (HEIGHT, WIDTH, 2), dtype=np.uint8)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._stream, daemon=True)
+
+    def run(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def grab_frame(self):
+        self.keep_photo = True
+
+    def BufferCB(self):
+        if self.keep_photo:
+            if self.poll:
+                self.keep_photo = False
+            self.frames += 1
+            self.callback(np.moveaxis(self._sample, 0, 1))
+
+    def _stream(self):
+        while not self._stop.wait(1 / self.fps if self.fps else None):
+            self.BufferCB()
+
+
+def measure(name, fps, seconds, loop):
+    luma = np.empty((HEIGHT, WIDTH), np.uint8)
+    grabber = SimulatedGrabber(fps, lambda frame: decode_yuyv_luma(grabber_yuyv(frame), luma), name == "poll")
+    terminator = FTCamera.Terminator()
+    threading.Timer(seconds, terminator.terminate).start()
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    grabber.run()
+    loop(grabber, terminator)
+    elapsed = time.perf_counter() - start
+    grabber.stop()
+    cpu = time.process_time() - cpu
+    print(f"{name:>5} @ {fps:4.0f} fps: {100 * cpu / elapsed:5.1f}% of a core, "
+          f"{grabber.frames / elapsed:5.1f} frames/s delivered")
+
+
+def poll_loop(grabber, terminator):
+    # The previous FTCamera.read() on Windows.
+    while not terminator.terminate_requested:
+        grabber.grab_frame()
+        time.sleep(0.001)
+
+
+def event_loop(grabber, terminator):
+    # FTCamera.read() on Windows now.
+    while not terminator.wait():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=float, nargs="+", default=[0, 60])
+    args = parser.parse_args()
+
+    for fps in args.fps:
+        measure("poll", fps, args.seconds, poll_loop)
+        measure("event", fps, args.seconds, event_loop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Time the YUYV decode of a Vive Facial Tracker frame, previous implementation
+against the kernels in vivefacialtracker.camera, for both capture layouts.
+
+    python benchmarks/bench_yuv422_decode.py [--width 400] [--height 400] [--frames 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from check_yuv422_decode import reference_linux, reference_windows
+from vivefacialtracker.camera import decode_yuyv_luma, decode_yuyv_yuv444, grabber_yuyv
+
+
+def timed(step, frames) -> float:
+    step()
+    start = time.perf_counter()
+    for _ in range(frames):
+        step()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=400)
+    parser.add_argument("--height", type=int, default=400)
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    pixels = args.width * args.height
+    raw = np.random.default_rng(0).integers(0, 255, pixels * 2, dtype=np.uint8)
+    frame = raw.tobytes()
+    grabbed = np.moveaxis(raw.reshape(args.height, args.width, 2), 0, 1)
+    merge = np.empty([pixels, 3], np.uint8)
+    luma = np.empty([args.height, args.width], np.uint8)
+
+    steps = (
+        ("linux old", lambda: reference_linux(frame, pixels)),
+        ("linux yuv444", lambda: decode_yuyv_yuv444(np.frombuffer(frame, np.uint8), merge)),
+        ("linux luma", lambda: decode_yuyv_luma(np.frombuffer(frame, np.uint8), luma)),
+        ("windows old", lambda: reference_windows(grabbed, pixels)),
+        ("windows yuv444", lambda: decode_yuyv_yuv444(grabber_yuyv(grabbed), merge)),
+        ("windows luma", lambda: decode_yuyv_luma(grabber_yuyv(grabbed), luma)),
+    )
+    for name, step in steps:
+        print(f"{name:>15}: {timed(step, args.frames):6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Check that a frame from FTCameraController.get_image() survives the read
+process lapping the shared frame ring.
+
+One frame is taken and held while the ring is written round several times and
+newer frames are read, as with a slow or pipelined processor or the raw
+preview. The held frame must not change. The view read() hands out is checked
+too, it is expected to be overwritten.
+
+    python benchmarks/check_ft_frame_ring.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.frame_ring import FRAME_RING_SLOTS, SharedFrameRing
+from vivefacialtracker.camera_controller import FT_FRAME_BYTES, FTCameraController
+
+SHAPE = (400, 400)
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full(SHAPE, value, np.uint8)
+
+
+def main():
+    ring = SharedFrameRing.create(FT_FRAME_BYTES)
+    controller = FTCameraController(0)
+    controller._ring = ring
+    try:
+        ring.write(frame(1), time.perf_counter_ns())
+        held = controller.get_image()
+        expected = held.copy()
+        ring.write(frame(2), time.perf_counter_ns())
+        view, _, _ = ring.read(1)
+        # The consumer keeps reading newer frames meanwhile, so neither slot is held by it any more.
+        for value in range(3, 3 + 3 * FRAME_RING_SLOTS):
+            ring.write(frame(value), time.perf_counter_ns())
+            controller.get_image()
+        assert np.array_equal(held, expected), "frame from get_image() changed while it was held"
+        print("get_image() frame intact after", 3 * FRAME_RING_SLOTS, "writes")
+        overwritten = not np.all(view == 2)
+        print("read() view", "overwritten" if overwritten else "intact", "(only valid until the ring is lapped)")
+    finally:
+        del held, view
+        controller._ring = None
+        ring.unlink()
+        ring.close()
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
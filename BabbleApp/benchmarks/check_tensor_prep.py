@@ -0,0 +1,56 @@
+"""
+Check TensorPrep against the to_tensor()/unsqueeze() path it replaces in
+run_model(), for frames at and off the model input size, and that filling
+the input tensor allocates nothing.
+
+    python benchmarks/check_tensor_prep.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.image_transforms as transforms
+from babble_model_loader import MODEL_INPUT_SIZE
+from utils.image_transforms import TensorPrep
+
+SIZES = ((MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), (400, 400), (640, 480))
+
+
+def reference(image: np.ndarray) -> np.ndarray:
+    if image.shape != (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE):
+        image = cv2.resize(image, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE))
+    return transforms.unsqueeze(transforms.to_tensor(image), 0)
+
+
+def allocated(step) -> int:
+    step()
+    tracemalloc.start()
+    step()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    failed = False
+    prep = TensorPrep(MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)
+    for width, height in SIZES:
+        image = np.random.default_rng(width).integers(0, 255, (height, width), dtype=np.uint8)
+        expected = reference(image)
+        tensor = prep(image)
+        # x * (1 / 255) and x / 255 can be an ulp apart.
+        ok = tensor.shape == expected.shape and np.allclose(tensor, expected, rtol=0, atol=1e-6)
+        bytes_allocated = allocated(lambda: prep(image))
+        # Anything the size of the input would be a copy or a temporary.
+        failed |= not ok or bytes_allocated >= MODEL_INPUT_SIZE * MODEL_INPUT_SIZE
+        print(f"{width}x{height}: {'ok' if ok else 'MISMATCH'}, {bytes_allocated} bytes allocated")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Check the YUYV decode kernels of vivefacialtracker.camera against the previous
+FTCamera._decode_yuv422 implementations, for the Linux byte buffer and the
+axis swapped Windows grabber frame, and that decoding allocates nothing.
+
+    python benchmarks/check_yuv422_decode.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vivefacialtracker.camera import decode_yuyv_luma, decode_yuyv_yuv444, grabber_yuyv
+
+SIZES = ((400, 400), (640, 480), (32, 8))
+
+
+def reference_linux(frame: bytes, pixel_count: int) -> np.ndarray:
+    arr_data = np.frombuffer(frame, dtype=np.uint8)
+    arr_merge = np.zeros([pixel_count, 3], dtype=np.uint8)
+    arr_merge[:, 0] = np.array(arr_data[0::2])
+    arr_c2 = np.array(arr_data[1::4])
+    arr_c3 = np.array(arr_data[3::4])
+    arr_merge[0:pixel_count:2, 1] = arr_c2
+    arr_merge[1:pixel_count:2, 1] = arr_c2
+    arr_merge[0:pixel_count:2, 2] = arr_c3
+    arr_merge[1:pixel_count:2, 2] = arr_c3
+    return arr_merge
+
+
+def reference_windows(frame: np.ndarray, pixel_count: int) -> np.ndarray:
+    arr_merge = np.zeros([pixel_count, 3], dtype=np.uint8)
+    arr_merge[:, 0] = frame[:, :, 0].ravel(order='F')
+    arr_c2 = np.array(frame[:, :, 1:].ravel(order='F')[0::2])
+    arr_c3 = np.array(frame[:, :, 1:].ravel(order='F')[1::2])
+    arr_merge[0:pixel_count:2, 1] = arr_c2
+    arr_merge[1:pixel_count:2, 1] = arr_c2
+    arr_merge[0:pixel_count:2, 2] = arr_c3
+    arr_merge[1:pixel_count:2, 2] = arr_c3
+    return arr_merge
+
+
+def allocated(step) -> int:
+    step()
+    tracemalloc.start()
+    step()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    failed = False
+    for width, height in SIZES:
+        pixels = width * height
+        raw = np.random.default_rng(width).integers(0, 255, pixels * 2, dtype=np.uint8)
+        # What BufferCB hands over: the sample buffer with its axes swapped.
+        grabbed = np.moveaxis(raw.reshape(height, width, 2), 0, 1)
+        merge = np.empty([pixels, 3], np.uint8)
+        luma = np.empty([height, width], np.uint8)
+
+        layouts = (
+            ("linux", lambda: np.frombuffer(raw.tobytes(), np.uint8), reference_linux(raw.tobytes(), pixels)),
+            ("windows", lambda: grabber_yuyv(grabbed), reference_windows(grabbed, pixels)),
+        )
+        for name, data, expected in layouts:
+            yuyv = data()
+            decode_yuyv_yuv444(yuyv, merge)
+            decode_yuyv_luma(yuyv, luma)
+            ok = np.array_equal(merge, expected) and np.array_equal(luma.ravel(), expected[:, 0])
+            bytes_allocated = allocated(lambda: (decode_yuyv_yuv444(yuyv, merge), decode_yuyv_luma(yuyv, luma)))
+            # Anything frame sized would be a copy or a temporary.
+            failed |= not ok or bytes_allocated >= pixels
+            print(f"{name:>7} {width}x{height}: {'ok' if ok else 'MISMATCH'}, {bytes_allocated} bytes allocated")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
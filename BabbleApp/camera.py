@@ -11,13 +11,21 @@ from enum import Enum
 import serial.tools.list_ports
 from colorama import Fore
 from config import BabbleConfig, BabbleSettingsConfig
-from PIL import Image
-from io import BytesIO
-from utils.misc_utils import get_camera_index_by_name, list_camera_names, os_type
+from utils.misc_utils import os_type
+from utils.device_registry import device_registry
+from serial_reader import SerialReader
+from mjpeg_stream import MjpegStream, is_mjpeg_url
+from udp_source import UdpFrameSource, is_udp_url
+from replay_source import ReplaySource, is_replay_source
+from v4l2_capture import V4l2Capture, is_v4l2_source, v4l2_index
+from utils.frame_mailbox import FrameMailbox
+from utils.jpeg_decode import JpegDecoder
+from babble_model_loader import MODEL_INPUT_SIZE
 
 from vivefacialtracker.vivetracker import ViveTracker
 from vivefacialtracker.camera_controller import FTCameraController
 from classes.etvr.PB_ComboAPI import onConfigUpdate
+from classes.etvr.visualizer import Visualizer
 
 
 
@@ -50,28 +58,42 @@ class Camera:
         camera_status_outgoing: "queue.Queue[CameraState]",
         camera_output_outgoing: "queue.Queue(maxsize=2)",
         settings: BabbleSettingsConfig,
+        frame_mailbox: "FrameMailbox | None" = None,
+        raw_visualizer: "Visualizer | None" = None,
     ):
         self.camera_status = CameraState.CONNECTING
         self.config = config
         self.settings = settings
         self.camera_index = camera_index
-        self.camera_list = list_camera_names()
+        self.camera_list = device_registry.names()
         self.camera_status_outgoing = camera_status_outgoing
         self.camera_output_outgoing = camera_output_outgoing
         self.capture_event = capture_event
+        self.frame_mailbox = frame_mailbox
+        # Streams camera_output_outgoing as the raw preview while the mailbox feeds the processor.
+        self.raw_visualizer = raw_visualizer
         self.cancellation_event = cancellation_event
         self.current_capture_source = config.capture_source
         self.cv2_camera: "cv2.VideoCapture" = None
         self.vft_camera: FTCameraController = None
 
         self.serial_connection = None
+        self.serial_reader: SerialReader = None
+        self.mjpeg_stream: MjpegStream = None
+        self.udp_source: UdpFrameSource = None
+        self.replay_source: ReplaySource = None
+        self.v4l2_camera: V4l2Capture = None
+        # Device that V4L2 can't stream from (no usable format), it goes through OpenCV instead.
+        self.v4l2_unsupported = None
+        self.jpeg_decoder = JpegDecoder(MODEL_INPUT_SIZE, MAX_RESOLUTION)
         self.last_frame_time = time.time()
         self.fps = 0
         self.bps = 0
         self.start = True
-        self.buffer = b""
         self.frame_number = 0
         self.FRAME_SIZE = [0, 0]
+        self.last_preview_ns = 0
+        self.frames_cropped = 0
 
         self.error_message = f'{Fore.YELLOW}[WARN] info.enterCaptureOne {{}} info.enterCaptureTwo{Fore.RESET}'
 
@@ -82,8 +104,11 @@ class Camera:
         self.current_capture_source = self.config.capture_source # Why tf does this need to localised like this!??! ight np. It bothers me that both is used
 
     def __del__(self):
-        if self.serial_connection is not None:
-            self.serial_connection.close()
+        self.stop_serial_connection()
+        self.stop_mjpeg_stream()
+        self.stop_udp_source()
+        self.stop_replay_source()
+        self.stop_v4l2_capture()
 
     def set_output_queue(self, camera_output_outgoing: "queue.Queue"):
         self.camera_output_outgoing = camera_output_outgoing
@@ -96,6 +121,7 @@ class Camera:
                 )
                 if self.vft_camera is not None:
                     self.vft_camera.close()
+                self.__del__()
                 return
             should_push = True
             # If things aren't open, retry until they are. Don't let read requests come in any earlier
@@ -105,15 +131,45 @@ class Camera:
                 and self.config.capture_source != ""
             ):
                 self.current_capture_source = self.config.capture_source
+                isReplay = is_replay_source(self.config.capture_source)
                 isSerial = any(x in str(self.config.capture_source) for x in PORTS)
+                isMjpeg = self.config.use_native_mjpeg and is_mjpeg_url(self.config.capture_source)
+                isUdp = is_udp_url(self.config.capture_source)
+                isV4l2 = (
+                    os_type == "Linux"
+                    and self.config.use_v4l2
+                    and is_v4l2_source(self.config.capture_source)
+                    and self.config.capture_source != self.v4l2_unsupported
+                )
                 
-                if isSerial:
+                if isReplay:
+                    if self.cv2_camera is not None:
+                        self.cv2_camera.release()
+                        self.cv2_camera = None
+                    if self.vft_camera is not None:
+                        self.vft_camera.close()
+                    self.device_is_vft = False
+                    self.stop_serial_connection()
+                    self.stop_mjpeg_stream()
+                    self.stop_udp_source()
+                    self.stop_v4l2_capture()
+                    if (
+                        self.replay_source is None
+                        or self.replay_source.failed
+                        or self.replay_source.url != self.config.capture_source
+                    ):
+                        self.start_replay_source(self.config.capture_source)
+                elif isSerial:
                     if self.cv2_camera is not None:
                         self.cv2_camera.release()
                         self.cv2_camera = None
                     if self.vft_camera is not None:
                         self.vft_camera.close()
                     self.device_is_vft = False
+                    self.stop_mjpeg_stream()
+                    self.stop_udp_source()
+                    self.stop_replay_source()
+                    self.stop_v4l2_capture()
                     if (
                         self.serial_connection is None
                         or self.camera_status == CameraState.DISCONNECTED
@@ -122,10 +178,42 @@ class Camera:
                         port = self.config.capture_source
                         self.current_capture_source = port
                         self.start_serial_connection(port)
+                elif isMjpeg:
+                    if self.cv2_camera is not None:
+                        self.cv2_camera.release()
+                        self.cv2_camera = None
+                    if self.vft_camera is not None:
+                        self.vft_camera.close()
+                    self.device_is_vft = False
+                    self.stop_serial_connection()
+                    self.stop_udp_source()
+                    self.stop_replay_source()
+                    self.stop_v4l2_capture()
+                    if self.mjpeg_stream is None or self.mjpeg_stream.url != self.config.capture_source:
+                        self.start_mjpeg_stream(self.config.capture_source)
+                elif isUdp:
+                    if self.cv2_camera is not None:
+                        self.cv2_camera.release()
+                        self.cv2_camera = None
+                    if self.vft_camera is not None:
+                        self.vft_camera.close()
+                    self.device_is_vft = False
+                    self.stop_serial_connection()
+                    self.stop_mjpeg_stream()
+                    self.stop_replay_source()
+                    self.stop_v4l2_capture()
+                    if (
+                        self.udp_source is None
+                        or self.udp_source.failed
+                        or self.udp_source.url != self.config.capture_source
+                    ):
+                        self.start_udp_source(self.config.capture_source)
                 elif ViveTracker.is_device_vive_tracker(self.config.capture_source):
                     if self.cv2_camera is not None:
                         self.cv2_camera.release()
                         self.cv2_camera = None
+                    self.stop_replay_source()
+                    self.stop_v4l2_capture()
                     self.device_is_vft = True
 
                     if self.vft_camera is None:
@@ -135,7 +223,9 @@ class Camera:
                             return
                         try:
                             # Only create the camera once, reuse it
-                            self.vft_camera = FTCameraController(get_camera_index_by_name(self.config.capture_source))
+                            self.vft_camera = FTCameraController(
+                                device_registry.index_of(self.config.capture_source), self.config.vft_luma_only
+                            )
                             self.vft_camera.open()
                             should_push = False
                         except Exception:
@@ -147,11 +237,29 @@ class Camera:
                         if (not self.vft_camera.is_open):
                             self.vft_camera.open()
                             should_push = False
+                elif isV4l2:
+                    if self.cv2_camera is not None:
+                        self.cv2_camera.release()
+                        self.cv2_camera = None
+                    if self.vft_camera is not None:
+                        self.vft_camera.close()
+                    self.device_is_vft = False
+                    self.stop_serial_connection()
+                    self.stop_mjpeg_stream()
+                    self.stop_udp_source()
+                    self.stop_replay_source()
+                    if (
+                        self.v4l2_camera is None
+                        or self.camera_status == CameraState.DISCONNECTED
+                        or self.v4l2_camera.index != v4l2_index(self.config.capture_source)
+                    ):
+                        self.start_v4l2_capture(self.config.capture_source)
+                        should_push = False
                 elif (
                         self.cv2_camera is None
                         or not self.cv2_camera.isOpened()
                         or self.camera_status == CameraState.DISCONNECTED
-                        #or get_camera_index_by_name(self.config.capture_source) != self.current_capture_source 
+                        #or device_registry.index_of(self.config.capture_source) != self.current_capture_source 
                         or self.config.capture_source != self.current_capture_source 
                     ):
                         if self.vft_camera is not None:
@@ -163,11 +271,13 @@ class Camera:
                         # firmware. Fickle things.
                         if self.cancellation_event.wait(WAIT_TIME):
                             return
+                        # The registry follows hotplug, so a camera plugged in after start up is found too.
+                        self.camera_list = device_registry.names()
                         if self.config.capture_source not in self.camera_list:
                             self.current_capture_source = self.config.capture_source
                             # print("correct") 
                         else:
-                            self.current_capture_source = get_camera_index_by_name(self.config.capture_source)
+                            self.current_capture_source = device_registry.index_of(self.config.capture_source)
                             # print("wrong2") 
 
                         if self.config.use_ffmpeg or True: # FFS, took a shit of of prints to find that this requires ffmpeg for some unknown reason
@@ -206,13 +316,31 @@ class Camera:
             # Assuming we can access our capture source, wait for another thread to request a capture.
             # Cycle every so often to see if our cancellation token has fired. This basically uses a
             # python event as a context-less, resettable one-shot channel.
-            if should_push and not self.capture_event.wait(timeout=0.02): # BLock until requested flag??? this is probs a big limition. talking from UDP on ETVR experience
+            # With the latest-frame mailbox there is nothing to wait for, capture runs at sensor rate.
+            if should_push and self.frame_mailbox is None and not self.capture_event.wait(timeout=0.02):
                 # print(f"run loop done. Should push: {should_push}")
                 continue
             # print(f"TEST: {self.config}")
             if self.config.capture_source is not None:
-                if isSerial:
+                if isReplay:
+                    if self.replay_source is not None:
+                        self.get_jpeg_camera_picture(self.replay_source, should_push)
+                    elif self.cancellation_event.wait(WAIT_TIME):
+                        return
+                elif isSerial:
                     self.get_serial_camera_picture(should_push)
+                elif isMjpeg:
+                    self.get_jpeg_camera_picture(self.mjpeg_stream, should_push)
+                elif isUdp:
+                    if self.udp_source is not None:
+                        self.get_jpeg_camera_picture(self.udp_source, should_push)
+                    elif self.cancellation_event.wait(WAIT_TIME):
+                        return
+                elif isV4l2:
+                    if self.v4l2_camera is not None:
+                        self.get_v4l2_camera_picture(should_push)
+                    elif self.cancellation_event.wait(WAIT_TIME):
+                        return
                 else:
                     self.__del__()
                     self.get_camera_picture(should_push)
@@ -231,14 +359,18 @@ class Camera:
                 image = self.vft_camera.get_image()
                 if image is None:
                     return
+                # Stamped by the read process when the frame arrived, perf_counter_ns is system wide.
+                capture_ns = self.vft_camera.last_capture_ns
                 self.frame_number = self.frame_number + 1
             elif self.cv2_camera is not None and self.cv2_camera.isOpened():
-                ret, image = self.cv2_camera.read()     # MJPEG Stream reconnects are currently limited by the hard coded 30 second timeout time on VideoCapture.read(). We can get around this by recompiling OpenCV or using a custom MJPEG stream imp.   
+                ret, image = self.cv2_camera.read()     # MJPEG Stream reconnects are currently limited by the hard coded 30 second timeout time on VideoCapture.read(). HTTP streams go through MjpegStream instead unless use_native_mjpeg is off.   
+                capture_ns = time.perf_counter_ns()
                 if not ret:
                     self.cv2_camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     # print("No frame detected")
                     raise RuntimeError("error.frame")
-                self.frame_number = self.cv2_camera.get(cv2.CAP_PROP_POS_FRAMES) + 1
+                # Live cameras report no position, count frames ourselves so the sequence id keeps increasing.
+                self.frame_number = self.frame_number + 1
             else:
                 # Switching from a Vive Facial Tracker to a CV2 camera
                 return
@@ -256,7 +388,7 @@ class Camera:
             # print("Got frame!")
             if should_push:
                 # print("frame pushed")
-                self.push_image_to_queue(image, self.frame_number, self.fps)
+                self.push_image_to_queue(image, self.frame_number, self.fps, capture_ns)
         except Exception:
             FTCameraController._logger.exception("get_image")
             print(
@@ -265,85 +397,107 @@ class Camera:
             self.camera_status = CameraState.DISCONNECTED
             pass
 
-    def get_next_packet_bounds(self):
-        beg = -1
-        while beg == -1:
-            self.buffer += self.serial_connection.read(2048)
-            beg = self.buffer.find(b"\xff\xd8\xff")
-        # Discard any data before the frame header.
-        if beg > 0:
-            self.buffer = self.buffer[beg:]
-            beg = 0
-        end = -1
-        while end == -1:
-            self.buffer += self.serial_connection.read(128)
-            end = self.buffer.find(b"\xff\xd9")
-        return beg, end
-
-    def get_next_jpeg_frame(self):
-        beg, end = self.get_next_packet_bounds()
-        jpeg = self.buffer[beg: end + 2]
-        self.buffer = self.buffer[end + 2 :]
-        return jpeg
-
     def get_serial_camera_picture(self, should_push):
-        conn = self.serial_connection
+        reader = self.serial_reader
         # Stop spamming "Serial capture source problem" if connection is lost
-        if conn is None or self.camera_status == CameraState.DISCONNECTED:
+        if reader is None or self.camera_status == CameraState.DISCONNECTED:
             return
-        try:
-            if conn.in_waiting:
-                jpeg = self.get_next_jpeg_frame()
-                if jpeg:
-                    # Create jpeg frame from byte string
-                    try:
-                        image = np.array(Image.open(BytesIO(jpeg)))
-                    except Exception:
-                        print(
-                            f'{Fore.YELLOW}[WARN] warn.frameDrop{Fore.RESET}'
-                        )
-                        return
-                    # Calculate FPS
-                    current_frame_time = time.time()    # Should be using "time.perf_counter()", not worth ~3x cycles?
-                    delta_time = current_frame_time - self.last_frame_time
-                    self.last_frame_time = current_frame_time
-                    current_fps = 1 / delta_time if delta_time > 0 else 0
-                    # Exponential moving average (EMA). ~1100ns savings, delicious..
-                    self.fps = 0.02 * current_fps + 0.98 * self.fps
-                    self.bps = len(jpeg) * self.fps
-
-                    if should_push:
-                        self.push_image_to_queue(image, int(current_fps), self.fps)
-                # Discard the serial buffer. This is due to the fact that it,
-                # may build up some outdated frames. A bit of a workaround here tbh.
-                # Do this at the end to give buffer time to refill.
-                if conn.in_waiting >= BUFFER_SIZE:
-                    print(f'{Fore.CYAN}[INFO] info.discardingSerial ({conn.in_waiting} bytes){Fore.RESET}')
-                    conn.reset_input_buffer()
-                    self.buffer = b""
+        if reader.failed:
+            self.stop_serial_connection()
+            self.camera_status = CameraState.DISCONNECTED
+            return
+        self.get_jpeg_camera_picture(reader, should_push)
+
+    def get_jpeg_camera_picture(self, source, should_push):
+        # Serial and MJPEG sources run their own reader, so this is always the newest frame.
+        frame = source.take(timeout=WAIT_TIME)
+        if frame is None:
+            return
+        # Stamped by the reader when the last byte arrived, not when we got around to it.
+        jpeg, frame_number, capture_ns = frame[:3]
+        # A replayed session can come cut down to the ROI already, as (frame size, roi).
+        cut = frame[3] if len(frame) > 3 else None
+        # Replayed video comes decoded already.
+        image = jpeg if isinstance(jpeg, np.ndarray) else self.decode_jpeg(jpeg, cut is None)
+        if image is None:
+            print(
+                f'{Fore.YELLOW}[WARN] warn.frameDrop{Fore.RESET}'
+            )
+            return
+        source.frames_decoded += 1
+        self.frame_number = frame_number
+        self.FRAME_SIZE = image.shape
+        # Calculate FPS
+        current_frame_time = time.time()    # Should be using "time.perf_counter()", not worth ~3x cycles?
+        delta_time = current_frame_time - self.last_frame_time
+        self.last_frame_time = current_frame_time
+        current_fps = 1 / delta_time if delta_time > 0 else 0
+        # Exponential moving average (EMA). ~1100ns savings, delicious..
+        self.fps = 0.02 * current_fps + 0.98 * self.fps
+        self.bps = (jpeg.nbytes if isinstance(jpeg, np.ndarray) else len(jpeg)) * self.fps
+
+        if should_push:
+            if cut is not None:
+                (frame_w, frame_h), roi = cut
+                crop = ((frame_h, frame_w) + image.shape[2:], roi)
+                self.push_cropped_to_queue(image, self.frame_number, self.fps, capture_ns, crop)
+                return
+            # Decoded JPEGs may come smaller than the frame they stand for.
+            frame_size = None if isinstance(jpeg, np.ndarray) else self.jpeg_decoder.frame_size
+            self.push_image_to_queue(image, self.frame_number, self.fps, capture_ns, frame_size)
 
+    def get_v4l2_camera_picture(self, should_push):
+        # Luma straight out of the driver's buffer, already at the clamped size.
+        roi_size = (self.config.roi_window_w, self.config.roi_window_h)
+        try:
+            frame = self.v4l2_camera.read(WAIT_TIME, roi_size, color=self.settings.gui_use_red_channel)
         except Exception:
             print(
-                f'{Fore.YELLOW}[WARN] info.serialCapture{Fore.RESET}'
+                f'{Fore.YELLOW}[WARN] warn.captureProblem{Fore.RESET}'
             )
-            conn.close()
+            self.stop_v4l2_capture()
             self.camera_status = CameraState.DISCONNECTED
-            pass
+            return
+        if frame is None:
+            return
+        image, self.frame_number, capture_ns = frame
+        self.FRAME_SIZE = image.shape
+        # Calculate FPS
+        current_frame_time = time.time()    # Should be using "time.perf_counter()", not worth ~3x cycles?
+        delta_time = current_frame_time - self.last_frame_time
+        self.last_frame_time = current_frame_time
+        current_fps = 1 / delta_time if delta_time > 0 else 0
+        # Exponential moving average (EMA). ~1100ns savings, delicious..
+        self.fps = 0.02 * current_fps + 0.98 * self.fps
+        self.bps = image.nbytes * self.fps
+
+        if should_push:
+            self.push_image_to_queue(image, self.frame_number, self.fps, capture_ns, self.v4l2_camera.frame_size)
+
+    def decode_jpeg(self, jpeg, whole_frame: bool = True):
+        # Gray and DCT-downscaled straight out of the decoder. The red channel option still needs color.
+        # A frame that is only the ROI already is scaled down as a whole.
+        roi_size = (self.config.roi_window_w, self.config.roi_window_h) if whole_frame else None
+        try:
+            return self.jpeg_decoder.decode(jpeg, roi_size, color=self.settings.gui_use_red_channel)
+        except Exception:
+            return None
 
     def start_serial_connection(self, port):
         if self.serial_connection is not None and self.serial_connection.is_open:
             # Do nothing. The connection is already open on this port.
-            if self.serial_connection.port == port:
+            if self.serial_connection.port == port and not self.serial_reader.failed:
                 return
             # Otherwise, close the connection before trying to reopen.
-            self.serial_connection.close()
+            self.stop_serial_connection()
         com_ports = [tuple(p) for p in list(serial.tools.list_ports.comports())]
         # Do not try connecting if no such port i.e. device was unplugged.
         if not any(p for p in com_ports if port in p):
             return
         try:
             rate = 115200 if sys.platform == "darwin" else 3000000  # Higher baud rate not working on macOS
-            conn = serial.Serial(baudrate=rate, port=port, xonxoff=False, dsrdtr=False, rtscts=False)
+            # The timeout lets the reader thread notice a stop request when the device goes quiet.
+            conn = serial.Serial(baudrate=rate, port=port, xonxoff=False, dsrdtr=False, rtscts=False, timeout=WAIT_TIME)
             # Set explicit buffer size for serial. This function is Windows only!
             if os_type == 'Windows':
                 conn.set_buffer_size(rx_size=BUFFER_SIZE, tx_size=BUFFER_SIZE)
@@ -352,6 +506,8 @@ class Camera:
                 f'{Fore.CYAN}[INFO] info.ETVRConnected {port}{Fore.RESET}'
             )
             self.serial_connection = conn
+            self.serial_reader = SerialReader(conn)
+            self.serial_reader.start()
             self.camera_status = CameraState.CONNECTED
         except Exception as e:
             print(
@@ -360,7 +516,143 @@ class Camera:
             print(e)
             self.camera_status = CameraState.DISCONNECTED
 
-    def clamp_max_res(self, image: MatLike) -> MatLike:
+    def stop_serial_connection(self):
+        if self.serial_reader is not None:
+            self.serial_reader.stop()
+            self.serial_reader = None
+        if self.serial_connection is not None:
+            self.serial_connection.close()
+            self.serial_connection = None
+
+    def start_mjpeg_stream(self, url):
+        self.stop_mjpeg_stream()
+        self.mjpeg_stream = MjpegStream(
+            url,
+            reconnect_delay=self.config.mjpeg_reconnect_ms / 1000,
+            read_timeout=self.config.mjpeg_timeout_ms / 1000,
+        )
+        self.mjpeg_stream.start()
+        self.current_capture_source = url
+        self.camera_status = CameraState.CONNECTED
+
+    def stop_mjpeg_stream(self):
+        if self.mjpeg_stream is not None:
+            self.mjpeg_stream.stop()
+            self.mjpeg_stream = None
+
+    def start_udp_source(self, url):
+        self.stop_udp_source()
+        try:
+            self.udp_source = UdpFrameSource(url, read_timeout=WAIT_TIME)
+            self.udp_source.start()
+            print(
+                f'{Fore.CYAN}[INFO] info.udpListening {url}{Fore.RESET}'
+            )
+            self.current_capture_source = url
+            self.camera_status = CameraState.CONNECTED
+        except Exception as e:
+            print(
+                f'{Fore.YELLOW}[WARN] info.udpCapture {url}{Fore.RESET}'
+            )
+            print(e)
+            self.udp_source = None
+            self.camera_status = CameraState.DISCONNECTED
+
+    def stop_udp_source(self):
+        if self.udp_source is not None:
+            self.udp_source.stop()
+            self.udp_source = None
+
+    def start_replay_source(self, source):
+        self.stop_replay_source()
+        try:
+            self.replay_source = ReplaySource.from_capture_source(source)
+            self.replay_source.start()
+            print(
+                f'{Fore.CYAN}[INFO] info.replayStarted {source}{Fore.RESET}'
+            )
+            self.current_capture_source = source
+            self.camera_status = CameraState.CONNECTED
+        except Exception as e:
+            print(
+                f'{Fore.YELLOW}[WARN] info.replayCapture {source}{Fore.RESET}'
+            )
+            print(e)
+            self.replay_source = None
+            self.camera_status = CameraState.DISCONNECTED
+
+    def stop_replay_source(self):
+        if self.replay_source is not None:
+            self.replay_source.stop()
+            self.replay_source = None
+
+    def start_v4l2_capture(self, source):
+        self.stop_v4l2_capture()
+        print(self.error_message.format(source))
+        # Same settle time the OpenCV path gives the camera firmware.
+        if self.cancellation_event.wait(WAIT_TIME):
+            return
+        camera = V4l2Capture(
+            v4l2_index(source),
+            self.jpeg_decoder,
+            buffer_count=self.config.v4l2_buffer_count,
+            width=self.settings.gui_cam_resolution_x,
+            height=self.settings.gui_cam_resolution_y,
+            fps=self.settings.gui_cam_framerate,
+        )
+        try:
+            camera.open()
+        except Exception as e:
+            # No usable mode, or the driver turned us down somewhere along the way. Either
+            # way OpenCV gets a go at it, it knows more cameras than we do.
+            print(
+                f'{Fore.YELLOW}[WARN] info.v4l2Unsupported {source}{Fore.RESET}'
+            )
+            print(e)
+            self.v4l2_unsupported = source
+            return
+        print(
+            f'{Fore.CYAN}[INFO] info.v4l2Connected {source} {camera.pixel_format} {camera.width}x{camera.height}{Fore.RESET}'
+        )
+        self.v4l2_camera = camera
+        self.current_capture_source = source
+        self.camera_status = CameraState.CONNECTED
+
+    def stop_v4l2_capture(self):
+        if self.v4l2_camera is not None:
+            self.v4l2_camera.close()
+            self.v4l2_camera = None
+
+    def get_stats(self) -> dict:
+        stats = {
+            "fps": self.fps,
+            "bps": self.bps,
+            "frame_number": self.frame_number,
+            "frames_cropped": self.frames_cropped,
+            "devices": device_registry.get_stats(),
+        }
+        if self.serial_reader is not None:
+            stats["serial"] = self.serial_reader.get_stats()
+            stats["serial"]["decode_factor"] = self.jpeg_decoder.factor
+        if self.mjpeg_stream is not None:
+            stats["mjpeg"] = self.mjpeg_stream.get_stats()
+            stats["mjpeg"]["decode_factor"] = self.jpeg_decoder.factor
+        if self.v4l2_camera is not None:
+            stats["v4l2"] = self.v4l2_camera.get_stats()
+        if self.vft_camera is not None and self.device_is_vft:
+            stats["vft"] = self.vft_camera.get_stats()
+        if self.udp_source is not None:
+            stats["udp"] = self.udp_source.get_stats()
+            stats["udp"]["decode_factor"] = self.jpeg_decoder.factor
+        if self.replay_source is not None:
+            stats["replay"] = self.replay_source.get_stats()
+            stats["replay"]["decode_factor"] = self.jpeg_decoder.factor
+        return stats
+
+    def clamp_max_res(self, image: MatLike, frame_size=None) -> MatLike:
+        if frame_size is not None:
+            # Decoded at another size than the frame stands for, see JpegDecoder.
+            return cv2.resize(image, frame_size)
         shape = image.shape
         max_value = np.max(shape)
         if max_value > MAX_RESOLUTION:
@@ -373,7 +665,98 @@ class Camera:
         else: return image
 
 
-    def push_image_to_queue(self, image, frame_number, fps):
+    def crop_to_roi(self, image, frame_size=None):
+        """
+        Cut the configured ROI out of a full resolution frame.
+
+        ROI coordinates are in clamp_max_res() pixels, so they are scaled to the
+        source first. frame_size is the (w, h) of those pixels when the image was
+        decoded at another size. The region is shrunk to the ROI's clamped size, or
+        smaller when that is still at least MODEL_INPUT_SIZE on each side, but never
+        enlarged, the processor's warp does any scaling up. Returns
+        (roi_image, (frame_shape, roi)) or None if the whole frame has to go.
+
+        A frame decoded smaller than frame_size is always cut here, only this knows
+        what its pixels stand for. Without an ROI it is passed on whole.
+        """
+        config = self.config
+        height, width = image.shape[:2]
+        if frame_size is None:
+            scale = min(MAX_RESOLUTION / max(width, height), 1.0)
+            frame_w, frame_h = (int(width * scale), int(height * scale)) if scale < 1.0 else (width, height)
+        else:
+            frame_w, frame_h = frame_size
+            scale = frame_w / width
+        reduced = scale > 1.0
+        roi_w, roi_h = int(config.roi_window_w), int(config.roi_window_h)
+        roi_x, roi_y = int(config.roi_window_x), int(config.roi_window_y)
+        if roi_w <= 0 or roi_h <= 0 or roi_x < 0 or roi_y < 0:
+            if not reduced:
+                return None
+            roi_x, roi_y, roi_w, roi_h = 0, 0, frame_w, frame_h
+        elif not config.roi_first_capture and not reduced:
+            return None
+        # Clipped the same way slicing in BabbleProcessor.capture_crop_rotate_image() would.
+        x1, y1 = min(roi_x + roi_w, frame_w), min(roi_y + roi_h, frame_h)
+        if x1 <= roi_x or y1 <= roi_y:
+            return None
+        out_w, out_h = x1 - roi_x, y1 - roi_y
+        region = image[
+            int(roi_y / scale) : int(np.ceil(y1 / scale)),
+            int(roi_x / scale) : int(np.ceil(x1 / scale)),
+        ]
+        shrink = max(MODEL_INPUT_SIZE / out_w, MODEL_INPUT_SIZE / out_h)
+        if shrink < 1.0:
+            out_w, out_h = max(round(out_w * shrink), 1), max(round(out_h * shrink), 1)
+        if region.shape[0] > out_h and region.shape[1] > out_w:
+            region = cv2.resize(region, (out_w, out_h))
+        frame_shape = (frame_h, frame_w) + image.shape[2:]
+        return region, (frame_shape, (roi_x, roi_y, x1 - roi_x, y1 - roi_y))
+
+    def raw_preview_active(self) -> bool:
+        """Whether anyone streams the raw preview, only then does the queue get frames in mailbox mode."""
+        return self.raw_visualizer is None or self.raw_visualizer.subscribers > 0
+
+    def push_cropped_to_queue(self, image, frame_number, fps, capture_ns, crop):
+        # Cut down to the ROI before it got here, there is no whole frame for the raw preview.
+        if self.frame_mailbox is not None:
+            self.frame_mailbox.put((image, frame_number, fps, capture_ns, crop))
+            self.frames_cropped += 1
+            return
+        self.camera_output_outgoing.put((image, frame_number, fps, capture_ns, crop))
+        self.capture_event.clear()
+
+    def push_image_to_queue(self, image, frame_number, fps, capture_ns, frame_size=None):
+        # Frames travel as (image, frame_number, fps, capture_ns, crop). capture_ns is
+        # time.perf_counter_ns() when the frame came off the source, later stages compare against it.
+        # crop is (full frame shape, (x, y, w, h)) when the image is already cut down to the ROI.
+        if self.frame_mailbox is not None:
+            cropped = self.crop_to_roi(image, frame_size)
+            if cropped is not None:
+                roi_image, crop = cropped
+                self.frame_mailbox.put((roi_image, frame_number, fps, capture_ns, crop))
+                self.frames_cropped += 1
+                # Only the preview wants the whole frame, and it doesn't need every one.
+                if not self.raw_preview_active():
+                    return
+                if capture_ns - self.last_preview_ns < 1_000_000_000 // max(self.config.raw_preview_fps, 1):
+                    return
+                image = self.clamp_max_res(image, frame_size)
+            else:
+                image = self.clamp_max_res(image, frame_size)
+                self.frame_mailbox.put((image, frame_number, fps, capture_ns, None))
+                if not self.raw_preview_active():
+                    return
+            self.last_preview_ns = capture_ns
+            # The queue only feeds the raw preview in this mode, keep just the newest frames around.
+            if self.camera_output_outgoing.qsize() > 1:
+                try:
+                    self.camera_output_outgoing.get_nowait()
+                except queue.Empty:
+                    pass
+            self.camera_output_outgoing.put((image, frame_number, fps, capture_ns, None))
+            return
+        image = self.clamp_max_res(image, frame_size)
         # If there's backpressure, just yell. We really shouldn't have this unless we start getting
         # some sort of capture event conflict though.
         qsize = self.camera_output_outgoing.qsize()
@@ -381,5 +764,5 @@ class Camera:
             print(
                 f'{Fore.YELLOW}[WARN] warn.backpressure1 {qsize}. warn.backpressure2{Fore.RESET}'
             )
-        self.camera_output_outgoing.put((self.clamp_max_res(image), frame_number, fps))
-        self.capture_event.clear()
\ No newline at end of file
+        self.camera_output_outgoing.put((image, frame_number, fps, capture_ns, None))
+        self.capture_event.clear()
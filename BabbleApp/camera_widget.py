@@ -8,11 +8,11 @@ import os
 from babble_processor import BabbleProcessor, CamInfoOrigin
 from camera import Camera, CameraState, MAX_RESOLUTION
 from config import BabbleConfig
+from utils.frame_mailbox import FrameMailbox
+from utils.device_registry import device_registry
 from osc import Tab
 from utils.misc_utils import (
     playSound,
-    list_camera_names,
-    get_camera_index_by_name,
     bg_color_highlight,
     bg_color_clear,
     is_valid_int_input
@@ -27,7 +27,7 @@ class CameraWidget:
         self.settings_config = main_config.settings
         self.config = main_config.cam # Bruh wtf is this. I get that they wanted to split it into smaller configs. but just calling this as "config" is confusing
         self.settings = main_config.settings
-        self.camera_list = list_camera_names()
+        self.camera_list = device_registry.names()
         self.maybe_image = None
         if self.cam_id == Tab.CAM:
             self.config = main_config.cam
@@ -41,6 +41,9 @@ class CameraWidget:
         self.cancellation_event.set()
         self.capture_event = Event()
         self.capture_queue = Queue(maxsize=10)
+        # Latest-frame handoff lets capture run at sensor rate. Without it the processor requests
+        # every frame through capture_event, kept around so both can be compared.
+        self.frame_mailbox = FrameMailbox() if self.settings.gui_latest_frame_handoff else None
         self.image_queue = Queue(maxsize=500) # This is needed to prevent the UI from freezing during widget changes. (Alex: doens't work when camera disconnected. I'm still mad)
 
 
@@ -54,6 +57,7 @@ class CameraWidget:
             self.image_queue,
             self.cam_id,
             self.osc_queue,
+            self.frame_mailbox,
         )
 
         self.camera_status_queue = Queue(maxsize=2)
@@ -65,6 +69,8 @@ class CameraWidget:
             self.camera_status_queue,
             self.capture_queue,
             self.settings,
+            self.frame_mailbox,
+            self.babble_cnn.raw_visualizer,
         )
 
         self.x0, self.y0 = None, None
@@ -82,6 +88,12 @@ class CameraWidget:
         self.bps = round(0.02 * next_bps + 0.98 * self.bps)
         return f"{self.bps * 0.001 * 0.001 * 8:.3f} Mbps"
 
+    def get_stats(self):
+        return {
+            "camera": self.camera.get_stats(),
+            "processor": self.babble_cnn.get_stats(),
+        }
+
     def started(self):
         return not self.cancellation_event.is_set()
 
@@ -18,8 +18,9 @@ onConfigUpdate: Signal = Signal("When the client want the backend to reload conf
 
 
 class PB_ComboAPI:
-    def __init__(self, babbleCam, thread_manager: ThreadManager):
+    def __init__(self, babbleCam, thread_manager: ThreadManager, osc=None):
         self.thread_manager = thread_manager;
+        self.osc = osc
         self.running: bool = False
         self.router: APIRouter = APIRouter()
         self.babbleCam = babbleCam;
@@ -35,6 +36,12 @@ class PB_ComboAPI:
     async def processed_feed(self):
         return self.babbleCam.babble_cnn.processed_visualizer.video_feed(self.thread_manager.cancellation_event)
     
+    async def stats(self):
+        stats = self.babbleCam.get_stats()
+        if self.osc is not None:
+            stats["osc"] = self.osc.get_stats()
+        return stats
+
     async def startCalibration(self, caliSamples: Optional[int] = None):
         if caliSamples is not None:
             try:
@@ -90,6 +97,14 @@ class PB_ComboAPI:
             methods=["GET"],
         )
 
+        self.router.add_api_route(
+            name="Get capture and processing statistics",
+            tags=["streaming"],
+            path="/camera/stats",
+            endpoint=self.stats,
+            methods=["GET"],
+        )
+
         self.router.add_api_route(
             name="Start babble calibration",
             tags=["calibration"],
@@ -15,15 +15,24 @@ class Visualizer:
         self.image_queue: Queue = image_queue
         self.running: bool = True
         self.shutdownToken: threading.Event | None = None
+        # Clients streaming right now, producers can skip preview work without any.
+        self.subscribers: int = 0
+        self._subscribers_lock = threading.Lock()
 
     def gen_frame(self):
-        while self.running and not self.shutdownToken.is_set():
-            try:
-                frame = self.image_queue.get(timeout=1)[0]
-            except Exception:
-                frame = OFLINE_IMAGE
-            ret, frame = cv2.imencode(".jpg", frame)
-            yield (b"--frame\r\n" b"Content-Type: image/jpeg\r\n\r\n" + bytearray(frame) + b"\r\n")
+        with self._subscribers_lock:
+            self.subscribers += 1
+        try:
+            while self.running and not self.shutdownToken.is_set():
+                try:
+                    frame = self.image_queue.get(timeout=1)[0]
+                except Exception:
+                    frame = OFLINE_IMAGE
+                ret, frame = cv2.imencode(".jpg", frame)
+                yield (b"--frame\r\n" b"Content-Type: image/jpeg\r\n\r\n" + bytearray(frame) + b"\r\n")
+        finally:
+            with self._subscribers_lock:
+                self.subscribers -= 1
 
     def video_feed(self, shutdownToken: threading.Event) -> StreamingResponse:
         self.shutdownToken = shutdownToken
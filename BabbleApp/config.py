@@ -21,6 +21,14 @@ class BabbleCameraConfig(BaseModel):
     gui_vertical_flip: bool = False
     gui_horizontal_flip: bool = False
     use_ffmpeg: bool = False
+    use_native_mjpeg: bool = True
+    mjpeg_reconnect_ms: int = 250
+    mjpeg_timeout_ms: int = 500
+    use_v4l2: bool = False
+    v4l2_buffer_count: int = 2
+    vft_luma_only: bool = True
+    roi_first_capture: bool = True
+    raw_preview_fps: int = 15
 
 
 class BabbleSettingsConfig(BaseModel):
@@ -42,7 +50,14 @@ class BabbleSettingsConfig(BaseModel):
     gui_use_gpu: bool = False
     gui_gpu_index: int = 0
     gui_inference_threads: int = 2
+    gui_preprocess_in_model: bool = True
+    gui_io_binding: bool = True
+    gui_pipeline_depth: int = 0
     gui_use_red_channel: bool = False
+    gui_latest_frame_handoff: bool = True
+    gui_record_session: bool = False
+    gui_record_directory: str = "Recordings"
+    gui_record_queue_size: int = 64
     calib_deadzone: float = -0.1
     calib_array: str = (
         "[[0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],[1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1]]"
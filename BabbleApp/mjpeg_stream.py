@@ -0,0 +1,239 @@
+import http.client
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from colorama import Fore
+from utils.frame_mailbox import FrameMailbox
+
+MJPEG_BUFFER_SIZE = 262144
+MJPEG_READ_SIZE = 16384
+HEADER_END = b"\r\n\r\n"
+
+
+def is_mjpeg_url(capture_source) -> bool:
+    return str(capture_source).startswith(("http://", "https://"))
+
+
+class MultipartParser:
+    """
+    Incremental multipart/x-mixed-replace parser.
+
+    Like JpegFramer, data is read into one preallocated buffer and parts are
+    returned as memoryview slices that are only valid until the next fill().
+    Parts with a Content-Length header are cut by length, otherwise by searching
+    for the next boundary.
+    """
+
+    FIND_BOUNDARY = 0
+    HEADERS = 1
+    BODY = 2
+
+    def __init__(self, boundary: bytes, capacity: int = MJPEG_BUFFER_SIZE):
+        self.delimiter = b"--" + boundary
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0
+        self._tail = 0
+        self._scan = 0
+        self._state = self.FIND_BOUNDARY
+        self._length = -1
+        self.overflows = 0
+
+    def fill(self, stream, size: int = MJPEG_READ_SIZE) -> int:
+        if self._capacity - self._tail < size and self._head > 0:
+            pending = self._tail - self._head
+            self._view[0:pending] = self._view[self._head:self._tail]
+            self._scan -= self._head
+            self._tail = pending
+            self._head = 0
+        if self._tail == self._capacity:
+            # A part larger than the buffer, drop it and resync on the next boundary.
+            self.overflows += 1
+            self._head = self._tail = self._scan = 0
+            self._state = self.FIND_BOUNDARY
+        size = min(size, self._capacity - self._tail)
+        # readinto1() returns whatever arrived, readinto() would wait for the whole view.
+        n = stream.readinto1(self._view[self._tail:self._tail + size])
+        if not n:
+            raise ConnectionError("stream closed")
+        self._tail += n
+        return n
+
+    def next_part(self) -> "memoryview | None":
+        buffer = self._buffer
+        while True:
+            if self._state == self.FIND_BOUNDARY:
+                index = buffer.find(self.delimiter, self._scan, self._tail)
+                if index < 0:
+                    self._head = self._scan = max(self._head, self._tail - len(self.delimiter) + 1)
+                    return None
+                self._head = self._scan = index + len(self.delimiter)
+                self._state = self.HEADERS
+            if self._state == self.HEADERS:
+                index = buffer.find(HEADER_END, self._scan, self._tail)
+                if index < 0:
+                    self._scan = max(self._scan, self._tail - len(HEADER_END) + 1)
+                    return None
+                self._length = self._content_length(self._head, index)
+                self._head = self._scan = index + len(HEADER_END)
+                self._state = self.BODY
+            if self._length >= 0:
+                end = self._head + self._length
+                if end > self._tail:
+                    return None
+            else:
+                end = buffer.find(b"\r\n" + self.delimiter, self._scan, self._tail)
+                if end < 0:
+                    self._scan = max(self._scan, self._tail - len(self.delimiter) - 1)
+                    return None
+            part = self._view[self._head:end]
+            self._head = self._scan = end
+            self._state = self.FIND_BOUNDARY
+            if len(part):
+                return part
+
+    def _content_length(self, start: int, end: int) -> int:
+        for line in bytes(self._view[start:end]).split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return -1
+        return -1
+
+
+class MjpegStream:
+    """
+    Streams an MJPEG-over-HTTP camera on its own thread and keeps only the newest JPEG.
+
+    One connection is kept open for as long as frames arrive. If nothing arrives
+    for read_timeout seconds or the connection drops, it reconnects after
+    reconnect_delay seconds instead of waiting out OpenCV's 30 second timeout.
+    Frames go into a FrameMailbox, the same way SerialReader hands them over.
+    """
+
+    def __init__(self, url: str, reconnect_delay: float = 0.25, read_timeout: float = 0.5):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.read_timeout = read_timeout
+        self.mailbox = FrameMailbox()
+        self.connected = False
+        self.reconnects = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self._batch_superseded = 0
+        self.jitter = 0.0
+        self.frame_interval = 0.0
+        self._last_frame_time = None
+        self._connection: "http.client.HTTPConnection | None" = None
+        self._stop_event = threading.Event()
+        self._thread: "threading.Thread | None" = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="MjpegStreamThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        connection = self._connection
+        if connection is not None:
+            # Unblocks a pending read.
+            connection.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def take(self, timeout: float):
+        """Return the newest (jpeg, frame_number, capture_ns) that has not been taken yet, or None."""
+        return self.mailbox.take(timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "bytes_received": self.bytes_received,
+            "frames_received": self.frames_received,
+            "frames_superseded": self._batch_superseded + self.mailbox.superseded,
+            "frames_decoded": self.frames_decoded,
+            "frame_interval_ms": self.frame_interval * 1000,
+            "jitter_ms": self.jitter * 1000,
+        }
+
+    def _connect(self):
+        url = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(url.hostname, url.port, timeout=self.read_timeout)
+        self._connection = connection
+        path = url.path or "/"
+        if url.query:
+            path += "?" + url.query
+        connection.request("GET", path, headers={"Connection": "keep-alive"})
+        connection.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        response = connection.getresponse()
+        if response.status != 200:
+            raise ConnectionError(f"HTTP {response.status}")
+        content_type = response.getheader("Content-Type", "")
+        boundary = None
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "boundary":
+                boundary = value.strip('"')
+        if not boundary:
+            raise ConnectionError(f"not a multipart stream: {content_type}")
+        if boundary.startswith("--"):
+            boundary = boundary[2:]
+        return response, MultipartParser(boundary.encode())
+
+    def _frame_arrived(self):
+        # Interarrival jitter, smoothed like RFC 3550 does it.
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            if self.frame_interval:
+                self.jitter += (abs(interval - self.frame_interval) - self.jitter) / 16
+                self.frame_interval += (interval - self.frame_interval) / 16
+            else:
+                self.frame_interval = interval
+        self._last_frame_time = now
+        self.frames_received += 1
+
+    def run(self):
+        first = True
+        while not self._stop_event.is_set():
+            if not first:
+                self.reconnects += 1
+                if self._stop_event.wait(self.reconnect_delay):
+                    break
+            first = False
+            try:
+                response, parser = self._connect()
+                self.connected = True
+                while not self._stop_event.is_set():
+                    self.bytes_received += parser.fill(response)
+                    latest = None
+                    while True:
+                        part = parser.next_part()
+                        if part is None:
+                            break
+                        if latest is not None:
+                            self._batch_superseded += 1
+                        latest = part
+                        self._frame_arrived()
+                    if latest is not None:
+                        self.mailbox.put((bytes(latest), self.frames_received, time.perf_counter_ns()))
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    print(
+                        f'{Fore.YELLOW}[WARN] info.mjpegReconnect {self.url} ({e}){Fore.RESET}'
+                    )
+            finally:
+                self.connected = False
+                self._last_frame_time = None
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
@@ -1,5 +1,5 @@
 import numpy as np
-from time import time
+from time import perf_counter
 
 
 def smoothing_factor(t_e, cutoff):
@@ -22,16 +22,22 @@ class OneEuroFilter:
         # Previous values.
         self.x_prev = x0.astype(float)
         self.dx_prev = np.full(x0.shape, dx0)
-        self.t_prev = time()
+        self.t_prev = perf_counter()
 
-    def __call__(self, x):
-        """Compute the filtered signal."""
+    def __call__(self, x, t=None):
+        """
+        Compute the filtered signal.
+
+        t is the sample time in seconds on the time.perf_counter() clock. Pass the
+        capture time so processing jitter isn't mistaken for motion, it defaults to now.
+        """
         # assert x.shape == self.data_shape
         x.shape == self.data_shape
 
-        t = time()
+        if t is None:
+            t = perf_counter()
         t_e = t - self.t_prev
-        if t_e != 0.0:  # occasionally when switching to algos this becomes zero causing divide by zero errors crashing the filter.
+        if t_e > 0.0:  # occasionally when switching to algos this becomes zero causing divide by zero errors crashing the filter. Samples that aren't newer are ignored.
             t_e = np.full(x.shape, t_e)
 
             # The filtered derivative of the signal.
@@ -50,3 +56,4 @@ class OneEuroFilter:
             self.t_prev = t
 
             return x_hat
+        return self.x_prev
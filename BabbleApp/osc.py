@@ -8,6 +8,7 @@ from config import BabbleConfig
 import traceback
 import math
 import os
+from utils.latency import LatencyStats
 
 class Tab(IntEnum):
     CAM = 0
@@ -17,9 +18,17 @@ class Tab(IntEnum):
 
 import numpy as np
 
-def delay_output_osc(array, delay_seconds, self):
+# Latencies reported by VRChatOSC.get_stats(), as (name, from stamp, to stamp).
+OSC_STAGES = (
+    ("osc_queue", "output", "osc"),
+    ("capture_to_osc", "capture", "osc"),
+)
+
+def delay_output_osc(array, delay_seconds, self, cam_info=None):
     time.sleep(delay_seconds)
     output_osc(array, self)
+    if cam_info is not None:
+        self.record_sent(cam_info)
 
 def output_osc(array, self):
     location = self.config.gui_osc_location
@@ -91,6 +100,19 @@ class VRChatOSC:
         self.cancellation_event = cancellation_event
         self.msg_queue = msg_queue
         self.cam = Tab.CAM
+        self.last_frame_number = None
+        self.latency = LatencyStats()
+
+    def record_sent(self, cam_info):
+        cam_info.timestamps["osc"] = time.perf_counter_ns()
+        self.last_frame_number = cam_info.frame_number
+        self.latency.record_stamps(cam_info.timestamps, OSC_STAGES)
+
+    def get_stats(self) -> dict:
+        return {
+            "frame_number": self.last_frame_number,
+            "latency": self.latency.get_stats(),
+        }
 
     def run(self):
         while True:
@@ -110,9 +132,10 @@ class VRChatOSC:
             delay_enable = self.config.gui_osc_delay_enable
             delay_seconds = self.config.gui_osc_delay_seconds
             if delay_enable:
-                threading.Thread(target=delay_output_osc, args=(cam_info.output, delay_seconds, self)).start() 
+                threading.Thread(target=delay_output_osc, args=(cam_info.output, delay_seconds, self, cam_info)).start() 
             else:
                 output_osc(cam_info.output, self)
+                self.record_sent(cam_info)
 
 
 class VRChatOSCReceiver:
@@ -0,0 +1,231 @@
+import glob
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qsl
+import cv2
+from colorama import Fore
+from utils.frame_archive import is_frame_archive, iter_frame_archive
+from utils.session_recorder import SESSION_CROP_COLUMNS
+from utils.frame_mailbox import FrameMailbox
+
+REPLAY_SCHEME = "replay://"
+REPLAY_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+# recorded: at the timestamps the frames were captured at (fixed fps where there are none)
+# fps:      at a fixed rate
+# fast:     as fast as Camera takes them, without losing any
+REPLAY_PACING = ("recorded", "fps", "fast")
+REPLAY_DEFAULT_FPS = 30.0
+
+
+def replay_image_files(path: str) -> "list[str]":
+    return sorted(
+        f for f in glob.glob(os.path.join(path, "*"))
+        if f.lower().endswith(REPLAY_IMAGE_SUFFIXES)
+    )
+
+
+def is_replay_source(capture_source) -> bool:
+    """replay://, a frame archive or a directory of images. Any other directory is left alone."""
+    source = str(capture_source)
+    if source.startswith(REPLAY_SCHEME) or is_frame_archive(source):
+        return True
+    return os.path.isdir(source) and len(replay_image_files(source)) > 0
+
+
+def parse_replay_source(capture_source) -> "tuple[str, dict]":
+    """
+    Split replay://<path>?pace=fps&fps=60&loop=1&drop=0.05&jitter_ms=4&seed=1 into the
+    path and ReplaySource keyword arguments. A bare directory or archive path has no options.
+    """
+    source = str(capture_source)
+    if not source.startswith(REPLAY_SCHEME):
+        return source, {}
+    path, _, query = source[len(REPLAY_SCHEME):].partition("?")
+    options = {}
+    for key, value in parse_qsl(query):
+        if key == "pace":
+            options["pace"] = value
+        elif key == "loop":
+            options["loop"] = value.lower() in ("1", "true", "yes")
+        elif key == "seed":
+            options["seed"] = int(value)
+        elif key in ("fps", "drop", "jitter_ms"):
+            options[key] = float(value)
+    return path, options
+
+
+class ReplaySource:
+    """
+    Plays back a video file, a directory of images or a frame archive as if it were a camera.
+
+    Frames go into a FrameMailbox like the live sources. Images and archived
+    JPEGs are handed over as encoded bytes, so Camera decodes them the same way
+    it decodes a serial or MJPEG camera. Video frames are decoded here. capture_ns
+    is when the frame was handed over, so latency downstream is measured as live.
+    Frame numbers count dropped frames too, which leaves the same gaps a lossy
+    transport would. Frames of a recorded session that the camera had cut down
+    to the ROI carry their (frame size, roi), Camera doesn't crop them again.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pace: str = "recorded",
+        fps: float = 0,
+        loop: bool = False,
+        drop: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: "int | None" = None,
+    ):
+        if pace not in REPLAY_PACING:
+            raise ValueError(f"unknown replay pacing {pace!r}, expected one of {REPLAY_PACING}")
+        self.url = url
+        self.path, _ = parse_replay_source(url)
+        self.pace = pace
+        self.fps = fps
+        self.loop = loop
+        self.drop = drop
+        self.jitter = jitter_ms / 1000
+        self.mailbox = FrameMailbox()
+        self.failed = False
+        self.finished = False
+        self.passes = 0
+        self.frames_read = 0
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.late = 0.0
+        self._random = random.Random(seed)
+        self._taken = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: "threading.Thread | None" = None
+
+    @classmethod
+    def from_capture_source(cls, capture_source) -> "ReplaySource":
+        _, options = parse_replay_source(capture_source)
+        return cls(str(capture_source), **options)
+
+    def start(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        self._thread = threading.Thread(target=self.run, name="ReplaySourceThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        self._taken.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def take(self, timeout: float):
+        """Return the newest (jpeg or image, frame_number, capture_ns, crop) that has not been taken yet, or None."""
+        frame = self.mailbox.take(timeout)
+        if frame is not None:
+            self._taken.set()
+        return frame
+
+    def get_stats(self) -> dict:
+        return {
+            "pace": self.pace,
+            "passes": self.passes,
+            "finished": self.finished,
+            "frames_read": self.frames_read,
+            "frames_received": self.frames_received,
+            "frames_superseded": self.mailbox.superseded,
+            "frames_decoded": self.frames_decoded,
+            "frames_dropped": self.frames_dropped,
+            "late_ms": self.late * 1000,
+        }
+
+    def _frames(self):
+        """
+        One pass over the input as (jpeg bytes or image, recorded time in seconds
+        or None, crop or None). crop is (frame size, roi) for frames a recorded
+        session has already cut down to the ROI, see SessionRecorder.
+        """
+        if is_frame_archive(self.path):
+            for jpeg, _, capture_ns, frame_size, roi in iter_frame_archive(self.path, SESSION_CROP_COLUMNS):
+                crop = None
+                if roi is not None and roi[2] > 0 and roi[3] > 0:
+                    crop = (tuple(int(v) for v in frame_size), tuple(int(v) for v in roi))
+                yield jpeg, capture_ns / 1e9, crop
+        elif os.path.isdir(self.path):
+            for file in replay_image_files(self.path):
+                with open(file, "rb") as f:
+                    yield f.read(), None, None
+        elif self.path.lower().endswith(REPLAY_IMAGE_SUFFIXES):
+            with open(self.path, "rb") as f:
+                image = f.read()
+            yield image, None, None
+        else:
+            video = cv2.VideoCapture(self.path)
+            if not video.isOpened():
+                raise RuntimeError(f"can't open {self.path}")
+            if not self.fps:
+                self.fps = video.get(cv2.CAP_PROP_FPS) or 0
+            try:
+                while True:
+                    ret, image = video.read()
+                    if not ret:
+                        return
+                    yield image, video.get(cv2.CAP_PROP_POS_MSEC) / 1000, None
+            finally:
+                video.release()
+
+    def _wait_until(self, due: float) -> bool:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            return not self._stop_event.wait(delay)
+        self.late = max(self.late, -delay)
+        return not self._stop_event.is_set()
+
+    def run(self):
+        frame_number = 0
+        try:
+            while not self._stop_event.is_set():
+                start = time.perf_counter()
+                first_recorded = None
+                index = 0
+                for payload, recorded, crop in self._frames():
+                    self.frames_read += 1
+                    frame_number += 1
+                    interval = 1 / (self.fps or REPLAY_DEFAULT_FPS)
+                    if self.pace == "recorded" and recorded is not None:
+                        if first_recorded is None:
+                            first_recorded = recorded
+                        due = start + recorded - first_recorded
+                    else:
+                        due = start + index * interval
+                    index += 1
+                    if self.drop and self._random.random() < self.drop:
+                        self.frames_dropped += 1
+                        continue
+                    if self.pace != "fast":
+                        if self.jitter:
+                            due += self._random.uniform(0, self.jitter)
+                        if not self._wait_until(due):
+                            return
+                    elif self._stop_event.is_set():
+                        return
+                    self._taken.clear()
+                    self.mailbox.put((payload, frame_number, time.perf_counter_ns(), crop))
+                    self.frames_received += 1
+                    if self.pace == "fast":
+                        # Nothing is lost, the next frame waits until this one was taken.
+                        while not self._taken.wait(0.1):
+                            if self._stop_event.is_set():
+                                return
+                self.passes += 1
+                if not self.loop or index == 0:
+                    self.finished = True
+                    return
+        except Exception as e:
+            if not self._stop_event.is_set():
+                print(
+                    f'{Fore.YELLOW}[WARN] info.replayCapture {self.url}{Fore.RESET}'
+                )
+                print(e)
+                self.failed = True
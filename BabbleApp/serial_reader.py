@@ -0,0 +1,82 @@
+import threading
+import time
+from colorama import Fore
+from utils.frame_mailbox import FrameMailbox
+from utils.jpeg_framer import JpegFramer
+
+SERIAL_READ_SIZE = 128
+
+
+class SerialReader:
+    """
+    Drains an ETVR serial port on its own thread and keeps only the newest JPEG.
+
+    The port is read all the time, whether or not anyone asked for a frame, so the
+    OS buffer never fills up with stale frames. Complete frames go into a
+    single-slot FrameMailbox; a frame that is replaced before it was taken counts
+    as superseded.
+    """
+
+    def __init__(self, serial_connection):
+        self.serial_connection = serial_connection
+        self.framer = JpegFramer()
+        self.mailbox = FrameMailbox()
+        self.failed = False
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self._batch_superseded = 0
+        self._stop_event = threading.Event()
+        self._thread: "threading.Thread | None" = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="SerialReaderThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def frames_superseded(self) -> int:
+        return self._batch_superseded + self.mailbox.superseded
+
+    def take(self, timeout: float):
+        """Return the newest (jpeg, frame_number, capture_ns) that has not been taken yet, or None."""
+        return self.mailbox.take(timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "bytes_received": self.bytes_received,
+            "frames_received": self.frames_received,
+            "frames_superseded": self.frames_superseded,
+            "frames_decoded": self.frames_decoded,
+            "discarded_bytes": self.framer.discarded_bytes,
+        }
+
+    def run(self):
+        conn = self.serial_connection
+        framer = self.framer
+        try:
+            while not self._stop_event.is_set():
+                self.bytes_received += framer.fill(conn, max(conn.in_waiting, SERIAL_READ_SIZE))
+                latest = None
+                while True:
+                    frame = framer.next_frame()
+                    if frame is None:
+                        break
+                    if latest is not None:
+                        # Several frames arrived in one read, only the last one is worth copying.
+                        self._batch_superseded += 1
+                    latest = frame
+                    self.frames_received += 1
+                if latest is not None:
+                    self.mailbox.put((bytes(latest), self.frames_received, time.perf_counter_ns()))
+        except Exception:
+            if not self._stop_event.is_set():
+                print(
+                    f'{Fore.YELLOW}[WARN] info.serialCapture{Fore.RESET}'
+                )
+                self.failed = True
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, IntEnum
 
 
@@ -18,3 +18,6 @@ class CamInfoOrigin(Enum):
 class CamInfo:
     info_type: CamInfoOrigin
     output: str
+    frame_number: int = 0
+    # Stage name -> time.perf_counter_ns(), starting with "capture".
+    timestamps: dict = field(default_factory=dict)
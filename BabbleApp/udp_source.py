@@ -0,0 +1,201 @@
+import socket
+import struct
+import threading
+import time
+from urllib.parse import urlsplit
+from colorama import Fore
+from utils.frame_mailbox import FrameMailbox
+
+# UDP frame transport:
+#  magic        (2 bytes) "\xff\xa2"
+#  frame id     (2 bytes, little endian, wraps around)
+#  chunk index  (1 byte)
+#  chunk count  (1 byte)
+#  payload      (rest of the datagram, a slice of the JPEG)
+UDP_MAGIC = b"\xff\xa2"
+UDP_HEADER = struct.Struct("<2sHBB")
+UDP_MAX_DATAGRAM = 65536
+UDP_RECEIVE_BUFFER = 1 << 20
+# Frames that may be assembled at the same time before the oldest is given up on.
+UDP_MAX_PENDING = 4
+# A frame id this far behind the last completed one is a restarted sender, not a late chunk.
+UDP_RESYNC_GAP = 64
+# Nor is anything behind it after this long without a completed frame.
+UDP_RESYNC_TIMEOUT_NS = 1_000_000_000
+
+
+def is_udp_url(capture_source) -> bool:
+    return str(capture_source).startswith("udp://")
+
+
+def frame_id_newer(a: int, b: int) -> bool:
+    """True if frame id a comes after b, allowing for wrap-around."""
+    return a != b and ((a - b) & 0xFFFF) < 0x8000
+
+
+class UdpFrameSource:
+    """
+    Receives chunked JPEG frames over UDP on its own thread and keeps only the newest.
+
+    Chunks are reassembled per frame id. A frame that is still missing chunks when
+    a newer frame completes is dropped rather than waited for, so a lost datagram
+    costs one frame instead of stalling the stream. Chunks for frames older than
+    the last completed one are late and discarded, unless they are far behind it or
+    nothing completed for a while, then the sender restarted its frame ids and
+    reassembly starts over from them.
+    """
+
+    def __init__(self, url: str, read_timeout: float = 0.5):
+        address = urlsplit(url)
+        self.url = url
+        self.address = (address.hostname or "0.0.0.0", address.port)
+        self.read_timeout = read_timeout
+        self.mailbox = FrameMailbox()
+        self.failed = False
+        self.datagrams = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self.frames_lost = 0
+        self.chunks_lost = 0
+        self.chunks_late = 0
+        self.chunks_reordered = 0
+        self.chunks_duplicate = 0
+        self.chunks_invalid = 0
+        self.resyncs = 0
+        self._pending: "dict[int, list]" = {}
+        self._last_complete: "int | None" = None
+        self._last_complete_ns = 0
+        self._last_chunk: "tuple[int, int] | None" = None
+        self._socket: "socket.socket | None" = None
+        self._stop_event = threading.Event()
+        self._thread: "threading.Thread | None" = None
+
+    def start(self):
+        self.resync()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+        self._socket.settimeout(self.read_timeout)
+        self._socket.bind(self.address)
+        self._thread = threading.Thread(target=self.run, name="UdpFrameSourceThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def take(self, timeout: float):
+        """Return the newest (jpeg, frame_number, capture_ns) that has not been taken yet, or None."""
+        return self.mailbox.take(timeout)
+
+    def get_stats(self) -> dict:
+        complete = self.frames_received + self.frames_lost
+        return {
+            "datagrams": self.datagrams,
+            "bytes_received": self.bytes_received,
+            "frames_received": self.frames_received,
+            "frames_superseded": self.mailbox.superseded,
+            "frames_decoded": self.frames_decoded,
+            "frames_lost": self.frames_lost,
+            "frame_loss": self.frames_lost / complete if complete else 0.0,
+            "chunks_lost": self.chunks_lost,
+            "chunks_late": self.chunks_late,
+            "chunks_reordered": self.chunks_reordered,
+            "chunks_duplicate": self.chunks_duplicate,
+            "chunks_invalid": self.chunks_invalid,
+            "resyncs": self.resyncs,
+        }
+
+    def resync(self):
+        """Forget the frames in flight and the last completed id, the next chunk starts afresh."""
+        self._pending.clear()
+        self._last_complete = None
+        self._last_chunk = None
+
+    def _drop(self, frame_id: int):
+        count, received, _ = self._pending.pop(frame_id)
+        self.frames_lost += 1
+        self.chunks_lost += count - received
+
+    def receive_datagram(self, datagram: memoryview):
+        """Feed one datagram to the reassembly, returns a completed frame or None."""
+        self.datagrams += 1
+        self.bytes_received += len(datagram)
+        if len(datagram) <= UDP_HEADER.size:
+            self.chunks_invalid += 1
+            return None
+        magic, frame_id, index, count = UDP_HEADER.unpack_from(datagram)
+        if magic != UDP_MAGIC or index >= count:
+            self.chunks_invalid += 1
+            return None
+        if self._last_complete is not None and not frame_id_newer(frame_id, self._last_complete):
+            if (
+                (self._last_complete - frame_id) & 0xFFFF <= UDP_RESYNC_GAP
+                and time.perf_counter_ns() - self._last_complete_ns < UDP_RESYNC_TIMEOUT_NS
+            ):
+                self.chunks_late += 1
+                return None
+            self.resyncs += 1
+            self.resync()
+        last_chunk = self._last_chunk
+        if last_chunk is not None and (
+            frame_id_newer(last_chunk[0], frame_id)
+            or (last_chunk[0] == frame_id and index < last_chunk[1])
+        ):
+            self.chunks_reordered += 1
+        self._last_chunk = (frame_id, index)
+
+        entry = self._pending.get(frame_id)
+        if entry is None:
+            if len(self._pending) >= UDP_MAX_PENDING:
+                oldest = next(iter(self._pending))
+                for pending_id in self._pending:
+                    if frame_id_newer(oldest, pending_id):
+                        oldest = pending_id
+                self._drop(oldest)
+            entry = self._pending[frame_id] = [count, 0, [None] * count]
+        if count != entry[0]:
+            self.chunks_invalid += 1
+            return None
+        chunks = entry[2]
+        if chunks[index] is not None:
+            self.chunks_duplicate += 1
+            return None
+        chunks[index] = bytes(datagram[UDP_HEADER.size:])
+        entry[1] += 1
+        if entry[1] < entry[0]:
+            return None
+
+        del self._pending[frame_id]
+        # Anything older that is still incomplete will never be shown, give up on it.
+        for pending_id in [i for i in self._pending if frame_id_newer(frame_id, i)]:
+            self._drop(pending_id)
+        self._last_complete = frame_id
+        self._last_complete_ns = time.perf_counter_ns()
+        self.frames_received += 1
+        return b"".join(chunks)
+
+    def run(self):
+        buffer = bytearray(UDP_MAX_DATAGRAM)
+        view = memoryview(buffer)
+        sock = self._socket
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    n = sock.recv_into(buffer)
+                except socket.timeout:
+                    continue
+                frame = self.receive_datagram(view[:n])
+                if frame is not None:
+                    self.mailbox.put((frame, self.frames_received, time.perf_counter_ns()))
+        except Exception:
+            if not self._stop_event.is_set():
+                print(
+                    f'{Fore.YELLOW}[WARN] info.udpCapture {self.url}{Fore.RESET}'
+                )
+                self.failed = True
@@ -0,0 +1,212 @@
+import ctypes
+import fnmatch
+import os
+import select
+import struct
+import threading
+import time
+from colorama import Fore
+from utils.misc_utils import (
+    get_camera_index_by_name,
+    is_uvc_device,
+    list_video_devices,
+    os_type,
+    probe_serial_port,
+    serial_port_candidates,
+)
+
+# inotify(7)
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+DEV_WATCH_MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+DEV_SERIAL_PATTERN = "tty[A-Za-z]*"
+DEV_VIDEO_PATTERN = "video*"
+# udev fixes up permissions just after a node shows up, give it a moment before probing.
+DEV_SETTLE_TIME = 0.2
+# Without a /dev watch, how old the cache may get before a lookup refreshes it.
+REFRESH_INTERVAL = 2.0
+
+
+class DeviceRegistry:
+    """
+    Enumerates cameras and serial ports once and keeps the result up to date.
+
+    On Linux a thread watches /dev with inotify and only looks at the nodes that
+    were added, removed or changed, so lookups never touch the hardware. On other
+    systems the cache is refreshed on lookup once it is older than
+    refresh_interval. Serial ports are only opened when they first show up,
+    instead of every port on every lookup.
+    """
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._video: "list[str]" = []
+        self._serial: "dict[str, bool]" = {}
+        self._lock = threading.RLock()
+        self._enumerated = False
+        self._last_refresh = 0.0
+        self._watch_fd = -1
+        self._stop_event = threading.Event()
+        self._thread: "threading.Thread | None" = None
+        self.enumeration_ms = 0.0
+        self.last_refresh_ms = 0.0
+        self.refreshes = 0
+        self.probes = 0
+
+    def names(self) -> "list[str]":
+        """Video devices followed by usable serial ports, like list_camera_names()."""
+        self._ensure_current()
+        with self._lock:
+            return self._video + sorted(port for port, ok in self._serial.items() if ok)
+
+    def index_of(self, name):
+        """get_camera_index_by_name() answered from the cached device list."""
+        return get_camera_index_by_name(name, self.names())
+
+    def __contains__(self, name) -> bool:
+        return name in self.names()
+
+    def refresh(self, full: bool = False):
+        """
+        Bring the cache up to date. Only new serial ports are probed unless full is
+        set, which also re-probes ports that could not be opened before.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if full or os_type != "Darwin":
+                # Listing is cheap everywhere but on macOS, where it opens every camera.
+                self._video = list(list_video_devices())
+            candidates = set(serial_port_candidates())
+            for port in list(self._serial):
+                if port not in candidates:
+                    del self._serial[port]
+            for port in candidates:
+                if full or port not in self._serial:
+                    self._probe(port)
+            self._last_refresh = time.monotonic()
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        self.refreshes += 1
+
+    def start(self):
+        """Enumerate and, on Linux, start watching /dev."""
+        with self._lock:
+            if self._enumerated:
+                return
+            self.refresh(full=True)
+            self.enumeration_ms = self.last_refresh_ms
+            self._enumerated = True
+        print(f'{Fore.CYAN}[INFO] info.deviceEnumeration {self.enumeration_ms:.0f} ms{Fore.RESET}')
+        if os_type == "Linux" and self._watch_dev():
+            self._thread = threading.Thread(target=self.run, name="DeviceRegistryThread", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        if self._watch_fd >= 0:
+            os.close(self._watch_fd)
+            self._watch_fd = -1
+
+    @property
+    def watching(self) -> bool:
+        return self._thread is not None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            devices = len(self._video) + sum(self._serial.values())
+        return {
+            "devices": devices,
+            "watching": self.watching,
+            "enumeration_ms": self.enumeration_ms,
+            "last_refresh_ms": self.last_refresh_ms,
+            "refreshes": self.refreshes,
+            "probes": self.probes,
+        }
+
+    def _ensure_current(self):
+        if not self._enumerated:
+            self.start()
+        elif not self.watching and time.monotonic() - self._last_refresh > self.refresh_interval:
+            self.refresh()
+
+    def _probe(self, port: str):
+        self.probes += 1
+        self._serial[port] = probe_serial_port(port)
+
+    def _watch_dev(self) -> bool:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                return False
+            if libc.inotify_add_watch(fd, b"/dev", DEV_WATCH_MASK) < 0:
+                os.close(fd)
+                return False
+        except (OSError, AttributeError):
+            return False
+        self._watch_fd = fd
+        return True
+
+    def _read_events(self) -> "set[str]":
+        data = os.read(self._watch_fd, 65536)
+        changed = set()
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if fnmatch.fnmatch(name, DEV_SERIAL_PATTERN) or fnmatch.fnmatch(name, DEV_VIDEO_PATTERN):
+                changed.add(name)
+        return changed
+
+    def _update(self, names: "set[str]"):
+        start = time.perf_counter()
+        with self._lock:
+            for name in names:
+                path = "/dev/" + name
+                exists = os.path.exists(path)
+                if fnmatch.fnmatch(name, DEV_VIDEO_PATTERN):
+                    if path in self._video:
+                        self._video.remove(path)
+                    if exists and is_uvc_device(path):
+                        self._video.append(path)
+                        self._video.sort()
+                elif exists:
+                    self._probe(path)
+                else:
+                    self._serial.pop(path, None)
+            self._last_refresh = time.monotonic()
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        self.refreshes += 1
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([self._watch_fd], [], [], 0.5)
+                if not ready:
+                    continue
+                changed = self._read_events()
+                if not changed:
+                    continue
+                # A plug in shows up as a burst of events, take them all before probing.
+                if self._stop_event.wait(DEV_SETTLE_TIME):
+                    return
+                while select.select([self._watch_fd], [], [], 0)[0]:
+                    changed |= self._read_events()
+                self._update(changed)
+        except Exception:
+            if not self._stop_event.is_set():
+                print(f'{Fore.YELLOW}[WARN] info.deviceWatch{Fore.RESET}')
+                # Fall back to refreshing on lookup.
+                self._thread = None
+
+
+device_registry = DeviceRegistry()
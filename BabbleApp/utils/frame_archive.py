@@ -0,0 +1,120 @@
+import glob
+import os
+import numpy as np
+
+# A frame archive is a directory of chunks, each an uncompressed .npz (the
+# frames are JPEGs already) holding:
+#   data          uint8, the JPEGs back to back
+#   offsets       int64, n + 1 offsets into data
+#   frame_number  int64, n
+#   capture_ns    int64, n, perf_counter_ns() when the frame was captured
+# plus any further per-frame columns the writer was given, n rows each.
+# Chunks are complete files, so a recording cut short loses at most the chunk
+# being written. A single chunk file on its own is an archive too.
+FRAME_CHUNK_PATTERN = "frames_*.npz"
+FRAME_CHUNK_NAME = "frames_{:06d}.npz"
+FRAME_CHUNK_FRAMES = 300
+
+
+def frame_chunks(path: str) -> "list[str]":
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, FRAME_CHUNK_PATTERN)))
+    if path.endswith(".npz") and os.path.isfile(path):
+        return [path]
+    return []
+
+
+def is_frame_archive(path) -> bool:
+    return len(frame_chunks(str(path))) > 0
+
+
+def iter_frame_archive(path: str, columns: "tuple[str, ...]" = ()):
+    """
+    Yield (jpeg, frame_number, capture_ns) for every frame, one chunk in memory at a time.
+
+    Each of the extra columns asked for is appended, that frame's row of it or
+    None in chunks that don't have the column.
+    """
+    for chunk_path in frame_chunks(path):
+        with np.load(chunk_path) as chunk:
+            data = chunk["data"]
+            offsets = chunk["offsets"]
+            frame_numbers = chunk["frame_number"]
+            capture_ns = chunk["capture_ns"]
+            extra = [chunk[column] if column in chunk.files else None for column in columns]
+        for i in range(len(frame_numbers)):
+            yield (
+                data[offsets[i]:offsets[i + 1]].tobytes(), int(frame_numbers[i]), int(capture_ns[i]),
+                *(None if column is None else column[i] for column in extra),
+            )
+
+
+def load_frame_archive_columns(path: str) -> "dict[str, np.ndarray]":
+    """Every per-frame column of the archive except the JPEGs, concatenated over all chunks."""
+    columns: "dict[str, list]" = {}
+    for chunk_path in frame_chunks(path):
+        with np.load(chunk_path) as chunk:
+            for key in chunk.files:
+                if key not in ("data", "offsets"):
+                    columns.setdefault(key, []).append(chunk[key])
+    return {key: np.concatenate(parts) for key, parts in columns.items()}
+
+
+class FrameArchiveWriter:
+    """
+    Writes a frame archive, chunk_frames frames per chunk.
+
+    Frames are held in memory until their chunk is full, a chunk is written
+    under a temporary name and renamed into place so readers never see half a
+    chunk. Extra keyword columns given to write() are stored next to the frames,
+    every frame of a chunk needs the same ones.
+    """
+
+    def __init__(self, path: str, chunk_frames: int = FRAME_CHUNK_FRAMES):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.frames_written = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self._jpegs: "list[bytes]" = []
+        self._frame_numbers: "list[int]" = []
+        self._capture_ns: "list[int]" = []
+        self._columns: "dict[str, list]" = {}
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, jpeg: bytes, frame_number: int, capture_ns: int, **columns):
+        self._jpegs.append(jpeg)
+        self._frame_numbers.append(frame_number)
+        self._capture_ns.append(capture_ns)
+        for key, value in columns.items():
+            self._columns.setdefault(key, []).append(value)
+        if len(self._jpegs) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        if not self._jpegs:
+            return
+        offsets = np.zeros(len(self._jpegs) + 1, np.int64)
+        np.cumsum([len(jpeg) for jpeg in self._jpegs], out=offsets[1:])
+        arrays = {key: np.asarray(values) for key, values in self._columns.items()}
+        arrays.update(
+            data=np.frombuffer(b"".join(self._jpegs), np.uint8),
+            offsets=offsets,
+            frame_number=np.asarray(self._frame_numbers, np.int64),
+            capture_ns=np.asarray(self._capture_ns, np.int64),
+        )
+        chunk_path = os.path.join(self.path, FRAME_CHUNK_NAME.format(self.chunks_written))
+        # Not ending in .npz, so it doesn't count as a chunk until it is complete.
+        with open(chunk_path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(chunk_path + ".tmp", chunk_path)
+        self.frames_written += len(self._jpegs)
+        self.chunks_written += 1
+        self.bytes_written += int(offsets[-1])
+        self._jpegs.clear()
+        self._frame_numbers.clear()
+        self._capture_ns.clear()
+        self._columns.clear()
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,60 @@
+import threading
+
+
+class FrameMailbox:
+    """
+    Single-slot, latest-value handoff between one producer and one consumer.
+
+    put() never blocks: it replaces whatever is in the slot. The slot holds a
+    (sequence, item) tuple that is swapped with a single reference assignment,
+    so neither side takes a lock. The consumer works out how many items it
+    never saw from the gap in sequence numbers.
+    """
+
+    def __init__(self):
+        self._slot = None
+        self._ready = threading.Event()
+        self._put_seq = 0
+        self._taken_seq = 0
+        self.taken = 0
+        self.superseded = 0
+
+    @property
+    def published(self) -> int:
+        """Number of items put so far."""
+        return self._put_seq
+
+    def put(self, item):
+        self._put_seq += 1
+        self._slot = (self._put_seq, item)
+        self._ready.set()
+
+    def take(self, timeout: "float | None" = None):
+        """
+        Return the newest item that has not been taken yet.
+
+        Waits up to timeout seconds for one to show up (0 to poll) and returns
+        None if there is nothing new.
+        """
+        if timeout == 0:
+            if not self._ready.is_set():
+                return None
+        elif not self._ready.wait(timeout):
+            return None
+        self._ready.clear()
+        slot = self._slot
+        if slot is None or slot[0] == self._taken_seq:
+            return None
+        seq, item = slot
+        self.superseded += seq - self._taken_seq - 1
+        self._taken_seq = seq
+        self.taken += 1
+        return item
+
+    def clear(self):
+        """Drop the pending item, if any, and count it as superseded."""
+        slot = self._slot
+        if slot is not None and slot[0] != self._taken_seq:
+            self.superseded += slot[0] - self._taken_seq
+            self._taken_seq = slot[0]
+        self._ready.clear()
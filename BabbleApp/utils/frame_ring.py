@@ -0,0 +1,127 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+FRAME_RING_SLOTS = 8
+# control: latest slot, slot held by the reader, frames published
+LATEST = 0
+READING = 1
+PUBLISHED = 2
+CONTROL_FIELDS = 3
+# per slot: sequence, capture_ns, height, width, channels (0 for 2-D frames)
+META_FIELDS = 5
+
+
+class SharedFrameRing:
+    """
+    Latest-frame handoff from one producer process to one consumer through shared memory.
+
+    The producer copies each frame into a free slot in place and publishes it with
+    a sequence number and capture timestamp. The consumer gets a numpy view of
+    the newest slot, nothing is pickled or copied on the way. The writer never
+    touches the newest slot or the one the consumer holds and otherwise goes
+    round-robin, so a view stays intact until the next read() and, at the
+    latest, until slots - 2 more frames were written. Copy out what is kept any
+    longer. The lock only guards swapping slot indices.
+    """
+
+    def __init__(self, name: str, lock, event, slots: int, slot_bytes: int, create: bool = False):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._lock = lock
+        self._event = event
+        header = 8 * (CONTROL_FIELDS + META_FIELDS * slots)
+        self._header_bytes = (header + 63) // 64 * 64
+        size = self._header_bytes + slots * slot_bytes
+        # Child processes share the creator's resource tracker, so attaching
+        # registers the same name again and unlink() in the creator clears it.
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        buf = self._shm.buf
+        self._control = np.ndarray((CONTROL_FIELDS,), np.int64, buffer=buf)
+        self._meta = np.ndarray((slots, META_FIELDS), np.int64, buffer=buf, offset=8 * CONTROL_FIELDS)
+        self._data = np.ndarray((slots, slot_bytes), np.uint8, buffer=buf, offset=self._header_bytes)
+        if create:
+            self._control[:] = (-1, -1, 0)
+        self._write_slot = -1
+        self._last_seq = 0
+        self.frames_read = 0
+        self.frames_skipped = 0
+
+    @classmethod
+    def create(cls, slot_bytes: int, slots: int = FRAME_RING_SLOTS, context=multiprocessing) -> "SharedFrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=1)
+        name = shm.name
+        shm.close()
+        shm.unlink()
+        return cls(name, context.Lock(), context.Event(), slots, slot_bytes, create=True)
+
+    def __getstate__(self):
+        # Child processes attach to the same segment by name.
+        return self._shm.name, self._lock, self._event, self.slots, self.slot_bytes
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def published(self) -> int:
+        return int(self._control[PUBLISHED])
+
+    def write(self, frame: np.ndarray, capture_ns: int):
+        """Copy frame into a free slot and make it the newest one."""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame of {frame.nbytes} bytes does not fit a {self.slot_bytes} byte slot")
+        control = self._control
+        with self._lock:
+            slot = self._write_slot
+            while True:
+                slot = (slot + 1) % self.slots
+                if slot != control[LATEST] and slot != control[READING]:
+                    break
+        self._write_slot = slot
+        np.copyto(self._data[slot, :frame.nbytes].reshape(frame.shape), frame)
+        shape = frame.shape if frame.ndim == 3 else frame.shape + (0,)
+        with self._lock:
+            seq = control[PUBLISHED] + 1
+            self._meta[slot] = (seq, capture_ns) + shape
+            control[PUBLISHED] = seq
+            control[LATEST] = slot
+        self._event.set()
+
+    def read(self, timeout: float):
+        """
+        Wait up to timeout seconds for a frame newer than the last one read.
+
+        Returns (frame, sequence, capture_ns) or None. frame is a view into
+        shared memory, don't write to it, and copy it before the next read()
+        if it is needed for longer.
+        """
+        control = self._control
+        while control[PUBLISHED] == self._last_seq:
+            if not self._event.wait(timeout):
+                return None
+            self._event.clear()
+        with self._lock:
+            slot = int(control[LATEST])
+            control[READING] = slot
+            seq, capture_ns, height, width, channels = (int(v) for v in self._meta[slot])
+        if self._last_seq:
+            self.frames_skipped += seq - self._last_seq - 1
+        self._last_seq = seq
+        self.frames_read += 1
+        shape = (height, width, channels) if channels else (height, width)
+        frame = self._data[slot, :height * width * max(channels, 1)].reshape(shape)
+        return frame, seq, capture_ns
+
+    def close(self):
+        self._control = self._meta = self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Frames handed out are still referenced somewhere, the mapping goes when they do.
+            pass
+
+    def unlink(self):
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,72 @@
+import numpy as np
+import cv2
+
+
+def crop_flip_rotate_resize_matrix(
+    cols: int,
+    rows: int,
+    out_w: int,
+    out_h: int,
+    angle: float,
+    vertical_flip: bool = False,
+    horizontal_flip: bool = False,
+) -> np.ndarray:
+    """
+    The 2x3 cv2.warpAffine() matrix for flipping, rotating and resizing a cols x rows crop in one pass.
+
+    It composes what the processor used to do one image at a time: cv2.flip(),
+    rotating by angle degrees around the centre at the same size and
+    cv2.resize() to out_w x out_h. The resize keeps cv2.resize()'s pixel centre
+    alignment, so with out_w x out_h equal to cols x rows it is no resize at all.
+    """
+    transform = np.eye(3)
+    if vertical_flip:
+        transform = np.array([[1, 0, 0], [0, -1, rows - 1], [0, 0, 1]]) @ transform
+    if horizontal_flip:
+        transform = np.array([[-1, 0, cols - 1], [0, 1, 0], [0, 0, 1]]) @ transform
+    rotation = np.vstack((cv2.getRotationMatrix2D((cols / 2, rows / 2), angle, 1), (0, 0, 1)))
+    transform = rotation @ transform
+    sx, sy = out_w / cols, out_h / rows
+    resize = np.array([[sx, 0, 0.5 * sx - 0.5], [0, sy, 0.5 * sy - 0.5], [0, 0, 1]])
+    return (resize @ transform)[:2]
+
+
+# The border colour comes from about this many pixels per side of the frame,
+BORDER_FILL_SAMPLES = 64
+# and is worked out again every this many frames.
+BORDER_FILL_INTERVAL = 15
+
+
+def rotation_covers_frame(cols: int, rows: int, angle: float) -> bool:
+    """Whether rotating a cols x rows image by angle degrees leaves nothing of it outside the image."""
+    quarter_turns, remainder = divmod(angle, 90)
+    if remainder:
+        return False
+    return quarter_turns % 2 == 0 or cols == rows
+
+
+class BorderFill:
+    """
+    Running estimate of the colour to fill what a rotation brings in from outside the frame.
+
+    It is the frame's average colour plus 10, from a subsampled view of the
+    frame and only every interval frames, the colour is not worth a full pass.
+    """
+
+    def __init__(self, interval: int = BORDER_FILL_INTERVAL, samples: int = BORDER_FILL_SAMPLES):
+        self.interval = interval
+        self.samples = samples
+        self.value: "tuple | None" = None
+        self.updates = 0
+        self._frames = 0
+
+    def update(self, image: np.ndarray) -> tuple:
+        channels = image.shape[2] if image.ndim == 3 else 1
+        if self.value is None or len(self.value) != channels or self._frames >= self.interval:
+            step = max(1, max(image.shape[:2]) // self.samples)
+            average = np.atleast_1d(image[::step, ::step].mean(axis=(0, 1)))
+            self.value = tuple(float(value) + 10 for value in average)
+            self.updates += 1
+            self._frames = 0
+        self._frames += 1
+        return self.value
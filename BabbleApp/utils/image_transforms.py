@@ -1,3 +1,4 @@
+import cv2
 import numpy as np
 
 
@@ -60,3 +61,55 @@ def unsqueeze(numpy_array, axis: int):
     result_array = np.expand_dims(numpy_array, axis=axis)
 
     return result_array
+
+
+class TensorPrep:
+    """
+    Turns gray frames into the model's (1, 1, H, W) float32 input without allocating.
+
+    The same tensor is filled for every frame, so it is only valid until the
+    next call. Frames not at H x W are resized into a buffer of their own first.
+
+    Args:
+    - height (int): Model input height.
+    - width (int): Model input width.
+    """
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        self.tensor = np.empty((1, 1, height, width), np.float32)
+        self._plane = self.tensor[0, 0]
+        self._resized = np.empty((height, width), np.uint8)
+        self._scale = np.float32(1 / 255)
+
+    @classmethod
+    def from_session_input(cls, node_arg, default_size: int) -> "TensorPrep":
+        """
+        Size the input after an onnxruntime NodeArg (session.get_inputs()[0]).
+
+        Args:
+        - node_arg: The session input, its shape is (1, 1, H, W).
+        - default_size (int): Used for H or W when they are not fixed in the model.
+        """
+        height, width = (
+            dim if isinstance(dim, int) and dim > 0 else default_size for dim in node_arg.shape[-2:]
+        )
+        return cls(height, width)
+
+    def __call__(self, image):
+        """
+        Fill the input tensor from a gray uint8 image.
+
+        Args:
+        - image (numpy.ndarray): H x W gray image, any size.
+
+        Returns:
+        - numpy.ndarray: The (1, 1, H, W) input tensor, scaled to 0..1.
+        """
+        if image.shape != self._resized.shape:
+            cv2.resize(image, (self.width, self.height), dst=self._resized)
+            image = self._resized
+        np.copyto(self._plane, image)
+        self._plane *= self._scale
+        return self.tensor
@@ -0,0 +1,78 @@
+import numpy as np
+import onnxruntime as ort
+
+# Input buffers that keep a binding of their own, more than this and they start over.
+MAX_INPUT_BINDINGS = 16
+# NodeArg.type to the NumPy dtype of a buffer for it.
+ORT_TYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(uint8)": np.uint8,
+}
+
+
+class InferenceEngine:
+    """
+    Runs a single input, single output InferenceSession through IO binding.
+
+    The output is bound once to a preallocated array in CPU memory, so ORT
+    writes into it instead of allocating and copying out a new one on every
+    run, and run() returns the same view of it each time. The input is bound
+    by pointer, and every input buffer gets an IOBinding of its own, so each of
+    the processor's pool of model input buffers is bound once rather than every
+    time the pool hands out another one. With a GPU provider ORT copies from
+    and to these buffers itself.
+
+    The returned output is overwritten by the next run(), copy what is kept.
+    """
+
+    def __init__(self, sess: "ort.InferenceSession"):
+        self.sess = sess
+        self.input_name = sess.get_inputs()[0].name
+        output = sess.get_outputs()[0]
+        self.output_name = output.name
+        # Batch of one, any other dimension has to be fixed in the model.
+        shape = [1] + list(output.shape[1:])
+        if not all(isinstance(dim, int) and dim > 0 for dim in shape):
+            raise ValueError(f"output {self.output_name} has no fixed shape: {output.shape}")
+        self.output_buffer = np.empty(shape, ORT_TYPES[output.type])
+        self.output = self.output_buffer[0]
+        self.rebinds = 0
+        self.runs = 0
+        # (pointer, shape, dtype) of an input buffer to the binding made for it.
+        self._bindings: "dict[tuple, ort.IOBinding]" = {}
+        self._contiguous: "np.ndarray | None" = None
+
+    def _bind(self, frame: np.ndarray) -> "ort.IOBinding":
+        if len(self._bindings) >= MAX_INPUT_BINDINGS:
+            self._bindings.clear()
+        binding = self.sess.io_binding()
+        binding.bind_input(self.input_name, "cpu", 0, frame.dtype, list(frame.shape), frame.ctypes.data)
+        binding.bind_output(
+            self.output_name, "cpu", 0, self.output_buffer.dtype,
+            list(self.output_buffer.shape), self.output_buffer.ctypes.data,
+        )
+        self.rebinds += 1
+        return binding
+
+    def run(self, frame: np.ndarray) -> np.ndarray:
+        """Run the model on frame and return the output of the first batch entry."""
+        if not frame.flags.c_contiguous:
+            if self._contiguous is None or self._contiguous.shape != frame.shape:
+                self._contiguous = np.empty(frame.shape, frame.dtype)
+            np.copyto(self._contiguous, frame)
+            frame = self._contiguous
+        key = (frame.ctypes.data, frame.shape, frame.dtype)
+        binding = self._bindings.get(key)
+        if binding is None:
+            binding = self._bindings[key] = self._bind(frame)
+        self.sess.run_with_iobinding(binding)
+        self.runs += 1
+        return self.output
+
+    def get_stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rebinds": self.rebinds,
+            "bindings": len(self._bindings),
+        }
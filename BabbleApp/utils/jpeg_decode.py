@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+# libjpeg can scale in the DCT domain while decoding, which skips most of the
+# IDCT and colour conversion work. OpenCV exposes the 1/2, 1/4 and 1/8 modes.
+REDUCED_GRAYSCALE = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+REDUCED_COLOR = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic...).
+SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+
+
+def jpeg_size(jpeg) -> "tuple[int, int] | None":
+    """
+    Read the (width, height) of a JPEG from its SOF header without decoding it.
+
+    Returns None if no SOF marker is found.
+    """
+    data = memoryview(jpeg)
+    pos = 2
+    end = len(data) - 9
+    while pos < end:
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte
+            pos += 1
+            continue
+        if marker in SOF_MARKERS:
+            height = (data[pos + 5] << 8) | data[pos + 6]
+            width = (data[pos + 7] << 8) | data[pos + 8]
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Standalone markers have no length field.
+            pos += 2
+            continue
+        pos += 2 + ((data[pos + 2] << 8) | data[pos + 3])
+    return None
+
+
+class JpegDecoder:
+    """
+    Decode JPEG bytes straight to the frame the processor works on.
+
+    The reduction factor is the largest of 1/2, 1/4 or 1/8 that still leaves the
+    ROI (or the whole frame when no ROI is set) at least model_size pixels on each
+    side. The image is handed on at whatever size the decoder gave, the processor's
+    warp scales it to the model input anyway. frame_size is the (w, h) that
+    Camera.clamp_max_res() would give the full frame, ROI coordinates are in those
+    pixels, or None when the decoded image is already that size.
+    """
+
+    def __init__(self, model_size: int, max_resolution: int):
+        self.model_size = model_size
+        self.max_resolution = max_resolution
+        self.factor = 1
+        self.frame_size: "tuple[int, int] | None" = None
+
+    def output_size(self, width: int, height: int) -> "tuple[int, int]":
+        """Size of the frame handed to the processor for a width x height JPEG."""
+        max_value = max(width, height)
+        if max_value <= self.max_resolution:
+            return width, height
+        scale = self.max_resolution / max_value
+        return int(width * scale), int(height * scale)
+
+    def choose_factor(self, width: int, height: int, roi_size: "tuple[int, int] | None") -> int:
+        out_width, _ = self.output_size(width, height)
+        if roi_size is not None and roi_size[0] > 0 and roi_size[1] > 0:
+            # ROI coordinates are in output pixels, bring them back to JPEG pixels.
+            scale = width / out_width
+            width, height = roi_size[0] * scale, roi_size[1] * scale
+        for factor in (8, 4, 2):
+            if width / factor >= self.model_size and height / factor >= self.model_size:
+                return factor
+        return 1
+
+    def decode(self, jpeg, roi_size: "tuple[int, int] | None" = None, color: bool = False) -> "np.ndarray | None":
+        """
+        Decode a JPEG to a single channel image (or BGR if color is set).
+
+        roi_size is the (w, h) of the configured ROI in output pixels. Returns None
+        if the data could not be decoded.
+        """
+        size = jpeg_size(jpeg)
+        self.factor = 1 if size is None else self.choose_factor(size[0], size[1], roi_size)
+        self.frame_size = None
+        flags = (REDUCED_COLOR if color else REDUCED_GRAYSCALE)[self.factor]
+        image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), flags)
+        if image is None or size is None:
+            return image
+        out_size = self.output_size(*size)
+        if (image.shape[1], image.shape[0]) != out_size:
+            self.frame_size = out_size
+        return image
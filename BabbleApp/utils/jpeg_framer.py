@@ -0,0 +1,118 @@
+JPEG_SOI = b"\xff\xd8\xff"
+JPEG_EOI = b"\xff\xd9"
+DEFAULT_CAPACITY = 262144
+
+
+class JpegFramer:
+    """
+    Cut JPEG frames out of a byte stream without intermediate copies.
+
+    Bytes are read straight into one preallocated bytearray with readinto(),
+    and only the newly arrived bytes are scanned for the SOI/EOI markers.
+    When the write position reaches the end of the buffer, the pending partial
+    frame is moved back to the front (the only copy, and only of unfinished data).
+
+    Frames are returned as memoryview slices into the buffer. They stay valid
+    until the next call to fill()/write(), so copy them with bytes(frame) if they
+    have to outlive that.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0  # First byte that has not been consumed yet
+        self._tail = 0  # One past the last valid byte
+        self._scan = 0  # Where the next marker search starts
+        self._frame_start = -1  # Offset of the SOI of the frame being assembled
+        self.frames = 0
+        self.discarded_bytes = 0
+        self.overflows = 0
+
+    def reset(self):
+        """Drop everything that is buffered."""
+        self._head = self._tail = self._scan = 0
+        self._frame_start = -1
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes that have not been handed out yet."""
+        return self._tail - self._head
+
+    def _make_room(self, size: int) -> int:
+        if self._capacity - self._tail < size and self._head > 0:
+            # Rewind: move the unfinished frame to the front of the buffer.
+            pending = self._tail - self._head
+            self._view[0:pending] = self._view[self._head:self._tail]
+            self._scan -= self._head
+            if self._frame_start >= 0:
+                self._frame_start -= self._head
+            self._head = 0
+            self._tail = pending
+        free = self._capacity - self._tail
+        if free == 0:
+            # A single frame is larger than the whole buffer, it can never complete.
+            self.overflows += 1
+            self.discarded_bytes += self._tail
+            self.reset()
+            free = self._capacity
+        return min(size, free)
+
+    def fill(self, stream, size: int) -> int:
+        """
+        Read up to size bytes from stream (anything with readinto(), e.g. serial.Serial).
+
+        Returns the number of bytes read.
+        """
+        size = self._make_room(max(size, 1))
+        n = stream.readinto(self._view[self._tail:self._tail + size])
+        if n:
+            self._tail += n
+            return n
+        return 0
+
+    def write(self, data) -> int:
+        """Append bytes that were already read by someone else."""
+        written = 0
+        data = memoryview(data)
+        while written < len(data):
+            size = self._make_room(len(data) - written)
+            self._view[self._tail:self._tail + size] = data[written:written + size]
+            self._tail += size
+            written += size
+        return written
+
+    def next_frame(self) -> "memoryview | None":
+        """Return the next complete JPEG frame, or None if more data is needed."""
+        buffer = self._buffer
+        if self._frame_start < 0:
+            beg = buffer.find(JPEG_SOI, self._scan, self._tail)
+            if beg < 0:
+                # Keep the last two bytes around, they may be the start of a split SOI.
+                keep = max(self._head, self._tail - len(JPEG_SOI) + 1)
+                self.discarded_bytes += keep - self._head
+                self._head = self._scan = keep
+                return None
+            # Discard any data before the frame header.
+            self.discarded_bytes += beg - self._head
+            self._frame_start = self._head = beg
+            self._scan = beg + len(JPEG_SOI)
+        end = buffer.find(JPEG_EOI, self._scan, self._tail)
+        if end < 0:
+            self._scan = max(self._scan, self._tail - len(JPEG_EOI) + 1)
+            return None
+        end += len(JPEG_EOI)
+        frame = self._view[self._frame_start:end]
+        self._head = self._scan = end
+        self._frame_start = -1
+        self.frames += 1
+        return frame
+
+    def latest_frame(self) -> "memoryview | None":
+        """Return the newest complete frame in the buffer, skipping older ones."""
+        latest = None
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return latest
+            latest = frame
@@ -0,0 +1,45 @@
+import threading
+
+
+class LatencyStats:
+    """
+    Running latency per pipeline stage, fed with time.perf_counter_ns() stamps.
+
+    Each stage keeps an exponential moving average, the last value and the
+    largest value seen since the last reset, all in milliseconds.
+    """
+
+    def __init__(self, smoothing: float = 0.05):
+        self.smoothing = smoothing
+        self._stages: "dict[str, list]" = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, start_ns: int, end_ns: int):
+        ms = (end_ns - start_ns) / 1e6
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                self._stages[stage] = [ms, ms, ms, 1]
+                return
+            entry[0] += self.smoothing * (ms - entry[0])
+            entry[1] = ms
+            if ms > entry[2]:
+                entry[2] = ms
+            entry[3] += 1
+
+    def record_stamps(self, timestamps: dict, stages):
+        """Record (stage, from, to) triples whose from/to keys are present in timestamps."""
+        for stage, start, end in stages:
+            if start in timestamps and end in timestamps:
+                self.record(stage, timestamps[start], timestamps[end])
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                stage: {"avg_ms": avg, "last_ms": last, "max_ms": peak, "samples": samples}
+                for stage, (avg, last, peak, samples) in self._stages.items()
+            }
@@ -1,5 +1,6 @@
 import typing
 import serial
+from serial.tools import list_ports
 import sys
 import glob
 import os
@@ -96,59 +97,76 @@ def list_linux_uvc_devices():
         return [f"Error listing UVC devices on Linux: {str(e)}"]
 
 
-def list_camera_names():
-    """Cross-platform function to list camera names"""
+def list_video_devices():
+    """Cross-platform function to list video device names, without serial ports"""
 
     if os_type == 'Windows':
         # On Windows, use pygrabber to list devices
-        cam_list = graph.get_input_devices()
-        return cam_list + list_serial_ports()
+        return graph.get_input_devices()
 
     elif os_type == "Linux":
         # On Linux, return UVC device paths like '/dev/video0'
-        return list_linux_uvc_devices() + list_serial_ports()
+        return list_linux_uvc_devices()
 
     elif os_type == "Darwin":
         # On macOS, fallback to OpenCV (device names aren't fetched)
-        return list_cameras_opencv() + list_serial_ports()
+        return list_cameras_opencv()
 
     else:
         return ["Unsupported operating system"]
 
 
-def list_serial_ports():
-    #print("DEBUG: Listed Serial Ports")
-    """ Lists serial port names
+def list_camera_names():
+    """Cross-platform function to list camera names"""
+    if os_type not in ("Windows", "Linux", "Darwin"):
+        return list_video_devices()
+    return list_video_devices() + list_serial_ports()
+
+
+def serial_port_candidates():
+    """ Lists names that might be serial ports, without opening them
 
         :raises EnvironmentError:
             On unsupported or unknown platforms
-        :returns:
-            A list of the serial ports available on the system
     """
     if sys.platform.startswith("win"):
-        ports = ["COM%s" % (i + 1) for i in range(256)]
+        # Only ports the system knows about, instead of trying COM1 to COM256.
+        return [port.device for port in list_ports.comports()]
     elif sys.platform.startswith("linux") or sys.platform.startswith("cygwin"):
         # this excludes your current terminal "/dev/tty"
-        ports = glob.glob("/dev/tty[A-Za-z]*")
+        return glob.glob("/dev/tty[A-Za-z]*")
     elif sys.platform.startswith("darwin"):
-        ports = glob.glob("/dev/tty.*")
+        return glob.glob("/dev/tty.*")
     else:
         raise EnvironmentError("Unsupported platform")
 
-    result = []
-    for port in ports:
-        try:
-            s = serial.Serial(port)
-            s.close()
-            result.append(port)
-        except (OSError, serial.SerialException):
-            pass
-    return result
+
+def probe_serial_port(port):
+    """True if the port can be opened"""
+    try:
+        s = serial.Serial(port)
+        s.close()
+        return True
+    except (OSError, serial.SerialException):
+        return False
+
+
+def list_serial_ports():
+    #print("DEBUG: Listed Serial Ports")
+    """ Lists serial port names
+
+        :raises EnvironmentError:
+            On unsupported or unknown platforms
+        :returns:
+            A list of the serial ports available on the system
+    """
+    return [port for port in serial_port_candidates() if probe_serial_port(port)]
 
 
-def get_camera_index_by_name(name):
+def get_camera_index_by_name(name, cam_list=None):
     """Cross-platform function to get the camera index by its name or path"""
-    cam_list = list_camera_names()
+    if cam_list is None:
+        cam_list = list_camera_names()
 
     # On Linux, we use device paths like '/dev/video0' and match directly
     # OpenCV expects the actual /dev/video#, not the offset into the device list
@@ -0,0 +1,135 @@
+import os
+import numpy as np
+from colorama import Fore
+
+# Written next to model.onnx, the model with its input preprocessing in the graph.
+PREPARED_MODEL_NAME = "model_uint8.onnx"
+PREPARED_INPUT_NAME = "frame"
+# Bumped whenever the prepended ops change, older caches are rebuilt.
+PREPARED_VERSION = "1"
+PREPARED_VERSION_KEY = "babble_preprocess"
+
+
+def prepared_model_path(model_path: str) -> str:
+    return os.path.join(os.path.dirname(model_path), PREPARED_MODEL_NAME)
+
+
+def is_prepared_input(input_type: str) -> bool:
+    """Whether a session input (NodeArg.type) takes the frame as is, see prepare_model()."""
+    return input_type == "tensor(uint8)"
+
+
+def _opset(model) -> int:
+    for opset in model.opset_import:
+        if opset.domain in ("", "ai.onnx"):
+            return opset.version
+    raise ValueError("model has no default opset")
+
+
+def prepare_model(model_path: str, size: int, output_path: "str | None" = None) -> str:
+    """
+    Write a copy of the model that takes a uint8 H x W gray frame of any size.
+
+    The ops in front of the original input do what run_model() does in NumPy:
+    the (1, 1, H, W) layout, the cast to float32, a bilinear resize to
+    size x size with cv2.resize()'s pixel centres and the scale to 0..1. Needs the
+    onnx package, which only this needs, so it is imported here.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    model = onnx.load(model_path)
+    graph = model.graph
+    initializers = {initializer.name for initializer in graph.initializer}
+    inputs = [graph_input for graph_input in graph.input if graph_input.name not in initializers]
+    if len(inputs) != 1:
+        raise ValueError(f"expected a single model input, found {len(inputs)}")
+    model_input = inputs[0]
+    name = model_input.name
+    opset = _opset(model)
+    if opset < 11:
+        raise ValueError(f"opset {opset} is too old to prepare, 11 or newer is needed")
+
+    def constant(suffix, array):
+        initializer = numpy_helper.from_array(array, f"{PREPARED_INPUT_NAME}_{suffix}")
+        graph.initializer.append(initializer)
+        return initializer.name
+
+    if opset >= 13:
+        unsqueeze = helper.make_node(
+            "Unsqueeze", [PREPARED_INPUT_NAME, constant("axes", np.array([0, 1], np.int64))],
+            [f"{PREPARED_INPUT_NAME}_nchw"],
+        )
+    else:
+        unsqueeze = helper.make_node(
+            "Unsqueeze", [PREPARED_INPUT_NAME], [f"{PREPARED_INPUT_NAME}_nchw"], axes=[0, 1],
+        )
+    if opset >= 13:
+        roi, scales = "", ""
+    else:
+        # Not optional before opset 13, empty when resizing to sizes.
+        roi = constant("roi", np.array([], np.float32))
+        scales = constant("scales", np.array([], np.float32))
+    nodes = [
+        unsqueeze,
+        helper.make_node(
+            "Cast", [f"{PREPARED_INPUT_NAME}_nchw"], [f"{PREPARED_INPUT_NAME}_float"], to=TensorProto.FLOAT,
+        ),
+        helper.make_node(
+            "Resize",
+            [f"{PREPARED_INPUT_NAME}_float", roi, scales, constant("sizes", np.array([1, 1, size, size], np.int64))],
+            [f"{PREPARED_INPUT_NAME}_resized"],
+            mode="linear",
+            coordinate_transformation_mode="half_pixel",
+        ),
+        helper.make_node(
+            "Mul", [f"{PREPARED_INPUT_NAME}_resized", constant("scale", np.array(1 / 255, np.float32))], [name],
+        ),
+    ]
+    for node in reversed(nodes):
+        graph.node.insert(0, node)
+    graph.input.remove(model_input)
+    graph.input.insert(
+        0, helper.make_tensor_value_info(PREPARED_INPUT_NAME, TensorProto.UINT8, ["height", "width"])
+    )
+    helper.set_model_props(model, {PREPARED_VERSION_KEY: f"{PREPARED_VERSION}:{size}"})
+    onnx.checker.check_model(model)
+
+    output_path = output_path or prepared_model_path(model_path)
+    # Renamed into place, a session never loads half a model.
+    onnx.save(model, output_path + ".tmp")
+    os.replace(output_path + ".tmp", output_path)
+    return output_path
+
+
+def _is_current(prepared_path: str, model_path: str, size: int) -> bool:
+    if not os.path.isfile(prepared_path) or os.path.getmtime(prepared_path) < os.path.getmtime(model_path):
+        return False
+    try:
+        import onnx
+    except ImportError:
+        # Can't read the version without onnx, nor build a new one.
+        return True
+    model = onnx.load(prepared_path, load_external_data=False)
+    props = {prop.key: prop.value for prop in model.metadata_props}
+    return props.get(PREPARED_VERSION_KEY) == f"{PREPARED_VERSION}:{size}"
+
+
+def load_prepared_model(model_path: str, size: int) -> "str | None":
+    """
+    The cached prepared copy of model_path, built first if it is missing or stale.
+
+    None when it can't be had, without onnx installed or next to a model in a
+    read-only install, the caller feeds the model through NumPy then.
+    """
+    prepared_path = prepared_model_path(model_path)
+    try:
+        if not _is_current(prepared_path, model_path, size):
+            prepare_model(model_path, size, prepared_path)
+        return prepared_path
+    except Exception as e:
+        print(
+            f'{Fore.YELLOW}[WARN] info.modelPrepareFailed {model_path}{Fore.RESET}'
+        )
+        print(e)
+        return None
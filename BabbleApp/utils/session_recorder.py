@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from colorama import Fore
+from utils.frame_archive import FRAME_CHUNK_FRAMES, FrameArchiveWriter
+
+SESSION_QUEUE_SIZE = 64
+SESSION_JPEG_QUALITY = 90
+SESSION_NAME = "session_%Y%m%d_%H%M%S"
+# Per-frame timestamps kept next to the outputs, all time.perf_counter_ns().
+SESSION_STAMPS = ("dequeue", "preprocess", "inference", "output")
+# Where a recorded frame sits in the camera frame, see SessionRecorder.
+SESSION_CROP_COLUMNS = ("frame_size", "roi")
+
+
+class SessionRecorder:
+    """
+    Records the frames BabbleProcessor took from the camera, with their timestamps and outputs.
+
+    Frames are kept as they came in, before the warp to the model input, so a
+    session is a frame archive that plays back as a replay capture source and
+    goes through the same warp again. Frames the camera already cut down to the
+    ROI stay cut, the replay hands them on without cropping a second time.
+    Each chunk also holds the columns
+        <stamp>_ns      int64, n, for every stage in SESSION_STAMPS (0 if missing)
+        raw             float32, n x 45, the model output after filtering
+        calibrated      float32, n x 45, what was sent out over OSC
+        frame_size      int64, n x 2, (w, h) of the camera frame, in ROI pixels
+        roi             int64, n x 4, (x, y, w, h) the frame was cut to, all 0 if it wasn't
+        rotation_angle  float32, n, the warp's rotation
+        flip            bool, n x 2, the warp's (vertical, horizontal) flip
+    load_frame_archive_columns() reads them back.
+
+    record() only copies the frame into a bounded queue and never blocks. When
+    the writer thread falls behind, frames are dropped and counted instead.
+    JPEG encoding and file writes happen on the writer thread.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        queue_size: int = SESSION_QUEUE_SIZE,
+        jpeg_quality: int = SESSION_JPEG_QUALITY,
+        chunk_frames: int = FRAME_CHUNK_FRAMES,
+    ):
+        self.path = os.path.join(directory, time.strftime(SESSION_NAME))
+        self.jpeg_quality = jpeg_quality
+        self.chunk_frames = chunk_frames
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.failed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer: "FrameArchiveWriter | None" = None
+        self._thread: "threading.Thread | None" = None
+
+    def start(self):
+        self._writer = FrameArchiveWriter(self.path, self.chunk_frames)
+        self._thread = threading.Thread(target=self.run, name="SessionRecorderThread", daemon=True)
+        self._thread.start()
+        print(f'{Fore.CYAN}[INFO] info.recordingSession {self.path}{Fore.RESET}')
+
+    def close(self, timeout: float = 5.0):
+        """Write out what is still queued and the last partial chunk."""
+        if self._thread is None:
+            return
+        while True:
+            try:
+                self._queue.put(None, timeout=timeout)
+                break
+            except queue.Full:
+                # The writer is gone, nothing will empty the queue.
+                if not self._thread.is_alive():
+                    break
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(
+        self,
+        image,
+        frame_number: int,
+        timestamps: dict,
+        raw,
+        calibrated,
+        crop=None,
+        warp: "tuple[float, bool, bool]" = (0.0, False, False),
+    ) -> bool:
+        """
+        Queue a camera frame and what came of it. crop is the processor's
+        (frame shape, (x, y, w, h)) when the camera cut the frame down, warp the
+        (rotation angle, vertical flip, horizontal flip) it was warped with.
+        """
+        if self.failed:
+            return False
+        if crop is None:
+            frame_size, roi = (image.shape[1], image.shape[0]), (0, 0, 0, 0)
+        else:
+            frame_size, roi = (crop[0][1], crop[0][0]), crop[1]
+        try:
+            self._queue.put_nowait(
+                (
+                    image.copy(),
+                    frame_number,
+                    timestamps.get("capture", 0),
+                    [timestamps.get(stamp, 0) for stamp in SESSION_STAMPS],
+                    np.array(raw, np.float32),
+                    np.array(calibrated, np.float32),
+                    {
+                        "frame_size": np.array(frame_size, np.int64),
+                        "roi": np.array(roi, np.int64),
+                        "rotation_angle": np.float32(warp[0]),
+                        "flip": np.array(warp[1:], bool),
+                    },
+                )
+            )
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+        self.frames_recorded += 1
+        return True
+
+    def get_stats(self) -> dict:
+        writer = self._writer
+        return {
+            "path": self.path,
+            "frames_recorded": self.frames_recorded,
+            "frames_dropped": self.frames_dropped,
+            "frames_written": writer.frames_written if writer is not None else 0,
+            "chunks_written": writer.chunks_written if writer is not None else 0,
+            "bytes_written": writer.bytes_written if writer is not None else 0,
+            "queued": self._queue.qsize(),
+            "failed": self.failed,
+        }
+
+    def run(self):
+        writer = self._writer
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                image, frame_number, capture_ns, stamps, raw, calibrated, columns = item
+                ok, jpeg = cv2.imencode(".jpg", image, params)
+                if not ok:
+                    continue
+                columns.update((f"{stamp}_ns", np.int64(value)) for stamp, value in zip(SESSION_STAMPS, stamps))
+                writer.write(jpeg.tobytes(), frame_number, capture_ns, raw=raw, calibrated=calibrated, **columns)
+            writer.close()
+        except Exception as e:
+            print(
+                f'{Fore.YELLOW}[WARN] info.recordingFailed {self.path}{Fore.RESET}'
+            )
+            print(e)
+            self.failed = True
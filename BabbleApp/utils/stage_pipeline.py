@@ -0,0 +1,97 @@
+import threading
+import time
+import numpy as np
+
+
+class StageHandoff:
+    """
+    Latest-only handoff between two pipeline stages that never blocks the producer.
+
+    Holds a single item. put() replaces one the consumer has not taken yet, so
+    take() always gets the newest and a frame waits at most one frame's time
+    between two stages. Replaced items count as dropped and go to on_drop, the
+    processor gives their model input buffer back to the pool there.
+    """
+
+    def __init__(self, on_drop=None):
+        self.on_drop = on_drop
+        self.put_count = 0
+        self.dropped = 0
+        self._item = None
+        self._ready = threading.Condition()
+
+    def put(self, item):
+        with self._ready:
+            older = self._item
+            self._item = item
+            self.put_count += 1
+            if older is not None:
+                self.dropped += 1
+            self._ready.notify()
+        if older is not None and self.on_drop is not None:
+            self.on_drop(older)
+
+    def take(self, timeout: "float | None" = None):
+        """Return the newest item, waiting up to timeout seconds for one, or None."""
+        with self._ready:
+            if self._item is None and not self._ready.wait_for(lambda: self._item is not None, timeout):
+                return None
+            item = self._item
+            self._item = None
+            return item
+
+    def __len__(self) -> int:
+        return 0 if self._item is None else 1
+
+
+class BufferPool:
+    """
+    Free list of preallocated arrays shared by the pipeline stages.
+
+    A buffer is only handed out again once it was released, so nothing writes
+    into one a later stage is still reading. acquire() never waits, None means
+    every buffer is in use and the caller skips its frame.
+    """
+
+    def __init__(self, count: int, shape, dtype=np.uint8):
+        self.buffers = [np.empty(shape, dtype) for _ in range(count)]
+        self.exhausted = 0
+        self._free = list(self.buffers)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "np.ndarray | None":
+        with self._lock:
+            if not self._free:
+                self.exhausted += 1
+                return None
+            return self._free.pop()
+
+    def release(self, buffer: np.ndarray):
+        with self._lock:
+            self._free.append(buffer)
+
+
+class StageOccupancy:
+    """How much of the time since start() a pipeline stage's worker spent working."""
+
+    def __init__(self):
+        self.frames = 0
+        self._busy_ns = 0
+        self._started_ns = time.perf_counter_ns()
+
+    def start(self):
+        self.frames = 0
+        self._busy_ns = 0
+        self._started_ns = time.perf_counter_ns()
+
+    def record(self, start_ns: int, end_ns: int):
+        self._busy_ns += end_ns - start_ns
+        self.frames += 1
+
+    def get_stats(self) -> dict:
+        elapsed = time.perf_counter_ns() - self._started_ns
+        return {
+            "frames": self.frames,
+            "occupancy": self._busy_ns / elapsed if elapsed > 0 else 0.0,
+            "busy_ms": self._busy_ns / 1e6 / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,235 @@
+import mmap
+import re
+import select
+import time
+import cv2
+import numpy as np
+from utils.jpeg_decode import JpegDecoder
+from utils.misc_utils import os_type
+
+if os_type == 'Linux':
+    import v4l2py as v4l
+    import v4l2py.device as v4ld
+
+# Two buffers: one being filled by the driver while we read the other.
+V4L2_BUFFER_COUNT = 2
+V4L2_MIN_FPS = 30
+# In order of preference. GREY is luma already, YUYV has it in every other byte
+# and MJPEG goes through the reduced gray JPEG decode.
+V4L2_FORMATS = ("GREY", "YUYV", "MJPEG")
+# struct v4l2_buffer flags, see videodev2.h
+V4L2_BUF_FLAG_ERROR = 0x00000040
+V4L2_BUF_FLAG_TIMESTAMP_MASK = 0x0000E000
+V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC = 0x00002000
+
+
+def is_v4l2_source(capture_source) -> bool:
+    source = str(capture_source)
+    return source.isdigit() or re.fullmatch(r"/dev/video\d+", source) is not None
+
+
+def v4l2_index(capture_source) -> int:
+    return int(str(capture_source).replace("/dev/video", ""))
+
+
+class V4l2Capture:
+    """
+    Reads a UVC camera through V4L2 mmap buffers, without OpenCV's FFmpeg layer.
+
+    Only a couple of buffers are queued, and read() hands out the newest filled
+    one and requeues anything older, so frames can't pile up in the driver. Luma
+    is copied straight out of the mapped buffer, already at the size
+    Camera.clamp_max_res() would give. MJPEG frames keep the decoder's reduced
+    size, frame_size is then the size they stand for. Frames carry
+    the driver's timestamp, which is on the same CLOCK_MONOTONIC clock as
+    time.perf_counter_ns().
+    """
+
+    def __init__(
+        self,
+        index: int,
+        jpeg_decoder: JpegDecoder,
+        buffer_count: int = V4L2_BUFFER_COUNT,
+        width: int = 0,
+        height: int = 0,
+        fps: float = 0,
+    ):
+        self.index = index
+        self.jpeg_decoder = jpeg_decoder
+        self.buffer_count = buffer_count
+        self.requested_size = (width, height)
+        self.requested_fps = fps
+        self.pixel_format = None
+        self.width = 0
+        self.height = 0
+        self.bytes_per_line = 0
+        self.frames_received = 0
+        self.frames_superseded = 0
+        self.frames_corrupt = 0
+        self.kernel_timestamps = False
+        self.frame_size: "tuple[int, int] | None" = None
+        self._device = None
+        self._buffers: "list[mmap.mmap]" = []
+        self._luma: "np.ndarray | None" = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._device is not None
+
+    def open(self):
+        device = v4l.Device.from_id(self.index)
+        device.open()
+        try:
+            self._device = device
+            # frame_types has one entry per size and frame interval, frame_sizes has neither dimensions nor fps.
+            name, frame_size = self._negotiate(device.info.frame_types)
+            # The PixelFormat itself, set_format() would take a str as a four character fourcc and MJPEG is five.
+            device.set_format(
+                v4ld.BufferType.VIDEO_CAPTURE, frame_size.width, frame_size.height, frame_size.pixel_format
+            )
+            fmt = device.get_format(v4ld.BufferType.VIDEO_CAPTURE)
+            self.pixel_format = name
+            self.width = fmt.width
+            self.height = fmt.height
+            self.bytes_per_line = fmt.bytes_per_line
+            fps = self.requested_fps or frame_size.max_fps
+            if fps:
+                device.set_fps(v4ld.BufferType.VIDEO_CAPTURE, fps)
+            request = device.request_buffers(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP, self.buffer_count)
+            for i in range(request.count):
+                buff = device.query_buffer(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP, i)
+                self._buffers.append(
+                    mmap.mmap(device.fileno(), buff.length, mmap.MAP_SHARED, mmap.PROT_READ, offset=buff.m.offset)
+                )
+                device.enqueue_buffer(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP, buff.length, i)
+            device.stream_on(v4ld.BufferType.VIDEO_CAPTURE)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        device = self._device
+        if device is None:
+            return
+        self._device = None
+        try:
+            device.stream_off(v4ld.BufferType.VIDEO_CAPTURE)
+        except Exception:
+            pass
+        for buffer in self._buffers:
+            buffer.close()
+        self._buffers = []
+        try:
+            device.free_buffers(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP)
+        except Exception:
+            pass
+        device.close()
+
+    def _negotiate(self, frame_types):
+        max_resolution = self.jpeg_decoder.max_resolution
+        width, height = self.requested_size
+        for name in V4L2_FORMATS:
+            pixel_format = getattr(v4l.PixelFormat, name)
+            # max_fps is 0 when the driver doesn't enumerate intervals, those modes are kept but ranked last.
+            candidates = [
+                mode for mode in frame_types
+                if mode.pixel_format == pixel_format and (mode.max_fps == 0 or mode.max_fps >= V4L2_MIN_FPS)
+            ]
+            if not candidates:
+                continue
+            if width and height:
+                # Closest to what was asked for in the settings.
+                key = lambda mode: (
+                    abs(mode.width - width) + abs(mode.height - height), mode.max_fps == 0, -mode.max_fps
+                )
+            else:
+                # Closest to what the processor gets after clamping, so little is read just to be thrown away.
+                key = lambda mode: (
+                    abs(max(mode.width, mode.height) - max_resolution), mode.max_fps == 0, -mode.max_fps
+                )
+            return name, min(candidates, key=key)
+        raise RuntimeError(f"/dev/video{self.index} has no GREY, YUYV or MJPEG mode at {V4L2_MIN_FPS} fps")
+
+    def _dequeue(self):
+        return self._device.dequeue_buffer(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP)
+
+    def _requeue(self, buff):
+        self._device.enqueue_buffer(v4ld.BufferType.VIDEO_CAPTURE, v4ld.Memory.MMAP, buff.length, buff.index)
+
+    def read(self, timeout: float, roi_size=None, color: bool = False):
+        """
+        Wait up to timeout seconds for a frame and return (image, frame_number,
+        capture_ns), or None. Frames that were already waiting are skipped in
+        favour of the newest one.
+        """
+        device = self._device
+        if not select.select((device,), (), (), timeout)[0]:
+            return None
+        buff = self._dequeue()
+        while select.select((device,), (), (), 0)[0]:
+            newer = self._dequeue()
+            self._requeue(buff)
+            self.frames_superseded += 1
+            buff = newer
+        try:
+            if buff.flags & V4L2_BUF_FLAG_ERROR:
+                self.frames_corrupt += 1
+                return None
+            image = self._extract(buff, roi_size, color)
+        finally:
+            self._requeue(buff)
+        if image is None:
+            return None
+        self.frames_received += 1
+        self.kernel_timestamps = (
+            buff.flags & V4L2_BUF_FLAG_TIMESTAMP_MASK
+        ) == V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC
+        if self.kernel_timestamps:
+            capture_ns = buff.timestamp.secs * 1_000_000_000 + buff.timestamp.usecs * 1000
+        else:
+            capture_ns = time.perf_counter_ns()
+        return image, buff.sequence, capture_ns
+
+    def _extract(self, buff, roi_size, color: bool) -> "np.ndarray | None":
+        data = np.frombuffer(self._buffers[buff.index], np.uint8, count=buff.bytesused)
+        self.frame_size = None
+        if self.pixel_format == "MJPEG":
+            image = self.jpeg_decoder.decode(data, roi_size, color=color)
+            self.frame_size = self.jpeg_decoder.frame_size
+            return image
+
+        rows = data[:self.height * self.bytes_per_line].reshape(self.height, self.bytes_per_line)
+        out_size = self.jpeg_decoder.output_size(self.width, self.height)
+        resize = out_size != (self.width, self.height)
+        if self.pixel_format == "YUYV" and color:
+            # Only the red channel option needs color.
+            yuyv = rows[:, :self.width * 2].reshape(self.height, self.width, 2)
+            image = cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUYV)
+            if not resize:
+                return image
+            return cv2.resize(image, out_size, interpolation=cv2.INTER_AREA)
+
+        if self.pixel_format == "YUYV":
+            luma = rows[:, 0:self.width * 2:2]
+        else:
+            luma = rows[:, :self.width]
+        if not resize:
+            # A frame of its own, the processor and the preview may hold on to it for a while.
+            return luma.copy()
+        # The mapped buffer goes back to the driver, so copy the luma out once and scale from there.
+        if self._luma is None or self._luma.shape != luma.shape:
+            self._luma = np.empty(luma.shape, np.uint8)
+        np.copyto(self._luma, luma)
+        return cv2.resize(self._luma, out_size, interpolation=cv2.INTER_AREA)
+
+    def get_stats(self) -> dict:
+        return {
+            "pixel_format": self.pixel_format,
+            "width": self.width,
+            "height": self.height,
+            "buffers": len(self._buffers),
+            "frames_received": self.frames_received,
+            "frames_superseded": self.frames_superseded,
+            "frames_corrupt": self.frames_corrupt,
+            "kernel_timestamps": self.kernel_timestamps,
+        }
@@ -22,11 +22,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import time
 import platform
 import logging
 import signal
+import threading
 from enum import Enum
+import cv2
 import numpy as np
 from utils.misc_utils import os_type
 
@@ -37,6 +38,10 @@ elif os_type == 'Windows':
     import pygrabber.dshow_graph as pgdsg
     import pygrabber.dshow_ids as pgdsi
 
+# How often a capture loop that waits for frames to be delivered checks for
+# a termination requested by a signal handler, terminate() wakes it up at once.
+TERMINATE_CHECK_INTERVAL = 0.5
+
 
 class FTCamera:
     """Opens a camera grabbing frames as numpy arrays."""
@@ -134,15 +139,38 @@ class FTCamera:
                     self.pixel_format, self.description)
 
     class Terminator:
-        """Terminator."""
-        terminate_requested = False
-        def __init__(self):
+        """Terminator.
+
+        event may be a multiprocessing.Event shared with the process that
+        started this one, terminate() on either side then asks the capture
+        loop to finish. Signals still work as a fallback.
+        """
+        def __init__(self, event=None):
+            self._event = threading.Event() if event is None else event
+            self._signalled = False
             signal.signal(signal.SIGINT, self.request_terminate)
             signal.signal(signal.SIGTERM, self.request_terminate)
 
+        @property
+        def terminate_requested(self) -> bool:
+            return self._signalled or self._event.is_set()
+
         def request_terminate(self, signum, frame):
-            """Request to terminate process."""
-            self.terminate_requested = True
+            """Request to terminate process.
+
+            Signal handler, only sets the flag. Setting the event here could
+            deadlock on its lock if the signal arrives inside wait().
+            """
+            self._signalled = True
+
+        def terminate(self):
+            """Request to terminate from another thread or process, wakes up wait()."""
+            self._event.set()
+
+        def wait(self, timeout: float = TERMINATE_CHECK_INTERVAL) -> bool:
+            """Sleep until terminate() or timeout, returns terminate_requested."""
+            self._event.wait(timeout)
+            return self.terminate_requested
 
     class Processor:
         """Processor."""
@@ -176,10 +204,8 @@ class FTCamera:
         self._controls: "list[FTCamera.Control]" = []
         self._has_frame: bool = False
         self._read_frame: np.ndarray = None
-        self._arr_data: np.ndarray = None
-        self._arr_c2: np.ndarray = None
-        self._arr_c3: np.ndarray = None
         self._arr_merge: np.ndarray = None
+        self._arr_luma: np.ndarray = None
         self._format: FTCamera.FrameFormat = None
         self._frame_size: FTCamera.FrameSize = None
         self._frame_width: int = 0
@@ -191,6 +217,8 @@ class FTCamera:
 
         self.terminator: FTCamera.Terminator = None
         self.processor: FTCamera.Processor = None
+        # Hand the processor the Y plane as (height, width) instead of (height, width, 3) YUV444.
+        self.luma_only: bool = False
 
     def open(self: 'FTCamera') -> None:
         """Open device if closed.
@@ -310,17 +338,21 @@ class FTCamera:
             # handler expects a 3-channel image and YUV2 delivers
             # 2 channels. this crashes python_grabber
             class SampleGrabberYUV2(pgdsg.SampleGrabberCallback):
-                """Sample grabber using YUV2."""
+                """Sample grabber using YUV2.
+
+                Every sample is handed to the callback on the DirectShow
+                streaming thread as it arrives, there is no need to ask
+                for frames with grab_frame().
+                """
                 def __init__(self: 'SampleGrabberYUV2',
                              callback: pgdsg.Callable[[pgdsg.Mat], None]):
                     super().__init__(callback)
-                    self.keep_photo: bool = False
+                    self.keep_photo: bool = True
 
                 def BufferCB(self: 'SampleGrabberYUV2', this, SampleTime,
                              pBuffer: pgdsg.NPBUFFER, BufferLen: int) -> int:
                     """Buffer callback."""
                     if self.keep_photo:
-                        self.keep_photo = False
                         w = self.image_resolution[0]
                         h = self.image_resolution[1]
                         img = np.ctypeslib.as_array(pBuffer, shape=(h, w, 2))
@@ -338,10 +370,10 @@ class FTCamera:
 
     def _init_arrays(self: 'FTCamera') -> None:
         """Create numpy arrays to fill during capturing."""
-        self._arr_data = np.zeros([self._pixel_count * 2], dtype=np.uint8)
+        if self.luma_only:
+            self._arr_luma = np.empty([self._frame_height, self._frame_width], np.uint8)
+            return
         self._arr_merge = np.zeros([self._pixel_count, 3], dtype=np.uint8)
-        self._arr_c2 = np.empty([self._half_pixel_count], np.uint8)
-        self._arr_c3 = np.empty([self._half_pixel_count], np.uint8)
 
     def _find_controls(self: 'FTCamera') -> None:
         """Logs all controls and stores them for use."""
@@ -445,11 +477,14 @@ class FTCamera:
             FTCamera._logger.info("FTCamera.read: EXIT")
     elif os_type == 'Windows':
         def read(self: 'FTCamera') -> None:
-            """Read frames until requested to exit."""
+            """Read frames until requested to exit.
+
+            The sample grabber delivers frames from the streaming thread,
+            this only waits for termination.
+            """
             self._filter_graph.run()
-            while not self.terminator.terminate_requested:
-                self._filter_graph.grab_frame()
-                time.sleep(0.001)
+            while not self.terminator.wait():
+                pass
 
         def _async_grabber(self: 'FTCamera', image: np.ndarray) -> None:
             self._process_frame(image)
@@ -463,7 +498,7 @@ class FTCamera:
             optimized version producing only Y grayscale frame.
 
             The captured frame is reshaped to (height, width, 3) before
-            sending it to "callback_frame".
+            sending it to "callback_frame", or (height, width) if luma_only.
             """
             if len(frame.data) == 0:
                 return
@@ -471,6 +506,10 @@ class FTCamera:
             try:
                 match frame.pixel_format:
                     case v4l.PixelFormat.YUYV:
+                        if self.luma_only:
+                            self._decode_yuv422_y_only(frame.data)
+                            self.processor.process(self._arr_luma)
+                            return
                         self._decode_yuv422(frame.data)
                     case _:
                         FTCamera._logger.error(
@@ -486,6 +525,10 @@ class FTCamera:
             try:
                 match self._format.pixel_format:
                     case 'YUY2':
+                        if self.luma_only:
+                            self._decode_yuv422_y_only(frame)
+                            self.processor.process(self._arr_luma)
+                            return
                         self._decode_yuv422(frame)
                     case _:
                         FTCamera._logger.error(
@@ -498,31 +541,19 @@ class FTCamera:
                 FTCamera._logger.exception("FTCamera._process_frame")
 
     if os_type == 'Linux':
-        def _decode_yuv422(self: 'FTCamera', frame: list[bytes]) -> None:
-            """Decode YUV422 frame into YUV444 frame."""
-            self._arr_data[:] = np.frombuffer(frame, dtype=np.uint8)
-
-            self._arr_merge[:, 0] = np.array(self._arr_data[0::2])
-            self._arr_c2[:] = np.array(self._arr_data[1::4])
-            self._arr_c3[:] = np.array(self._arr_data[3::4])
-
-            self._arr_merge[0:self._pixel_count:2, 1] = self._arr_c2
-            self._arr_merge[1:self._pixel_count:2, 1] = self._arr_c2
-            self._arr_merge[0:self._pixel_count:2, 2] = self._arr_c3
-            self._arr_merge[1:self._pixel_count:2, 2] = self._arr_c3
+        def _yuyv_data(self: 'FTCamera', frame: list[bytes]) -> np.ndarray:
+            """Captured frame as a flat YUYV view, nothing is copied."""
+            return np.frombuffer(frame, dtype=np.uint8, count=self._pixel_count * 2)
     elif os_type == 'Windows':
-        def _decode_yuv422(self: 'FTCamera', frame: np.ndarray) -> None:
-            self._arr_merge[:, 0] = frame[:, :, 0].ravel(order='F')
-
-            self._arr_c2[:] = np.array(frame[:, :, 1:].ravel(order='F')[0::2])
-            self._arr_c3[:] = np.array(frame[:, :, 1:].ravel(order='F')[1::2])
+        def _yuyv_data(self: 'FTCamera', frame: np.ndarray) -> np.ndarray:
+            """Captured frame as a flat YUYV view, nothing is copied."""
+            return grabber_yuyv(frame)
 
-            self._arr_merge[0:self._pixel_count:2, 1] = self._arr_c2
-            self._arr_merge[1:self._pixel_count:2, 1] = self._arr_c2
-            self._arr_merge[0:self._pixel_count:2, 2] = self._arr_c3
-            self._arr_merge[1:self._pixel_count:2, 2] = self._arr_c3
+    def _decode_yuv422(self: 'FTCamera', frame) -> None:
+        """Decode YUV422 frame into YUV444 frame."""
+        decode_yuyv_yuv444(self._yuyv_data(frame), self._arr_merge)
 
-    def _decode_yuv422_y_only(self: 'FTCamera', frame: list[bytes]) -> None:
+    def _decode_yuv422_y_only(self: 'FTCamera', frame) -> None:
         """Fast version of _decode_yuv422.
 
         This version is faster since it only copies the Y channel
@@ -530,6 +561,32 @@ class FTCamera:
         image (grayscale image). This is suitible for cameras
         like the VIVE that output the same image on all channels
         """
-        self._arr_data[:] = np.frombuffer(frame, dtype=np.uint8)
+        decode_yuyv_luma(self._yuyv_data(frame), self._arr_luma)
+
+
+def grabber_yuyv(frame: np.ndarray) -> np.ndarray:
+    """Flat YUYV view of a (width, height, 2) frame from SampleGrabberYUV2.
+
+    BufferCB swaps the axes of the (height, width, 2) sample buffer.
+    Swapping them back restores the buffer's own contiguous layout, so
+    the reshape is a view.
+    """
+    return frame.transpose(1, 0, 2).reshape(-1)
+
+
+# Every 4 bytes Y0 U Y1 V hold two pixels sharing U and V. Seen as one
+# 4 channel pixel, YUV444 is the same pair as a 6 channel pixel.
+YUYV_TO_YUV444 = (0, 0, 1, 1, 3, 2, 2, 3, 1, 4, 3, 5)
+
+
+def decode_yuyv_yuv444(yuyv: np.ndarray, out: np.ndarray) -> None:
+    """Expand packed YUYV into YUV444 pixels in out, shape (pixels, 3).
+
+    A single cv2.mixChannels pass writing into out, nothing is allocated.
+    """
+    cv2.mixChannels([yuyv.reshape(-1, 1, 4)], [out.reshape(-1, 1, 6)], YUYV_TO_YUV444)
+
 
-        self._arr_merge[:, 0] = np.array(self._arr_data[0::2])
+def decode_yuyv_luma(yuyv: np.ndarray, out: np.ndarray) -> None:
+    """Copy the Y plane of packed YUYV into out, shape (height, width)."""
+    cv2.extractChannel(yuyv.reshape(out.shape + (2,)), 0, dst=out)
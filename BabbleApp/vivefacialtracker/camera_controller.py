@@ -22,25 +22,30 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import multiprocessing.queues
 import multiprocessing
-import queue as pqueue
 import traceback
 import platform
 import logging
-from struct import pack, unpack
+import time
 import cv2
 import numpy as np
+from utils.frame_ring import SharedFrameRing
 from vivefacialtracker.camera import FTCamera
 from vivefacialtracker.vivetracker import ViveTracker
 
+# How long the read process gets to stop by itself before it is terminated.
+FT_STOP_TIMEOUT = 1.0
+# Largest frame the read process hands over. ViveTracker.process_frame()
+# produces 400x400x3 (400x400 luma only), this leaves room for raw camera frames.
+FT_FRAME_BYTES = 640 * 480 * 3
+
 
 class FTCameraController:
     """Opens a camera grabbing frames as numpy arrays."""
 
     _logger = logging.getLogger("evcta.FTCameraController")
 
-    def __init__(self: 'FTCameraController', index: int) -> None:
+    def __init__(self: 'FTCameraController', index: int, luma_only: bool = True) -> None:
         """Create camera grabber.
 
         The camera is not yet opened. Set "callback_frame" then call
@@ -49,11 +54,17 @@ class FTCameraController:
         Keyword arguments:
         index -- Index of the camera. Under Linux this uses the device
                  file "/dev/video{index}".
+        luma_only -- Deliver single channel (height, width) frames holding
+                     only the Y plane instead of 3 identical channels.
         """
         self.is_open = False
         self._index: int = index
+        self._luma_only: bool = luma_only
         self._proc_read: multiprocessing.Process = None
-        self._proc_queue: multiprocessing.queues.Queue = None
+        self._ring: SharedFrameRing = None
+        self._stop_event: multiprocessing.Event = None
+        self.last_capture_ns: int = 0
+        self.last_sequence: int = 0
 
     def close(self: 'FTCameraController') -> None:
         """Closes the device if open.
@@ -71,8 +82,10 @@ class FTCameraController:
 
         self.is_open = True
         FTCameraController._logger.info("FTCameraController.open: start process")
-        self._proc_queue = multiprocessing.Queue(maxsize=1)
-        self._proc_read = multiprocessing.Process(target=self._read_process, args=(self._proc_queue,))
+        self._ring = SharedFrameRing.create(FT_FRAME_BYTES)
+        self._stop_event = multiprocessing.Event()
+        self._proc_read = multiprocessing.Process(
+            target=self._read_process, args=(self._ring, self._stop_event))
         self._proc_read.start()
 
     def _reopen(self: 'FTCameraController') -> None:
@@ -81,17 +94,23 @@ class FTCameraController:
         self.open()
 
     def get_image(self: 'FTCameraController') -> np.ndarray:
-        """Get next image or None."""
+        """Get next image or None.
+
+        The image is copied out of the shared frame ring. A view would only
+        stay intact until the read process laps the ring, and the frame goes on
+        to the mailbox, the raw preview and the processor stages, any of which
+        can hold it for longer than that.
+        """
         try:
             # timeout of 1s is a bit short. 2s is safer
-            frame = self._proc_queue.get(True, 2)
-            shape = unpack('HHH', frame[0:6])
-            image = np.frombuffer(frame[6:], dtype=np.uint8).reshape(shape)
-            return image
-        except pqueue.Empty:
-            # FTCameraController._logger.info("FTCameraController.get_image: timeout, reopen device")
-            # self._reopen()
-            return None
+            frame = self._ring.read(2)
+            if frame is None:
+                # FTCameraController._logger.info("FTCameraController.get_image: timeout, reopen device")
+                # self._reopen()
+                return None
+            image, self.last_sequence, self.last_capture_ns = frame
+            # The slot is ours until the next read(), copy it out before that.
+            return image.copy()
         except Exception:
             FTCameraController._logger.exception(
                 "FTCameraController.get_image: Failed getting image")
@@ -103,8 +122,15 @@ class FTCameraController:
         if self._proc_read is None:
             return
         FTCameraController._logger.info("FTCameraController._stop_read: stop process")
-        self._proc_read.terminate()  # sends a SIGTERM
-        self._proc_read.join(1)
+        # The read process' FTCamera.Terminator waits on this event, set it to
+        # have the capture loop finish and close the tracker and camera itself.
+        self._stop_event.set()
+        self._proc_read.join(FT_STOP_TIMEOUT)
+        if self._proc_read.exitcode is None:
+            FTCameraController._logger.info(
+                "FTCameraController._stop_read: process did not stop, terminating it")
+            self._proc_read.terminate()  # sends a SIGTERM
+            self._proc_read.join(1)
 
         if self._proc_read.exitcode is not None:
             FTCameraController._logger.info(
@@ -117,9 +143,24 @@ class FTCameraController:
             FTCameraController._logger.info(
                 "FTCameraController._stop_read: process killed")
         self._proc_read = None
+        self._stop_event = None
+        self._ring.unlink()
+        self._ring.close()
+        self._ring = None
+
+    def get_stats(self: 'FTCameraController') -> dict:
+        """Frames read and skipped by the consumer side."""
+        if self._ring is None:
+            return {}
+        return {
+            "frames_published": self._ring.published,
+            "frames_read": self._ring.frames_read,
+            "frames_skipped": self._ring.frames_skipped,
+        }
 
     def _read_process(self: 'FTCameraController',
-                      queue: multiprocessing.connection.Connection) -> None:
+                      ring: SharedFrameRing,
+                      stop_event: multiprocessing.Event) -> None:
         """Read process function."""
 
         """
@@ -128,21 +169,21 @@ class FTCameraController:
         """
 
         FTCameraController._logger.info("FTCameraController._read_process: ENTER")
+        luma_only = self._luma_only
         class Helper(FTCamera.Processor):
             """Helper."""
             def __init__(self: 'FTCameraController.Helper',
-                         queue: multiprocessing.connection.Connection) -> None:
+                         ring: SharedFrameRing) -> None:
                 self.camera: FTCamera = None
                 self.tracker: ViveTracker = None
-                self._queue = queue
+                self._ring = ring
 
-            def open_camera(self: 'FTCameraController.Helper', index: int,
-                            queue: multiprocessing.connection.Connection) -> None:
+            def open_camera(self: 'FTCameraController.Helper', index: int) -> None:
                 """Open camera."""
                 self.camera = FTCamera(index)
-                self.camera.terminator = FTCamera.Terminator()
+                self.camera.terminator = FTCamera.Terminator(stop_event)
                 self.camera.processor = self
-                self.camera.queue = queue
+                self.camera.luma_only = luma_only
                 self.camera.open()
 
             def open_tracker(self: 'FTCameraController.Helper') -> None:
@@ -161,22 +202,23 @@ class FTCameraController:
                     self.camera.close()
                     self.camera.processor = None
                     self.camera.terminator = None
-                    self.camera.queue = None
                     self.camera = None
 
             def process(self, frame) -> None:
                 """Process frame."""
-                channel = cv2.split(frame)[0]
-                frame = cv2.merge((channel, channel, channel))
+                capture_ns = time.perf_counter_ns()
+                if frame.ndim == 3:
+                    channel = cv2.split(frame)[0]
+                    frame = cv2.merge((channel, channel, channel))
                 if self.tracker is not None:
                     frame = self.tracker.process_frame(frame)
-                self._queue.put(pack('HHH', *frame.shape) + frame.tobytes())
+                self._ring.write(frame, capture_ns)
 
-        helper: Helper = Helper(queue)
+        helper: Helper = Helper(ring)
         try:
             FTCameraController._logger.info(
                 "FTCameraController._read_process: open device")
-            helper.open_camera(self._index, queue)
+            helper.open_camera(self._index)
 
             if not ViveTracker.is_camera_vive_tracker(helper.camera.device):
                 FTCameraController._logger.exception(
@@ -194,5 +236,6 @@ class FTCameraController:
             print(traceback.format_exc())
         finally:
             helper.close()
+            ring.close()
 
         FTCameraController._logger.info("FTCameraController._read_process: EXIT")
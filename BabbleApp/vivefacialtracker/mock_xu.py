@@ -0,0 +1,78 @@
+"""Simulated VIVE Facial Tracker extension unit, to run ViveTracker without hardware."""
+
+from timeit import default_timer as timer
+
+from vivefacialtracker.vivetracker import ViveTracker
+
+
+class MockXuDevice:
+    """Extension unit answering XU commands the way the tracker does.
+
+    GET_CUR reports 0x55 (pending) until a command has been processed and
+    then 0x56 followed by the command echoed back. Switching the stream
+    keeps the device busy for stream_switch seconds, commands sent during
+    that time are dropped and it keeps echoing the stream command.
+    """
+
+    def __init__(self, buffer_length: int = 384, command_latency: float = 0.002,
+                 stream_switch: float = 0.1) -> None:
+        self.buffer_length = buffer_length
+        self.command_latency = command_latency
+        self.stream_switch = stream_switch
+        self.streaming = False
+        self.registers: dict[int, int] = {}
+        # Every SET_CUR received, trimmed to the 17 bytes a command uses.
+        self.commands: list[bytes] = []
+        self.get_cur_calls = 0
+        self._answer = bytes(17)
+        self._busy_until = 0.0
+        self._switching = False
+
+    def get_len(self) -> int:
+        return self.buffer_length
+
+    def set_cur(self, data) -> None:
+        command = bytes(data[:17])
+        self.commands.append(command)
+        now = timer()
+        if self._switching and now < self._busy_until:
+            return
+        self._answer = command
+        self._switching = command[:2] == bytes((ViveTracker._XU_TASK_SET, 0x14))
+        if self._switching:
+            self.streaming = command[3] == 0x01
+            self._busy_until = now + self.stream_switch
+            return
+        if command[:2] == bytes((ViveTracker._XU_TASK_SET, ViveTracker._XU_REG_SENSOR)):
+            self.registers[command[8]] = command[16]
+        self._busy_until = now + self.command_latency
+
+    def get_cur(self, data) -> None:
+        self.get_cur_calls += 1
+        if timer() < self._busy_until:
+            data[0] = 0x55
+            return
+        data[0] = 0x56
+        data[1:17] = self._answer[0:16]
+        if self._answer[:2] == bytes((ViveTracker._XU_TASK_GET, ViveTracker._XU_REG_SENSOR)):
+            data[17] = self.registers.get(self._answer[8], 0)
+
+
+class MockViveTracker(ViveTracker):
+    """ViveTracker talking to a MockXuDevice."""
+
+    def __init__(self: 'MockViveTracker', device: MockXuDevice) -> None:
+        self._mock_device = device
+        self._init_common()
+
+    def dispose(self: 'MockViveTracker') -> None:
+        self._deactivate_tracker()
+
+    def _xu_get_len(self: 'MockViveTracker', selector: int) -> int:
+        return self._mock_device.get_len()
+
+    def _xu_get_cur(self: 'MockViveTracker', selector: int, data) -> None:
+        self._mock_device.get_cur(data)
+
+    def _xu_set_cur(self: 'MockViveTracker', selector: int, data) -> None:
+        self._mock_device.set_cur(data)
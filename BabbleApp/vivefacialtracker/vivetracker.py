@@ -317,6 +317,28 @@ elif os_type == 'Windows':
     del c_void_p, c_wchar, c_wchar_p, c_ulong, c_uint, c_uint8
     del c_uint16, c_enum, Structure
 
+# The device answers GET_CUR with 0x55 while a command is still pending.
+# Polling starts right away and backs off from XU_POLL_MIN to XU_POLL_MAX
+# seconds between polls instead of spinning.
+XU_POLL_MIN = 0.0005
+XU_POLL_MAX = 0.01
+# How long the device may take to answer again after switching the stream.
+XU_READY_TIMEOUT = 1.0
+# Sensor registers (address, value) written on activation, in order.
+SENSOR_REGISTERS = (
+    (0x00, 0x40),
+    (0x08, 0x01),
+    (0x70, 0x00),
+    (0x02, 0xff),
+    (0x03, 0xff),
+    (0x04, 0xff),
+    (0x0e, 0x00),
+    (0x05, 0xb2),
+    (0x06, 0xb2),
+    (0x07, 0xb2),
+    (0x0f, 0x03),
+)
+
 
 class ViveTracker:
     """Provides support to activate data steam on VIVE Facial Tracker camera."""
@@ -401,6 +423,9 @@ class ViveTracker:
         self._bufferRegister: list[ctypes.c_uint8] = (ctypes.c_uint8 * 17)()
 
         self._debug = False
+        self.xu_commands: int = 0
+        self.xu_polls: int = 0
+        self.activation_ms: float = 0
 
         self._detect_vive_tracker()
         self._activate_tracker()
@@ -494,9 +519,11 @@ class ViveTracker:
         are possible to improve the image if desired.
 
         Keyword arguments:
-        data --- Frame to process
+        data --- Frame to process, (height, width, 3) or just the luma
+                 as (height, width). The result has the same layout.
         """
-        lum = cv.split(data)[0]
+        single_channel = data.ndim == 2
+        lum = data if single_channel else cv.split(data)[0]
 
         """
         gamma = 2.2
@@ -514,6 +541,8 @@ class ViveTracker:
         lum = cv.medianBlur(lum, 5)
         """
 
+        if single_channel:
+            return lum
         return cv.merge((lum, lum, lum))
 
     if os_type == 'Windows':
@@ -656,27 +685,33 @@ class ViveTracker:
         return self._xu_get_len(2)
 
     def _set_cur(self: 'ViveTracker', command: list[ctypes.c_uint8],
-                 timeout: float = 0.5) -> None:
+                 timeout: float = 0.5, retry_mismatch: bool = False) -> None:
         """Send SET_CUR command to device extension unit with proper handling.
 
         Sends SET_CUR command to the device. Then sends GET_CUR commands to
-        device until the "command finished" response is found.
+        device until the "command finished" response is found, backing off
+        between polls.
 
         Keyword arguments:
         command --- Command to send.
         timeout -- Timeout in seconds.
+        retry_mismatch -- Send the command again if the device is still
+                          answering an earlier one instead of failing.
         """
         length = len(command)
         self._bufferSend[:length] = command
         self._xu_set_cur(2, self._bufferSend)
+        self.xu_commands += 1
         if self._debug:
             ViveTracker._logger.debug("set_cur({})".format(
                 [hex(x) for x in command[:16]]))
         lenbuf = len(self._bufferReceive)
         stime = timer()
+        delay = XU_POLL_MIN
         while True:
-            self._bufferReceive[:] = (ctypes.c_uint8 * lenbuf)(0)
+            ctypes.memset(self._bufferReceive, 0, lenbuf)
             self._xu_get_cur(2, self._bufferReceive)
+            self.xu_polls += 1
             if self._bufferReceive[0] == 0x55:
                 # command not finished yet
                 if self._debug:
@@ -688,6 +723,9 @@ class ViveTracker:
                     if self._debug:
                         ViveTracker._logger.debug("-> getCur: finished")
                     return  # command finished
+                elif retry_mismatch:
+                    self._xu_set_cur(2, self._bufferSend)
+                    self.xu_commands += 1
                 else:
                     raise Exception(
                         "set_cur({}): response not matching command".
@@ -704,6 +742,20 @@ class ViveTracker:
             if elapsed > timeout:
                 raise Exception("set_cur({}): timeout".format(
                     [hex(x) for x in command[:16]]))
+            time.sleep(delay)
+            delay = min(delay * 2, XU_POLL_MAX)
+
+    def _wait_ready(self: 'ViveTracker',
+                    timeout: float = XU_READY_TIMEOUT) -> None:
+        """Wait until the device answers the test command.
+
+        Used after commands sent without response handling, the device keeps
+        reporting the earlier command or pending until it is ready again.
+
+        Keyword arguments:
+        timeout --- Timeout in seconds.
+        """
+        self._set_cur(self._dataTest, timeout, retry_mismatch=True)
 
     def _set_cur_no_resp(self: 'ViveTracker',
                          command: list[ctypes.c_uint8]) -> None:
@@ -798,6 +850,27 @@ class ViveTracker:
         """
         self._set_register(ViveTracker._XU_REG_SENSOR, address, value, timeout)
 
+    def _set_registers_sensor(self: 'ViveTracker',
+                              registers: "tuple[tuple[int, int], ...]",
+                              timeout: float = 0.5) -> None:
+        """Set several device sensor registers back to back.
+
+        All commands are built first and then sent in one go. The device
+        acknowledges one command at a time, so each still waits for its
+        "command finished" response.
+
+        Keyword arguments:
+        registers --- (address, value) pairs to set
+        timeout --- Timeout per register in seconds
+        """
+        commands = []
+        for address, value in registers:
+            self._init_register(ViveTracker._XU_TASK_SET, ViveTracker._XU_REG_SENSOR,
+                                address, 1, value, 1)
+            commands.append(bytes(self._bufferRegister))
+        for command in commands:
+            self._set_cur(command, timeout)
+
     def _get_register_sensor(self: 'ViveTracker', address: int,
                              timeout: float = 0.5) -> int:
         """Get device sensor register.
@@ -825,11 +898,7 @@ class ViveTracker:
         uses 384. If this is not the case then this is most probebly
         something else but not a VIVE Face Tracker.
         """
-        if os_type == 'Linux':
-            length = self._get_len()
-        elif os_type == 'Windows':
-            length = _control_propery_request_len(
-                self._xu_control, 2, self._xu_node_index)
+        length = self._get_len()
         if length == 384:
             pass
         elif length == 64:
@@ -843,32 +912,34 @@ class ViveTracker:
     def _activate_tracker(self: 'ViveTracker') -> None:
         """Activate tracker.
 
-        Sets parameters and enables data stream."""
+        Sets parameters and enables data stream. Instead of sleeping after
+        switching the stream the device is polled until it answers again."""
         ViveTracker._logger.info("activate vive tracker")
+        logger = ViveTracker._logger
+        start = timer()
 
-        ViveTracker._logger.info("-> disable stream")
+        logger.info("-> disable stream")
         self._set_cur(self._dataTest)
         self._set_enable_stream(False)
-        time.sleep(0.25)
 
-        ViveTracker._logger.info("-> set camera parameters")
-        self._set_cur(self._dataTest)
-        self._set_register_sensor(0x00, 0x40)
-        self._set_register_sensor(0x08, 0x01)
-        self._set_register_sensor(0x70, 0x00)
-        self._set_register_sensor(0x02, 0xff)
-        self._set_register_sensor(0x03, 0xff)
-        self._set_register_sensor(0x04, 0xff)
-        self._set_register_sensor(0x0e, 0x00)
-        self._set_register_sensor(0x05, 0xb2)
-        self._set_register_sensor(0x06, 0xb2)
-        self._set_register_sensor(0x07, 0xb2)
-        self._set_register_sensor(0x0f, 0x03)
-
-        ViveTracker._logger.info("-> enable stream")
+        self._wait_ready()
+        logger.info("-> device ready after {:.1f}ms".format((timer() - start) * 1000))
+
+        logger.info("-> set camera parameters")
+        stime = timer()
+        polls = self.xu_polls
+        self._set_registers_sensor(SENSOR_REGISTERS)
+        logger.info("-> {} registers in {:.1f}ms ({} polls)".format(
+            len(SENSOR_REGISTERS), (timer() - stime) * 1000, self.xu_polls - polls))
+
+        logger.info("-> enable stream")
         self._set_cur(self._dataTest)
         self._set_enable_stream(True)
-        time.sleep(0.25)
+        self._wait_ready()
+
+        self.activation_ms = (timer() - start) * 1000
+        logger.info("vive tracker activated in {:.1f}ms ({} commands, {} polls)".format(
+            self.activation_ms, self.xu_commands, self.xu_polls))
 
     def _deactivate_tracker(self: 'ViveTracker') -> None:
         """Deactivate tracker.